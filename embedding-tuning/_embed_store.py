@@ -0,0 +1,141 @@
+"""Compact embedding storage: int8 or binary codes, optional PCA / Matryoshka truncation, exact rescoring.
+
+First-pass similarity runs on the compact codes (4x smaller for int8, 32x for binary); only the
+top candidates are rescored against the full-precision vectors, which stay on disk (memory-mapped)
+and are read row by row.
+"""
+import json
+from pathlib import Path
+
+import numpy as np
+
+from _embed_utils import normalize_rows
+
+QUANTS = ("float32", "int8", "binary")
+REDUCERS = ("matryoshka", "pca")
+
+# Popcount for every byte value, used for Hamming distance on packed sign bits.
+_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint16)
+
+
+class CompactEmbeddings:
+    """Compact codes for a set of normalized embeddings plus (optional) full vectors for rescoring."""
+
+    def __init__(self, quant: str = "int8", dims: int | None = None, reduce: str = "matryoshka"):
+        if quant not in QUANTS:
+            raise ValueError(f"quant must be one of {QUANTS}")
+        if reduce not in REDUCERS:
+            raise ValueError(f"reduce must be one of {REDUCERS}")
+        self.quant = quant
+        self.dims = dims
+        self.reduce = reduce
+        self.mean = None        # PCA centering vector
+        self.components = None  # PCA projection (dims, full_dim)
+        self.scale = None       # int8 per-dimension scale
+        self.codes = None
+        self.full = None        # full-precision normalized vectors (ndarray or memmap)
+
+    # -- building ---------------------------------------------------------
+
+    def fit(self, embeddings: np.ndarray, keep_full: bool = True) -> "CompactEmbeddings":
+        """Fit the reducer/quantizer on embeddings and encode them."""
+        full = normalize_rows(np.array(embeddings, dtype=np.float32))
+        dims = self.dims or full.shape[1]
+        if self.reduce == "pca" and dims < full.shape[1]:
+            self.mean = full.mean(axis=0)
+            _, _, vt = np.linalg.svd(full - self.mean, full_matrices=False)
+            self.components = vt[:dims].astype(np.float32)
+        reduced = self._reduce(full)
+        if self.quant == "int8":
+            self.scale = np.maximum(np.abs(reduced).max(axis=0), 1e-8) / 127.0
+        self.codes = self._quantize(reduced)
+        self.full = full if keep_full else None
+        return self
+
+    def _reduce(self, vectors: np.ndarray) -> np.ndarray:
+        """Project (PCA) or truncate (Matryoshka) to self.dims, then renormalize."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.components is not None:
+            reduced = (vectors - self.mean) @ self.components.T
+        elif self.dims and self.dims < vectors.shape[1]:
+            reduced = vectors[:, :self.dims].copy()
+        else:
+            return normalize_rows(vectors.copy())
+        return normalize_rows(reduced)
+
+    def _quantize(self, reduced: np.ndarray) -> np.ndarray:
+        if self.quant == "int8":
+            return np.clip(np.rint(reduced / self.scale), -127, 127).astype(np.int8)
+        if self.quant == "binary":
+            return np.packbits(reduced > 0, axis=1)
+        return reduced.astype(np.float32)
+
+    # -- scoring ----------------------------------------------------------
+
+    @property
+    def bytes_per_vector(self) -> int:
+        return int(self.codes.shape[1] * self.codes.dtype.itemsize)
+
+    def approx_scores(self, queries: np.ndarray, chunk_size: int = 16384) -> np.ndarray:
+        """(n_queries, n_items) approximate cosine similarities from the compact codes.
+
+        Binary codes use the SimHash estimate cos(pi * hamming / bits).
+        """
+        q = self._reduce(normalize_rows(np.array(queries, dtype=np.float32)))
+        n = self.codes.shape[0]
+        out = np.empty((q.shape[0], n), dtype=np.float32)
+        if self.quant == "binary":
+            q_bits = np.packbits(q > 0, axis=1)
+            n_bits = q.shape[1]
+            for start in range(0, n, chunk_size):
+                block = self.codes[start:start + chunk_size]
+                ham = _POPCOUNT[np.bitwise_xor(q_bits[:, None, :], block[None, :, :])].sum(axis=2)
+                out[:, start:start + len(block)] = np.cos(np.pi * ham / n_bits)
+            return out
+        q_scaled = q * self.scale if self.quant == "int8" else q
+        for start in range(0, n, chunk_size):
+            block = self.codes[start:start + chunk_size].astype(np.float32)
+            out[:, start:start + len(block)] = q_scaled @ block.T
+        return out
+
+    def search(self, queries: np.ndarray, k: int = 10, rescore: int = 50) -> tuple[np.ndarray, np.ndarray]:
+        """Top-k (indices, scores) per query: compact first pass, exact rescoring of the top `rescore`."""
+        approx = self.approx_scores(queries)
+        n_cand = min(max(rescore, k), approx.shape[1])
+        cand = np.argpartition(-approx, n_cand - 1, axis=1)[:, :n_cand]
+        if self.full is None:
+            scores = np.take_along_axis(approx, cand, axis=1)
+        else:
+            # Sorted row order keeps memory-mapped reads sequential.
+            cand = np.sort(cand, axis=1)
+            q = normalize_rows(np.array(queries, dtype=np.float32))
+            scores = np.stack([self.full[c] @ qi for c, qi in zip(cand, q)])
+        order = np.argsort(-scores, axis=1)[:, :k]
+        return np.take_along_axis(cand, order, axis=1), np.take_along_axis(scores, order, axis=1)
+
+    # -- persistence ------------------------------------------------------
+
+    def save(self, out_dir: Path) -> None:
+        """Write codes, quantizer/reducer params and (if kept) full vectors as .npy files."""
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        meta = {"quant": self.quant, "dims": self.dims, "reduce": self.reduce}
+        (out_dir / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+        np.save(out_dir / "codes.npy", self.codes)
+        for name in ("scale", "mean", "components", "full"):
+            value = getattr(self, name)
+            if value is not None:
+                np.save(out_dir / f"{name}.npy", value)
+
+    @classmethod
+    def load(cls, in_dir: Path) -> "CompactEmbeddings":
+        """Load a saved store; full vectors are memory-mapped so rescoring only touches candidate rows."""
+        in_dir = Path(in_dir)
+        meta = json.loads((in_dir / "meta.json").read_text(encoding="utf-8"))
+        store = cls(meta["quant"], meta["dims"], meta["reduce"])
+        store.codes = np.load(in_dir / "codes.npy")
+        for name in ("scale", "mean", "components", "full"):
+            path = in_dir / f"{name}.npy"
+            if path.exists():
+                setattr(store, name, np.load(path, mmap_mode="r" if name == "full" else None))
+        return store
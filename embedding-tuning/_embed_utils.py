@@ -1,13 +1,35 @@
 """Shared helpers for embedding-tuning scripts. Data from ../poc-eco-classify/."""
+import os
+from itertools import islice
 from pathlib import Path
+from typing import Iterable
 
 import numpy as np
 import yaml
 
 POC_DIR = Path(__file__).resolve().parent / ".." / "poc-eco-classify"
+BUNDLE_DIR = Path(os.environ.get("EMBED_BUNDLE_DIR", POC_DIR / "bundles"))
 TARGET = "economic"
 
 
+def load_model(model_id: str):
+    """
+    SentenceTransformer for model_id; loaded offline from its bundle (bundle_model.py) if one exists.
+    huggingface_hub reads the offline flags when it is first imported, so they are set before
+    sentence_transformers is imported (as bundle_model._offline does) and hold for the whole process.
+    """
+    bundle = BUNDLE_DIR / model_id.replace("/", "--")
+    if (bundle / "bundle.json").exists():
+        os.environ["HF_HUB_OFFLINE"] = "1"
+        os.environ["TRANSFORMERS_OFFLINE"] = "1"
+        from sentence_transformers import SentenceTransformer
+
+        return SentenceTransformer(str(bundle), device="cpu", local_files_only=True)
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(model_id)
+
+
 def load_data():
     """Load sampledata.yaml and labels; return (titles, y_true). y_true[i] = (answer == economic)."""
     data = yaml.safe_load((POC_DIR / "sampledata.yaml").read_text(encoding="utf-8"))
@@ -31,6 +53,33 @@ def compute_sims(model, ref_sentences: list[str], titles: list[str]) -> np.ndarr
     return np.dot(art_norm, ref_norm.T)
 
 
+def normalize_rows(emb: np.ndarray) -> np.ndarray:
+    """L2-normalize rows in place (float32) and return the array."""
+    emb = np.asarray(emb, dtype=np.float32)
+    emb /= np.linalg.norm(emb, axis=1, keepdims=True)
+    return emb
+
+
+def available_memory_mb() -> int:
+    """Best-effort available RAM in MB (psutil, /proc/meminfo, else half of physical RAM)."""
+    try:
+        import psutil
+
+        return int(psutil.virtual_memory().available // (1024 * 1024))
+    except ImportError:
+        pass
+    meminfo = Path("/proc/meminfo")
+    if meminfo.exists():
+        for line in meminfo.read_text().splitlines():
+            if line.startswith("MemAvailable:"):
+                return int(line.split()[1]) // 1024
+    try:
+        total = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+        return int(total // (2 * 1024 * 1024))
+    except (ValueError, OSError, AttributeError):
+        return 4096
+
+
 def score_max(sims: np.ndarray) -> np.ndarray:
     """Per-article: max similarity (current default)."""
     return np.max(sims, axis=1)
@@ -54,6 +103,68 @@ def score_weighted_max(sims: np.ndarray, floor: float = 0.25) -> np.ndarray:
     return max_sim * (1.0 + 0.1 * count_above)
 
 
+STREAM_SCORERS = ("max", "top3_mean", "mean_all", "weighted_max")
+
+
+def iter_chunks(items: Iterable, size: int):
+    """Yield lists of up to size items from any iterable (no full materialization)."""
+    it = iter(items)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+def _fused_scores(sims: np.ndarray, scorers: tuple[str, ...], out: np.ndarray, top_k: int = 3, floor: float = 0.25) -> None:
+    """Fill out[:, j] with scorers[j] for one chunk of sims; max and top-k share one partial selection."""
+    k = min(top_k, sims.shape[1])
+    top = np.partition(sims, sims.shape[1] - k, axis=1)[:, -k:]
+    max_sim = top.max(axis=1)
+    for j, name in enumerate(scorers):
+        if name == "max":
+            out[:, j] = max_sim
+        elif name == "top3_mean":
+            out[:, j] = top.mean(axis=1, dtype=np.float32)
+        elif name == "mean_all":
+            out[:, j] = sims.mean(axis=1, dtype=np.float32)
+        elif name == "weighted_max":
+            out[:, j] = max_sim * (1.0 + 0.1 * np.count_nonzero(sims >= floor, axis=1))
+        else:
+            raise ValueError(f"Unknown scorer: {name}")
+
+
+def stream_scores(
+    model,
+    ref_sentences: list[str],
+    titles: Iterable[str],
+    out_path: Path,
+    n_titles: int | None = None,
+    scorers: tuple[str, ...] = STREAM_SCORERS,
+    chunk_size: int = 2048,
+    dtype=np.float32,
+) -> np.ndarray:
+    """Encode and score titles chunk by chunk into a memory-mapped (n_titles, len(scorers)) .npy file.
+
+    Only one chunk of embeddings and similarities is alive at a time, so peak memory depends on
+    chunk_size, not corpus size. dtype=np.float16 halves the chunk buffers (slower matmul on CPU).
+    Column j of the result matches the corresponding score_* function on compute_sims output.
+    """
+    if n_titles is None:
+        n_titles = len(titles)
+    ref_norm = normalize_rows(model.encode(ref_sentences)).astype(dtype, copy=False)
+    out = np.lib.format.open_memmap(out_path, mode="w+", dtype=np.float32, shape=(n_titles, len(scorers)))
+    start = 0
+    for chunk in iter_chunks(titles, chunk_size):
+        end = start + len(chunk)
+        if end > n_titles:
+            raise ValueError(f"More titles than n_titles={n_titles}")
+        emb = normalize_rows(model.encode(chunk)).astype(dtype, copy=False)
+        _fused_scores(emb @ ref_norm.T, scorers, out[start:end])
+        start = end
+    out.flush()
+    if start != n_titles:
+        raise ValueError(f"Got {start} titles, expected n_titles={n_titles}")
+    return out
+
+
 def metrics(y_true: list[bool], y_pred: list[bool]) -> tuple[float, float, float, float]:
     """Returns (accuracy, precision, recall, F1)."""
     from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score
@@ -0,0 +1,115 @@
+"""SQLite result store for the tuning grid: one row per (model, refs, scoring) cell, appended as cells finish."""
+import hashlib
+import json
+import sqlite3
+import time
+import uuid
+from pathlib import Path
+
+DEFAULT_DB = Path(__file__).resolve().parent / "results.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    started_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS cells (
+    config_hash TEXT PRIMARY KEY,
+    run_id TEXT NOT NULL REFERENCES runs(run_id),
+    model TEXT NOT NULL,
+    refs TEXT NOT NULL,
+    scoring TEXT NOT NULL,
+    encode_seconds REAL,
+    score_seconds REAL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    config_hash TEXT NOT NULL REFERENCES cells(config_hash),
+    threshold REAL NOT NULL,
+    acc REAL NOT NULL,
+    prec REAL NOT NULL,
+    rec REAL NOT NULL,
+    f1 REAL NOT NULL,
+    PRIMARY KEY (config_hash, threshold)
+);
+"""
+
+
+def file_digest(path: Path) -> str:
+    """sha256 of a file's bytes (ref sets, sample data)."""
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def config_hash(**config) -> str:
+    """Stable hash of a cell's configuration (model id, ref/data digests, scorer, thresholds)."""
+    blob = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:16]
+
+
+class ResultStore:
+    """Append-only store of grid cells; each committed cell survives a crash or Ctrl-C."""
+
+    def __init__(self, path: Path = DEFAULT_DB):
+        self.path = Path(path)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def start_run(self) -> str:
+        run_id = time.strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+        with self.conn:
+            self.conn.execute("INSERT INTO runs (run_id, started_at) VALUES (?, ?)", (run_id, time.time()))
+        return run_id
+
+    def finish_run(self, run_id: str) -> None:
+        with self.conn:
+            self.conn.execute("UPDATE runs SET finished_at = ? WHERE run_id = ?", (time.time(), run_id))
+
+    def has_cell(self, cfg_hash: str) -> bool:
+        row = self.conn.execute("SELECT 1 FROM cells WHERE config_hash = ?", (cfg_hash,)).fetchone()
+        return row is not None
+
+    def add_cell(self, run_id: str, cfg_hash: str, model: str, refs: str, scoring: str, rows: list[dict],
+                 encode_seconds: float | None = None, score_seconds: float | None = None) -> None:
+        """Commit one cell and its per-threshold metrics in a single transaction."""
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO cells VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (cfg_hash, run_id, model, refs, scoring, encode_seconds, score_seconds, time.time()),
+            )
+            self.conn.execute("DELETE FROM results WHERE config_hash = ?", (cfg_hash,))
+            self.conn.executemany(
+                "INSERT INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                [(cfg_hash, r["threshold"], r["acc"], r["prec"], r["rec"], r["f1"]) for r in rows],
+            )
+
+    def results(self, cfg_hashes: list[str] | None = None, run_id: str | None = None) -> list[dict]:
+        """Result rows (model, refs, scoring, threshold, acc, prec, rec, f1), optionally filtered."""
+        sql = (
+            "SELECT c.model, c.refs, c.scoring, r.threshold, r.acc, r.prec, r.rec, r.f1, c.config_hash "
+            "FROM results r JOIN cells c USING (config_hash)"
+        )
+        where, params = [], []
+        if cfg_hashes is not None:
+            where.append(f"c.config_hash IN ({','.join('?' * len(cfg_hashes))})")
+            params.extend(cfg_hashes)
+        if run_id is not None:
+            where.append("c.run_id = ?")
+            params.append(run_id)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY c.rowid, r.threshold"
+        keys = ("model", "refs", "scoring", "threshold", "acc", "prec", "rec", "f1", "config_hash")
+        return [dict(zip(keys, row)) for row in self.conn.execute(sql, params)]
+
+    def runs(self) -> list[dict]:
+        sql = (
+            "SELECT r.run_id, r.started_at, r.finished_at, COUNT(c.config_hash), "
+            "COALESCE(SUM(c.score_seconds), 0) FROM runs r LEFT JOIN cells c USING (run_id) "
+            "GROUP BY r.run_id ORDER BY r.started_at"
+        )
+        keys = ("run_id", "started_at", "finished_at", "cells", "score_seconds")
+        return [dict(zip(keys, row)) for row in self.conn.execute(sql)]
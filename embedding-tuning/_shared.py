@@ -0,0 +1,7 @@
+"""Puts ../googlenews-fetch-news/src (import_profile) on sys.path, after this project's own modules."""
+import sys
+from pathlib import Path
+
+SHARED_SRC = Path(__file__).resolve().parent.parent / "googlenews-fetch-news" / "src"
+if str(SHARED_SRC) not in sys.path:
+    sys.path.append(str(SHARED_SRC))
@@ -0,0 +1,81 @@
+"""Score a large title corpus in fixed-size chunks; write (n_titles, n_scorers) scores to a .npy file.
+
+Usage:
+    python score_titles.py headlines.jsonl -o scores.npy
+    python score_titles.py ../googlenews-fetch-news/data/articles_*.yaml -o scores.npy --dtype float16
+
+Inputs: .jsonl (one article per line), .json / .yaml ({"articles": [...]} or a list), or plain text
+(one title per line). Titles are read twice (count, then score). For .jsonl and text inputs they
+are streamed, so peak memory is bounded by --chunk-size regardless of corpus size; .json and .yaml
+files are parsed whole (one file at a time, on each pass), so split large corpora into JSONL.
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import yaml
+
+from _embed_utils import STREAM_SCORERS, load_model, load_ref_sentences, stream_scores
+
+REF_V2 = Path(__file__).resolve().parent / "eco_ref_sentences_v2.txt"
+
+
+def _titles_from_records(records):
+    if isinstance(records, dict):
+        records = records.get("articles", [])
+    for r in records:
+        yield r["title"] if isinstance(r, dict) else str(r)
+
+
+def iter_titles(paths: list[Path]):
+    """Yield titles from each input file in order; .json / .yaml files are loaded whole, the rest streamed."""
+    for path in paths:
+        suffix = path.suffix.lower()
+        if suffix == ".jsonl":
+            with path.open(encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)["title"]
+        elif suffix == ".json":
+            yield from _titles_from_records(json.loads(path.read_text(encoding="utf-8")))
+        elif suffix in (".yaml", ".yml"):
+            yield from _titles_from_records(yaml.safe_load(path.read_text(encoding="utf-8")) or [])
+        else:
+            with path.open(encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield line.strip()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chunked, bounded-memory title scoring.")
+    parser.add_argument("inputs", nargs="+", type=Path, help="Input files (.jsonl, .json, .yaml or text)")
+    parser.add_argument("-o", "--output", type=Path, required=True, help="Output .npy (memory-mapped) path")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--refs", type=Path, default=REF_V2)
+    parser.add_argument("--chunk-size", type=int, default=2048)
+    parser.add_argument("--dtype", choices=["float32", "float16"], default="float32")
+    args = parser.parse_args()
+    inputs, out_path = args.inputs, args.output
+
+    model = load_model(args.model)
+    ref_sentences = load_ref_sentences(args.refs)
+    n_titles = sum(1 for _ in iter_titles(inputs))
+    print(f"Scoring {n_titles} titles against {len(ref_sentences)} refs in chunks of {args.chunk_size}")
+
+    t0 = time.perf_counter()
+    scores = stream_scores(model, ref_sentences, iter_titles(inputs), out_path, n_titles=n_titles,
+                           chunk_size=args.chunk_size, dtype=np.dtype(args.dtype))
+    elapsed = time.perf_counter() - t0
+    print(f"Columns: {', '.join(STREAM_SCORERS)}")
+    print(f"Written {scores.shape} to {out_path} in {elapsed:.2f}s ({n_titles / max(elapsed, 1e-9):.0f} titles/s)")
+
+
+if __name__ == "__main__":
+    import _shared  # noqa: F401  (puts ../googlenews-fetch-news/src on sys.path)
+    from import_profile import profile_imports_if_requested
+
+    profile_imports_if_requested()
+    main()
@@ -1,28 +1,44 @@
-"""Full grid search: model × refs × scoring × threshold. Top 10 by F1 and by accuracy; write results.md."""
+"""Full grid search: model × refs × scoring × threshold. Top 10 by F1 and by accuracy; write results.md.
+
+Each model is encoded in its own worker process (pool sized by available RAM, one model per
+process so its memory is released when done). Normalized embeddings are written to .npy files and
+memory-mapped by the scoring workers, which sweep thresholds per (model, refs, scoring) cell.
+
+Every finished cell is appended to results.sqlite (run id, config hash, timings); reruns skip cells
+already stored, and `--report` regenerates results.md from the store without computing anything.
+"""
+import argparse
+import multiprocessing as mp
+import tempfile
 import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from pathlib import Path
 
-from sentence_transformers import SentenceTransformer
+import numpy as np
 
 from _embed_utils import (
     POC_DIR,
-    compute_sims,
+    available_memory_mb,
     load_data,
+    load_model,
     load_ref_sentences,
     metrics,
+    normalize_rows,
     score_max,
     score_mean_all,
     score_top3_mean,
     score_weighted_max,
 )
+from _result_store import DEFAULT_DB, ResultStore, config_hash, file_digest
 
 REF_V1 = POC_DIR / "eco_ref_sentences.txt"
 REF_V2 = Path(__file__).resolve().parent / "eco_ref_sentences_v2.txt"
 
+# (label, hub id, approx. weights size in MB)
 MODELS = [
-    ("MiniLM-L6", "all-MiniLM-L6-v2"),
-    ("mpnet-base", "all-mpnet-base-v2"),
-    ("bge-small", "BAAI/bge-small-en-v1.5"),
+    ("MiniLM-L6", "all-MiniLM-L6-v2", 80),
+    ("mpnet-base", "all-mpnet-base-v2", 420),
+    ("bge-small", "BAAI/bge-small-en-v1.5", 130),
 ]
 
 SCORERS = [
@@ -35,32 +51,146 @@ SCORERS = [
 REFS = [("v1", REF_V1), ("v2", REF_V2)]
 THRESHOLDS = [round(x * 0.01, 2) for x in range(25, 51)]
 
+# Per encode worker: interpreter + torch runtime, plus a multiple of the weights for activations.
+WORKER_BASE_MB = 700
+WEIGHTS_FACTOR = 3
 
-def main():
-    titles, y_true = load_data()
-    results = []
-
-    for model_label, model_id in MODELS:
-        model = SentenceTransformer(model_id)
-        for ref_label, ref_path in REFS:
-            ref_sentences = load_ref_sentences(ref_path)
-            sims = compute_sims(model, ref_sentences, titles)
-            for scoring_name, scorer in SCORERS:
-                scores = scorer(sims)
-                for thresh in THRESHOLDS:
-                    y_pred = (scores >= thresh).tolist()
-                    acc, prec, rec, f1 = metrics(y_true, y_pred)
-                    results.append({
-                        "model": model_label,
-                        "refs": ref_label,
-                        "scoring": scoring_name,
-                        "threshold": thresh,
-                        "acc": acc,
-                        "prec": prec,
-                        "rec": rec,
-                        "f1": f1,
-                    })
 
+def encode_worker_mb(size_mb: int) -> int:
+    """Rough peak RSS of one encode worker for a model of size_mb weights."""
+    return WORKER_BASE_MB + WEIGHTS_FACTOR * size_mb
+
+
+def encode_pool_size(models, reserve_mb: int = 1024) -> int:
+    """How many models can be encoded at once without exceeding available RAM."""
+    budget = available_memory_mb() - reserve_mb
+    worst = max(encode_worker_mb(size_mb) for _, _, size_mb in models)
+    return max(1, min(len(models), budget // worst))
+
+
+def encode_model(model_label: str, model_id: str, titles: list[str], refs: dict[str, list[str]], out_dir: str) -> dict:
+    """Worker: encode titles once and every ref set; save normalized float32 .npy files.
+
+    Returns {"titles": path, "refs": {ref_label: path}, "seconds": float}.
+    """
+    t0 = time.perf_counter()
+    model = load_model(model_id)
+    out = Path(out_dir)
+    titles_path = out / f"{model_label}__titles.npy"
+    np.save(titles_path, normalize_rows(model.encode(titles)))
+    ref_paths = {}
+    for ref_label, ref_sentences in refs.items():
+        ref_paths[ref_label] = str(out / f"{model_label}__{ref_label}.npy")
+        np.save(ref_paths[ref_label], normalize_rows(model.encode(ref_sentences)))
+    return {"titles": str(titles_path), "refs": ref_paths, "seconds": time.perf_counter() - t0}
+
+
+def score_cell(model_label: str, ref_label: str, titles_path: str, refs_path: str, y_true: list[bool],
+               scoring_names: list[str]) -> dict[str, tuple[list[dict], float]]:
+    """Worker: sweep the given scorers × thresholds for one (model, refs) pair from memory-mapped embeddings.
+
+    Returns {scoring_name: (result rows, seconds)}.
+    """
+    art_norm = np.load(titles_path, mmap_mode="r")
+    ref_norm = np.load(refs_path, mmap_mode="r")
+    sims = np.dot(art_norm, ref_norm.T)
+    scorers = dict(SCORERS)
+    out = {}
+    for scoring_name in scoring_names:
+        t0 = time.perf_counter()
+        scores = scorers[scoring_name](sims)
+        results = []
+        for thresh in THRESHOLDS:
+            y_pred = (scores >= thresh).tolist()
+            acc, prec, rec, f1 = metrics(y_true, y_pred)
+            results.append({
+                "model": model_label,
+                "refs": ref_label,
+                "scoring": scoring_name,
+                "threshold": thresh,
+                "acc": acc,
+                "prec": prec,
+                "rec": rec,
+                "f1": f1,
+            })
+        out[scoring_name] = (results, time.perf_counter() - t0)
+    return out
+
+
+def grid_cells(models=MODELS) -> list[tuple[str, str, str, str, str]]:
+    """All (config_hash, model_label, model_id, ref_label, scoring) cells of the grid, in grid order."""
+    data_digest = file_digest(POC_DIR / "sampledata.yaml")
+    ref_digests = {ref_label: file_digest(ref_path) for ref_label, ref_path in REFS}
+    cells = []
+    for label, model_id, _ in models:
+        for ref_label, _ in REFS:
+            for scoring_name, _ in SCORERS:
+                cfg = config_hash(
+                    model_id=model_id,
+                    refs=ref_digests[ref_label],
+                    scoring=scoring_name,
+                    thresholds=THRESHOLDS,
+                    data=data_digest,
+                )
+                cells.append((cfg, label, model_id, ref_label, scoring_name))
+    return cells
+
+
+def run_grid(titles, y_true, store: ResultStore, run_id: str, models=MODELS,
+             encode_workers: int | None = None, score_workers: int | None = None) -> int:
+    """Compute missing grid cells and append each to the store as it finishes. Returns cells computed.
+
+    Models whose cells are all in the store are not loaded at all. Encoding runs in a RAM-sized
+    process pool; each (model, refs) pair is scored as soon as its model is encoded.
+    """
+    todo = [cell for cell in grid_cells(models) if not store.has_cell(cell[0])]
+    if not todo:
+        print("All grid cells already in the store; nothing to compute.")
+        return 0
+    todo_models = [m for m in models if any(cell[1] == m[0] for cell in todo)]
+    print(f"{len(todo)} cells to compute across {len(todo_models)} model(s)")
+
+    refs = {ref_label: load_ref_sentences(ref_path) for ref_label, ref_path in REFS}
+    encode_workers = encode_workers or encode_pool_size(todo_models)
+    ctx = mp.get_context("spawn")
+    print(f"Encoding {len(todo_models)} models with {encode_workers} worker(s); {available_memory_mb()} MB available")
+
+    computed = 0
+    with tempfile.TemporaryDirectory(prefix="tune_all_") as emb_dir, \
+            ProcessPoolExecutor(encode_workers, mp_context=ctx, max_tasks_per_child=1) as encode_pool, \
+            ProcessPoolExecutor(score_workers, mp_context=ctx) as score_pool:
+        pending = {
+            encode_pool.submit(encode_model, label, model_id, titles, refs, emb_dir): label
+            for label, model_id, _ in todo_models
+        }
+        encode_seconds = {}
+        score_futures = {}
+        while pending or score_futures:
+            done, _ = wait(list(pending) + list(score_futures), return_when=FIRST_COMPLETED)
+            for fut in done:
+                if fut in pending:
+                    label = pending.pop(fut)
+                    paths = fut.result()
+                    encode_seconds[label] = paths["seconds"]
+                    print(f"  encoded {label} in {paths['seconds']:.1f}s")
+                    for ref_label, refs_path in paths["refs"].items():
+                        cells = {c[4]: c[0] for c in todo if c[1] == label and c[3] == ref_label}
+                        if cells:
+                            sub = score_pool.submit(score_cell, label, ref_label, paths["titles"], refs_path,
+                                                    y_true, list(cells))
+                            score_futures[sub] = (label, ref_label, cells)
+                else:
+                    label, ref_label, cells = score_futures.pop(fut)
+                    for scoring_name, (rows, seconds) in fut.result().items():
+                        store.add_cell(run_id, cells[scoring_name], label, ref_label, scoring_name, rows,
+                                       encode_seconds=encode_seconds[label], score_seconds=seconds)
+                        computed += 1
+                    print(f"  stored {label} × {ref_label} ({len(cells)} scorers)")
+    return computed
+
+
+def render_report(results: list[dict]) -> str:
+    """Markdown report (top 10 by F1, by accuracy, recommended config) from result rows."""
     by_f1 = sorted(results, key=lambda r: (r["f1"], r["acc"]), reverse=True)
     by_acc = sorted(results, key=lambda r: (r["acc"], r["f1"]), reverse=True)
 
@@ -91,12 +221,57 @@ def main():
     out.append(f"- **Accuracy:** {best['acc']:.2f}")
     out.append(f"- **F1:** {best['f1']:.2f}")
     out.append("")
+    return "\n".join(out)
+
+
+def write_report(store: ResultStore, run_id: str | None = None) -> Path | None:
+    """Regenerate results.md from the current grid's cells in the store (grid order, so ties are stable)."""
+    order = {cell[0]: i for i, cell in enumerate(grid_cells())}
+    results = store.results(cfg_hashes=list(order), run_id=run_id)
+    if not results:
+        print("No stored results for the current grid.")
+        return None
+    results.sort(key=lambda r: (order[r["config_hash"]], r["threshold"]))
 
     out_path = Path(__file__).resolve().parent / "results.md"
-    out_path.write_text("\n".join(out), encoding="utf-8")
+    out_path.write_text(render_report(results), encoding="utf-8")
     print(out_path.read_text(encoding="utf-8"))
     print(f"Written to {out_path}")
+    return out_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full grid search over model × refs × scoring × threshold.")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help="SQLite result store (default: results.sqlite)")
+    parser.add_argument("--report", action="store_true", help="Only regenerate results.md from the store")
+    parser.add_argument("--run-id", default=None, help="With --report: only use cells computed by this run")
+    parser.add_argument("--runs", action="store_true", help="List stored runs and exit")
+    parser.add_argument("--encode-workers", type=int, default=None, help="Encode processes (default: sized by available RAM)")
+    parser.add_argument("--score-workers", type=int, default=None, help="Scoring processes (default: CPU count)")
+    args = parser.parse_args()
+
+    store = ResultStore(args.db)
+    try:
+        if args.runs:
+            for run in store.runs():
+                started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(run["started_at"]))
+                status = "done" if run["finished_at"] else "incomplete"
+                print(f"{run['run_id']}  {started}  {run['cells']:3d} cells  {run['score_seconds']:.2f}s scoring  {status}")
+            return
+        if not args.report:
+            titles, y_true = load_data()
+            run_id = store.start_run()
+            print(f"Run {run_id} -> {args.db}")
+            run_grid(titles, y_true, store, run_id, encode_workers=args.encode_workers, score_workers=args.score_workers)
+            store.finish_run(run_id)
+        write_report(store, run_id=args.run_id)
+    finally:
+        store.close()
 
 
 if __name__ == "__main__":
+    import _shared  # noqa: F401  (puts ../googlenews-fetch-news/src on sys.path)
+    from import_profile import profile_imports_if_requested
+
+    profile_imports_if_requested()
     main()
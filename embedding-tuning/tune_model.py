@@ -2,12 +2,11 @@
 import time
 from pathlib import Path
 
-from sentence_transformers import SentenceTransformer
-
 from _embed_utils import (
     POC_DIR,
     compute_sims,
     load_data,
+    load_model,
     load_ref_sentences,
     metrics,
     score_max,
@@ -29,7 +28,7 @@ def main():
     print("Model           Size    Threshold  Accuracy  Precision  Recall  F1     Time(s)")
     print("-" * 75)
     for model_id, label, size, thresh in MODELS:
-        model = SentenceTransformer(model_id)
+        model = load_model(model_id)
         t0 = time.perf_counter()
         sims = compute_sims(model, ref_sentences, titles)
         elapsed = time.perf_counter() - t0
@@ -40,4 +39,8 @@ def main():
 
 
 if __name__ == "__main__":
+    import _shared  # noqa: F401  (puts ../googlenews-fetch-news/src on sys.path)
+    from import_profile import profile_imports_if_requested
+
+    profile_imports_if_requested()
     main()
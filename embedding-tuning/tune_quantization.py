@@ -0,0 +1,75 @@
+"""Accuracy drop of compact embedding storage (int8 / binary, Matryoshka / PCA truncation) vs compute_sims.
+
+For each compression level: bytes per vector, mean |score error| of the per-article max score,
+Acc/F1 at the recommended threshold on first-pass scores, and Acc/F1 after exact rescoring of the
+top candidates per reference sentence.
+"""
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+from _embed_store import CompactEmbeddings
+from _embed_utils import compute_sims, load_data, load_model, load_ref_sentences, metrics, score_max
+
+REF_V2 = Path(__file__).resolve().parent / "eco_ref_sentences_v2.txt"
+
+# (quant, dims, reduce); dims=None keeps the model's full dimension.
+LEVELS = [
+    ("float32", None, "matryoshka"),
+    ("int8", None, "matryoshka"),
+    ("int8", 256, "matryoshka"),
+    ("int8", 128, "matryoshka"),
+    ("int8", 48, "pca"),
+    ("binary", None, "matryoshka"),
+    ("binary", 256, "matryoshka"),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare compact embedding storage against full-precision scores.")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--threshold", type=float, default=0.34)
+    parser.add_argument("--rescore", type=int, default=10, help="Candidates rescored exactly per reference")
+    args = parser.parse_args()
+
+    titles, y_true = load_data()
+    ref_sentences = load_ref_sentences(REF_V2)
+    model = load_model(args.model)
+
+    exact = score_max(compute_sims(model, ref_sentences, titles))
+    title_emb = model.encode(titles)
+    ref_emb = model.encode(ref_sentences)
+    full_dim = title_emb.shape[1]
+    acc0, _, _, f1_0 = metrics(y_true, (exact >= args.threshold).tolist())
+
+    print(f"Model: {args.model} ({full_dim}-dim), threshold={args.threshold:.2f}, rescore top {args.rescore} per ref")
+    print(f"Baseline (compute_sims): Acc={acc0:.2f}  F1={f1_0:.2f}  {full_dim * 4} bytes/vector\n")
+    print("Level                 Bytes  Ratio  MeanErr   Acc   F1    dAcc   dF1  | Rescored Acc   F1    dAcc   dF1")
+    print("-" * 104)
+    for quant, dims, reduce in LEVELS:
+        if dims is not None and dims >= full_dim:
+            continue
+        store = CompactEmbeddings(quant, dims, reduce).fit(title_emb)
+        approx = store.approx_scores(ref_emb)  # (n_refs, n_titles)
+        first_pass = approx.max(axis=0)
+        acc, _, _, f1 = metrics(y_true, (first_pass >= args.threshold).tolist())
+
+        idx, scores = store.search(ref_emb, k=args.rescore, rescore=args.rescore)
+        np.put_along_axis(approx, idx, scores, axis=1)
+        rescored = approx.max(axis=0)
+        acc_r, _, _, f1_r = metrics(y_true, (rescored >= args.threshold).tolist())
+
+        label = f"{quant}/{dims or full_dim}" + (f" {reduce}" if dims else "")
+        err = float(np.mean(np.abs(first_pass - exact)))
+        ratio = full_dim * 4 / store.bytes_per_vector
+        print(f"{label:20}  {store.bytes_per_vector:5d}  {ratio:4.0f}x  {err:7.4f}  {acc:.2f}  {f1:.2f}  {acc - acc0:+.2f}  {f1 - f1_0:+.2f}  |"
+              f"          {acc_r:.2f}  {f1_r:.2f}  {acc_r - acc0:+.2f}  {f1_r - f1_0:+.2f}")
+
+
+if __name__ == "__main__":
+    import _shared  # noqa: F401  (puts ../googlenews-fetch-news/src on sys.path)
+    from import_profile import profile_imports_if_requested
+
+    profile_imports_if_requested()
+    main()
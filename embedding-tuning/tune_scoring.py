@@ -1,12 +1,11 @@
 """Compare scoring strategies: max, top3_mean, mean_all, weighted_max. Report best threshold + metrics per strategy × ref set."""
 from pathlib import Path
 
-from sentence_transformers import SentenceTransformer
-
 from _embed_utils import (
     POC_DIR,
     compute_sims,
     load_data,
+    load_model,
     load_ref_sentences,
     metrics,
     score_max,
@@ -45,7 +44,7 @@ def best_for_scores(scores, y_true):
 
 def main():
     titles, y_true = load_data()
-    model = SentenceTransformer("all-MiniLM-L6-v2")
+    model = load_model("all-MiniLM-L6-v2")
 
     for ref_name, ref_path in [("v1", REF_V1), ("v2", REF_V2)]:
         ref_sentences = load_ref_sentences(ref_path)
@@ -58,4 +57,8 @@ def main():
 
 
 if __name__ == "__main__":
+    import _shared  # noqa: F401  (puts ../googlenews-fetch-news/src on sys.path)
+    from import_profile import profile_imports_if_requested
+
+    profile_imports_if_requested()
     main()
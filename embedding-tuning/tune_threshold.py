@@ -1,12 +1,11 @@
 """Grid search threshold 0.25–0.50 (step 0.01) for v1 and v2 refs; report best F1 and best accuracy."""
 from pathlib import Path
 
-from sentence_transformers import SentenceTransformer
-
 from _embed_utils import (
     POC_DIR,
     compute_sims,
     load_data,
+    load_model,
     load_ref_sentences,
     metrics,
     score_max,
@@ -45,11 +44,15 @@ def run_ref_set(name: str, ref_path: Path, titles, y_true, model):
 
 def main():
     titles, y_true = load_data()
-    model = SentenceTransformer("all-MiniLM-L6-v2")
+    model = load_model("all-MiniLM-L6-v2")
 
     run_ref_set("v1", REF_V1, titles, y_true, model)
     run_ref_set("v2", REF_V2, titles, y_true, model)
 
 
 if __name__ == "__main__":
+    import _shared  # noqa: F401  (puts ../googlenews-fetch-news/src on sys.path)
+    from import_profile import profile_imports_if_requested
+
+    profile_imports_if_requested()
     main()
@@ -0,0 +1,43 @@
+"""
+Access to modules shared with sibling projects
+
+google-news-check deliberately depends on two sibling projects of this
+repository. They are plain script directories, not installed packages, so
+their directories are put on sys.path here. Import this before importing
+from them:
+- ../googlenews-fetch-news/src  (article, url_resolver, gnews_client,
+                                import_profile, ...); inserted first
+- ../poc-eco-classify           (method_embedding, bundle_model); appended
+
+Module names are flat, so the three directories must not define the same
+module name (otherwise one silently shadows the other). A collision is
+reported as a warning on import; rename the newer module if one appears.
+"""
+
+import sys
+import warnings
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+SHARED_SRC = HERE.parent / 'googlenews-fetch-news' / 'src'
+CLASSIFY_DIR = HERE.parent / 'poc-eco-classify'
+
+if str(SHARED_SRC) not in sys.path:
+    sys.path.insert(0, str(SHARED_SRC))
+if str(CLASSIFY_DIR) not in sys.path:
+    sys.path.append(str(CLASSIFY_DIR))
+
+
+def module_collisions():
+    """{module name: [directories]} for names defined in more than one of the three directories"""
+    owners = {}
+    for directory in (SHARED_SRC, HERE, CLASSIFY_DIR):
+        for path in directory.glob('*.py'):
+            if path.stem not in ('_shared', '__init__'):
+                owners.setdefault(path.stem, []).append(directory.name)
+    return {name: dirs for name, dirs in owners.items() if len(dirs) > 1}
+
+
+for _name, _dirs in module_collisions().items():
+    warnings.warn(f"module {_name!r} exists in {', '.join(_dirs)}; "
+                  f"the first one on sys.path shadows the others", stacklevel=2)
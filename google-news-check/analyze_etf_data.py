@@ -1,133 +1,165 @@
 #!/usr/bin/env python3
 """
 Quick analysis of ETF news data
-"""
 
-import json
-import pandas as pd
-from collections import Counter
-from datetime import datetime
-import re
+All inputs are loaded once into a single DataFrame; dates, tickers, sources
+and topics are computed with vectorized pandas operations. Tickers come from
+the local ETF symbol dictionary (etf_entities.py).
 
-def load_data():
-    """Load the ETF news data"""
-    with open('etf_news_full_data.json', 'r') as f:
-        return json.load(f)
+Usage:
+    python analyze_etf_data.py                                  # etf_news_full_data.json
+    python analyze_etf_data.py --input etf_news_*days.json archive.jsonl
+"""
 
-def analyze_sources(articles):
+import argparse
+from pathlib import Path
+
+# pandas is imported inside the functions that build frames, so --help stays instant
+import _shared  # noqa: F401  (puts ../googlenews-fetch-news/src on sys.path)
+from article import iter_records
+from etf_entities import EntityRecognizer
+from text_store import report_missing
+from topic_tagger import load_tagger
+
+ENTITY_CACHE = Path('etf_entities_cache.json')
+# Tried in order on the rows still unparsed; GNews dates are GMT, and a literal GMT
+# parses ~5x faster than %Z
+DATE_FORMATS = ("%a, %d %b %Y %H:%M:%S GMT", "%a, %d %b %Y %H:%M:%S %Z", "ISO8601")
+
+def normalize_columns(df):
+    """etf_news column names for raw GNews and stage1 frames: source from publisher(.title), published from published date"""
+    if 'publisher' in df:
+        # stage1 stores the name, raw GNews a {"title": ...} dict (an object column)
+        names = df['publisher'].str.strip()
+        if df['publisher'].dtype == object:
+            names = names.fillna(df['publisher'].str.get('title'))
+        df['source'] = names.where(names.fillna('').ne(''), df['source'] if 'source' in df else '')
+        df = df.drop(columns='publisher')
+    if 'published date' in df:
+        df['published'] = df['published'].fillna(df['published date']) if 'published' in df else df['published date']
+        df = df.drop(columns='published date')
+    return df
+
+def parse_dates(published):
+    """UTC timestamps for a column of published strings (GNews, stage1 or ISO dates); NaT if unparseable"""
+    import pandas as pd
+
+    parsed = pd.Series(pd.NaT, index=published.index, dtype='datetime64[us, UTC]')
+    rest = published.ne('')
+    for fmt in DATE_FORMATS:
+        if not rest.any():
+            break
+        parsed[rest] = pd.to_datetime(published[rest], format=fmt, errors='coerce', utc=True)
+        rest &= parsed.isna()
+    return parsed
+
+def load_data(paths=('etf_news_full_data.json',)):
+    """Load JSON ({"articles": [...]}), stage1 YAML and JSONL files into one DataFrame.
+
+    Raw records come from the shared loader (article.iter_records); field names
+    are normalized and dates parsed column-wise.
+    Returns (df, metadata) where metadata is the list of per-file headers
+    (search_query, fetched_at, total_results, ...).
+    """
+    import pandas as pd
+
+    frames = []
+    metadata = []
+    for path in map(Path, paths):
+        header = {}
+        frames.append(normalize_columns(pd.DataFrame.from_records(list(iter_records(path, header)))))
+        metadata.append({'file': str(path), 'total_results': len(frames[-1]), **header})
+
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    for column in ('title', 'source', 'published', 'url'):
+        if column not in df:
+            df[column] = ''
+    df[['title', 'source', 'published']] = df[['title', 'source', 'published']].fillna('')
+    df['published_at'] = parse_dates(df['published'])
+    return df, metadata
+
+def analyze_sources(df):
     """Analyze source distribution"""
-    sources = [a['source'] for a in articles]
-    source_counts = Counter(sources)
+    source_counts = df['source'].value_counts()
 
     print("\n" + "="*60)
     print("SOURCE ANALYSIS")
     print("="*60)
     print(f"Total unique sources: {len(source_counts)}")
     print(f"\nTop 10 sources:")
-    for source, count in source_counts.most_common(10):
+    for source, count in source_counts.head(10).items():
         print(f"  {count:2d}  {source}")
 
-def analyze_dates(articles):
+def analyze_dates(df):
     """Analyze publication dates"""
     print("\n" + "="*60)
     print("DATE ANALYSIS")
     print("="*60)
 
-    dates = []
-    for a in articles:
-        if a['published']:
-            # Parse the date string
-            try:
-                date_str = a['published']
-                # Extract just the date part
-                if ',' in date_str:
-                    parts = date_str.split(',')
-                    if len(parts) >= 2:
-                        dates.append(parts[1].strip().split()[0])
-            except:
-                pass
-
-    date_counts = Counter(dates)
+    dated = df['published_at'].dropna()
+    date_counts = dated.groupby(dated.dt.date).size().sort_index()
     print(f"Articles by date:")
-    for date, count in sorted(date_counts.items()):
+    for date, count in date_counts.items():
         print(f"  {date}: {count} articles")
+    unparsed = len(df) - len(dated)
+    if unparsed:
+        print(f"  (no parseable date: {unparsed} articles)")
 
-def extract_etf_tickers(articles):
-    """Extract ETF ticker symbols from titles"""
+def extract_etf_tickers(df):
+    """ETF tickers mentioned in titles and full text (dictionary-backed, see etf_entities.py)"""
     print("\n" + "="*60)
     print("ETF TICKERS MENTIONED")
     print("="*60)
 
-    # Common ETF ticker patterns
-    tickers = []
-    for a in articles:
-        title = a['title']
-        # Find capitalized words 2-5 letters long (likely tickers)
-        matches = re.findall(r'\b[A-Z]{2,5}\b', title)
-        tickers.extend(matches)
+    import pandas as pd
 
-    ticker_counts = Counter(tickers)
-    # Filter out common words
-    common_words = {'ETF', 'US', 'USA', 'UK', 'CEO', 'API', 'USD', 'THE'}
+    recognizer = EntityRecognizer(cache_path=ENTITY_CACHE)
+    records = df.reindex(columns=['title', 'full_text', 'text_hash', 'text_store']).fillna('').to_dict('records')
+    tickers = pd.Series([recognizer.recognize_article(r)['tickers'] for r in records], index=df.index)
+    recognizer.save_cache()
+    report_missing()
+    ticker_counts = tickers.explode().dropna().value_counts()
 
     print("Top ticker mentions:")
-    for ticker, count in ticker_counts.most_common(20):
-        if ticker not in common_words and count > 1:
-            print(f"  {ticker}: {count} times")
+    for ticker, count in ticker_counts.head(20).items():
+        print(f"  {ticker}: {count} articles ({recognizer.issuer_of[ticker]})")
 
-def analyze_topics(articles):
+def analyze_topics(df):
     """Analyze topics from titles"""
     print("\n" + "="*60)
     print("TOPIC ANALYSIS")
     print("="*60)
 
-    # Keywords to look for
-    topics = {
-        'Bitcoin/Crypto': ['bitcoin', 'crypto', 'blockchain'],
-        'Vanguard': ['vanguard'],
-        'BlackRock': ['blackrock'],
-        'iShares': ['ishares'],
-        'Gold/Silver': ['gold', 'silver'],
-        'Dividend': ['dividend'],
-        'Bond': ['bond', 'treasury'],
-        'International': ['china', 'international', 'global', 'emerging'],
-        'Sector': ['tech', 'healthcare', 'software', 'space'],
-        'Strategy': ['momentum', 'value', 'growth', 'volatility', 'vol']
-    }
-
-    topic_counts = {topic: 0 for topic in topics}
-
-    for a in articles:
-        title_lower = a['title'].lower()
-        for topic, keywords in topics.items():
-            if any(keyword in title_lower for keyword in keywords):
-                topic_counts[topic] += 1
+    import pandas as pd
+
+    topics = pd.Series(load_tagger().tag_many(df['title'], default=None), index=df.index)
+    topic_counts = topics.explode().dropna().value_counts()
 
     print("Articles by topic:")
-    for topic, count in sorted(topic_counts.items(), key=lambda x: x[1], reverse=True):
-        if count > 0:
-            print(f"  {topic}: {count} articles")
+    for topic, count in topic_counts.items():
+        print(f"  {topic}: {count} articles")
 
-def create_summary_stats(data):
+def create_summary_stats(df, metadata):
     """Create overall summary statistics"""
-    articles = data['articles']
-
     print("\n" + "="*60)
     print("SUMMARY STATISTICS")
     print("="*60)
-    print(f"Search query: {data['search_query']}")
-    print(f"Data fetched: {data['fetched_at']}")
-    print(f"Total articles: {data['total_results']}")
-    print(f"Successfully processed: {len(articles)}")
-
-def export_for_analysis():
-    """Export data in analysis-friendly format"""
-    df = pd.read_csv('etf_news_analysis.csv')
-
+    for meta in metadata:
+        print(f"File: {meta['file']}")
+        if 'search_query' in meta:
+            print(f"  Search query: {meta['search_query']}")
+        if 'fetched_at' in meta:
+            print(f"  Data fetched: {meta['fetched_at']}")
+        print(f"  Total articles: {meta.get('total_results', '?')}")
+    print(f"Successfully processed: {len(df)}")
+    print(f"Unique URLs: {df['url'].nunique()}")
+
+def export_for_analysis(df):
+    """Show the analysis DataFrame"""
     print("\n" + "="*60)
     print("PANDAS DATAFRAME INFO")
     print("="*60)
-    print(df.info())
+    df.info()
 
     print("\n" + "="*60)
     print("SAMPLE RECORDS")
@@ -135,25 +167,24 @@ def export_for_analysis():
     print(df[['title', 'source', 'published']].head())
 
 def main():
+    parser = argparse.ArgumentParser(description='Quick analysis of ETF news data')
+    parser.add_argument('--input', nargs='+', default=['etf_news_full_data.json'],
+                        help='One or more JSON ({"articles": [...]}), stage1 YAML or JSONL files')
+    args = parser.parse_args()
+
     print("\nETF NEWS DATA ANALYSIS")
     print("="*60)
 
-    # Load data
-    data = load_data()
-    articles = data['articles']
+    # Load data (once, for every analysis)
+    df, metadata = load_data(args.input)
 
     # Run analyses
-    create_summary_stats(data)
-    analyze_sources(articles)
-    analyze_dates(articles)
-    analyze_topics(articles)
-    extract_etf_tickers(articles)
-
-    # Pandas analysis
-    try:
-        export_for_analysis()
-    except Exception as e:
-        print(f"\nNote: Install pandas for dataframe analysis: uv pip install pandas")
+    create_summary_stats(df, metadata)
+    analyze_sources(df)
+    analyze_dates(df)
+    analyze_topics(df)
+    extract_etf_tickers(df)
+    export_for_analysis(df)
 
     print("\n" + "="*60)
     print("Analysis complete! Data files available:")
@@ -163,4 +194,7 @@ def main():
     print("="*60 + "\n")
 
 if __name__ == "__main__":
+    from import_profile import profile_imports_if_requested
+
+    profile_imports_if_requested()
     main()
@@ -3,157 +3,125 @@
 Analyze ETF news publishers to identify sources of interest
 """
 
-import json
+import heapq
 from collections import Counter, defaultdict
-import re
+
+import _shared  # noqa: F401  (puts ../googlenews-fetch-news/src on sys.path)
+from article import iter_articles
+from topic_tagger import load_tagger
 
 def load_data(filename='etf_news_3days.json'):
-    """Load the ETF news data"""
-    with open(filename, 'r') as f:
-        return json.load(f)
+    """Load the ETF news data: file header fields plus 'articles' as Article records"""
+    header = {}
+    articles = list(iter_articles(filename, header))
+    return {**header, 'articles': articles}
 
-def analyze_publisher_coverage(articles):
-    """Analyze what each publisher covers"""
+class PublisherStats:
+    """Everything the report needs about one publisher, filled in a single pass"""
 
-    publisher_articles = defaultdict(list)
+    __slots__ = ('name', 'count', 'topics', 'samples')
 
-    for article in articles:
-        source = article['source']
-        publisher_articles[source].append({
-            'title': article['title'],
-            'date': article['published']
-        })
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.topics = Counter()
+        self.samples = []
 
-    return publisher_articles
+    @property
+    def diversity(self):
+        """How many different topics they cover"""
+        return len(self.topics)
 
 def extract_topics_from_title(title):
-    """Extract topics/keywords from article title"""
-    topics = []
-
-    title_lower = title.lower()
-
-    # ETF providers
-    if 'vanguard' in title_lower:
-        topics.append('Vanguard')
-    if 'ishares' in title_lower or 'blackrock' in title_lower:
-        topics.append('iShares/BlackRock')
-    if 'spdr' in title_lower or 's&p' in title_lower:
-        topics.append('SPDR/S&P')
-
-    # Asset classes
-    if 'bitcoin' in title_lower or 'crypto' in title_lower or 'btc' in title_lower:
-        topics.append('Bitcoin/Crypto')
-    if 'gold' in title_lower or 'silver' in title_lower:
-        topics.append('Precious Metals')
-    if 'bond' in title_lower or 'treasury' in title_lower or 'fixed income' in title_lower:
-        topics.append('Bonds')
-
-    # Strategies
-    if 'dividend' in title_lower:
-        topics.append('Dividend')
-    if 'value' in title_lower:
-        topics.append('Value')
-    if 'growth' in title_lower:
-        topics.append('Growth')
-    if 'momentum' in title_lower:
-        topics.append('Momentum')
-    if 'covered call' in title_lower:
-        topics.append('Covered Call')
-
-    # Sectors
-    if 'tech' in title_lower or 'software' in title_lower:
-        topics.append('Technology')
-    if 'healthcare' in title_lower or 'health' in title_lower:
-        topics.append('Healthcare')
-    if 'energy' in title_lower:
-        topics.append('Energy')
-
-    # Geography
-    if 'china' in title_lower or 'chinese' in title_lower:
-        topics.append('China')
-    if 'international' in title_lower or 'global' in title_lower or 'emerging' in title_lower:
-        topics.append('International')
-
-    # Content type
-    if any(word in title_lower for word in ['buy', 'sell', 'invest', 'portfolio']):
-        topics.append('Investment Advice')
-    if any(word in title_lower for word in ['launches', 'announces', 'files', 'debuts']):
-        topics.append('Product News')
-    if any(word in title_lower for word in ['flows', 'inflows', 'volume', 'assets']):
-        topics.append('Market Data')
-
-    return topics if topics else ['General']
-
-def analyze_publisher_focus(publisher_articles):
-    """Analyze what topics each publisher focuses on"""
-
-    publisher_topics = defaultdict(Counter)
-
-    for publisher, articles in publisher_articles.items():
-        for article in articles:
-            topics = extract_topics_from_title(article['title'])
-            for topic in topics:
-                publisher_topics[publisher][topic] += 1
-
-    return publisher_topics
+    """Extract topics/keywords from article title (taxonomy in topics.yaml)"""
+    return load_tagger().tag(title)
 
-def rank_publishers(articles):
-    """Rank publishers by various metrics"""
+def aggregate_publishers(articles, n_samples=3):
+    """One streaming pass over articles: per-publisher counts, topic histograms and sample headlines.
 
-    # Count articles per publisher
-    publisher_counts = Counter(a['source'] for a in articles)
-
-    # Analyze topics
-    publisher_articles = analyze_publisher_coverage(articles)
-    publisher_topics = analyze_publisher_focus(publisher_articles)
-
-    # Calculate diversity score (how many different topics they cover)
-    publisher_diversity = {
-        pub: len(topics) for pub, topics in publisher_topics.items()
+    Returns {publisher: PublisherStats} in first-seen order.
+    """
+    tagger = load_tagger()
+    stats = {}
+    for article in articles:
+        source = article['source']
+        pub = stats.get(source)
+        if pub is None:
+            pub = stats[source] = PublisherStats(source)
+        pub.count += 1
+        # Enriched data (run_publisher_analysis enrich stage) already carries topics
+        pub.topics.update(article.get('topics') or tagger.tag(article['title']))
+        if len(pub.samples) < n_samples:
+            pub.samples.append(article['title'])
+    return stats
+
+def top_publishers(stats, n=None):
+    """Publishers by article count (ties keep first-seen order)"""
+    ranked = sorted(stats.values(), key=lambda p: p.count, reverse=True)
+    return ranked[:n] if n else ranked
+
+def category_rankings(stats, categories, top=3):
+    """Top publishers per topic category, from one pass over the per-publisher stats"""
+    ranked = {category: [] for category in categories}
+    for pub in stats.values():
+        for category in categories:
+            count = pub.topics.get(category, 0)
+            if count:
+                ranked[category].append((pub.name, count))
+    return {
+        category: heapq.nlargest(top, pubs, key=lambda x: x[1])
+        for category, pubs in ranked.items()
     }
 
+def topic_specialists(stats, min_count=2, top_topics=3):
+    """Group publishers by their main topics: topic -> [(publisher, count)] sorted by count"""
+    specialists = defaultdict(list)
+    for pub in stats.values():
+        for topic, count in pub.topics.most_common(top_topics):
+            if count >= min_count:
+                specialists[topic].append((pub.name, count))
+    for pubs in specialists.values():
+        pubs.sort(key=lambda x: x[1], reverse=True)
+    return specialists
+
+def rank_publishers(articles):
+    """Rank publishers by various metrics: (counts, topic histograms, diversity)"""
+    stats = aggregate_publishers(articles)
+    publisher_counts = Counter({name: pub.count for name, pub in stats.items()})
+    publisher_topics = {name: pub.topics for name, pub in stats.items()}
+    publisher_diversity = {name: pub.diversity for name, pub in stats.items()}
     return publisher_counts, publisher_topics, publisher_diversity
 
-def main():
+def main(filename='etf_news_3days.json'):
     print("\n" + "="*80)
     print("PUBLISHER ANALYSIS - Find Your Interest")
     print("="*80)
 
-    data = load_data()
+    data = load_data(filename)
     articles = data['articles']
 
     print(f"\nAnalyzing {len(articles)} articles from {data['date_range']['days_covered']} days")
     print(f"Date range: {data['date_range']['dates'][-1]} to {data['date_range']['dates'][0]}")
 
-    # Get publisher statistics
-    publisher_counts, publisher_topics, publisher_diversity = rank_publishers(articles)
+    # Get publisher statistics (one pass over the articles)
+    stats = aggregate_publishers(articles)
+    ranked = top_publishers(stats)
 
     print("\n" + "="*80)
     print("TOP PUBLISHERS BY VOLUME")
     print("="*80)
 
-    for i, (publisher, count) in enumerate(publisher_counts.most_common(20), 1):
-        diversity = publisher_diversity.get(publisher, 0)
-        print(f"{i:2d}. {publisher:40s} {count:3d} articles, {diversity:2d} topics")
+    for i, pub in enumerate(ranked[:20], 1):
+        print(f"{i:2d}. {pub.name:40s} {pub.count:3d} articles, {pub.diversity:2d} topics")
 
     print("\n" + "="*80)
     print("PUBLISHERS BY SPECIALIZATION")
     print("="*80)
 
-    # Group publishers by their main topics
-    topic_specialists = defaultdict(list)
-
-    for publisher, topics in publisher_topics.items():
-        # Get top 3 topics for this publisher
-        top_topics = topics.most_common(3)
-        for topic, count in top_topics:
-            if count >= 2:  # At least 2 articles on this topic
-                topic_specialists[topic].append((publisher, count))
-
-    for topic in sorted(topic_specialists.keys()):
-        publishers = sorted(topic_specialists[topic], key=lambda x: x[1], reverse=True)
+    specialists = topic_specialists(stats)
+    for topic in sorted(specialists.keys()):
         print(f"\n{topic}:")
-        for pub, count in publishers[:5]:  # Top 5 per topic
+        for pub, count in specialists[topic][:5]:  # Top 5 per topic
             print(f"  - {pub}: {count} articles")
 
     print("\n" + "="*80)
@@ -161,22 +129,20 @@ def main():
     print("="*80)
 
     # Detailed profile for top 10 publishers
-    for publisher, count in publisher_counts.most_common(10):
-        print(f"\n{publisher} ({count} articles)")
+    for pub in ranked[:10]:
+        print(f"\n{pub.name} ({pub.count} articles)")
         print("-" * 60)
 
         # Show their topic coverage
-        topics = publisher_topics[publisher]
         print("Topics covered:")
-        for topic, topic_count in topics.most_common(5):
-            pct = (topic_count / count) * 100
+        for topic, topic_count in pub.topics.most_common(5):
+            pct = (topic_count / pub.count) * 100
             print(f"  {topic:25s} {topic_count:2d} articles ({pct:4.1f}%)")
 
         # Show sample headlines
-        articles_by_pub = [a for a in articles if a['source'] == publisher]
         print("\nSample headlines:")
-        for article in articles_by_pub[:3]:
-            title = article['title'][:70] + "..." if len(article['title']) > 70 else article['title']
+        for title in pub.samples:
+            title = title[:70] + "..." if len(title) > 70 else title
             print(f"  • {title}")
 
     print("\n" + "="*80)
@@ -186,37 +152,31 @@ def main():
     print("\nBased on coverage patterns, consider these publishers for:")
 
     print("\n📊 Comprehensive ETF Coverage:")
-    for pub, count in publisher_counts.most_common(5):
-        print(f"  • {pub} ({count} articles)")
+    for pub in ranked[:5]:
+        print(f"  • {pub.name} ({pub.count} articles)")
+
+    rankings = category_rankings(stats, ['Investment Advice', 'Market Data', 'Product News'])
 
     print("\n🎯 Specific Investment Advice:")
-    advice_pubs = [(p, c) for p, c in publisher_counts.items()
-                   if 'Investment Advice' in publisher_topics[p]]
-    for pub, _ in sorted(advice_pubs, key=lambda x: publisher_topics[x[0]]['Investment Advice'], reverse=True)[:3]:
-        count = publisher_topics[pub]['Investment Advice']
+    for pub, count in rankings['Investment Advice']:
         print(f"  • {pub} ({count} advice articles)")
 
     print("\n📈 Market Data & Analysis:")
-    data_pubs = [(p, c) for p, c in publisher_counts.items()
-                 if 'Market Data' in publisher_topics[p]]
-    for pub, _ in sorted(data_pubs, key=lambda x: publisher_topics[x[0]]['Market Data'], reverse=True)[:3]:
-        count = publisher_topics[pub]['Market Data']
+    for pub, count in rankings['Market Data']:
         print(f"  • {pub} ({count} data articles)")
 
     print("\n🆕 New Product Launches:")
-    product_pubs = [(p, c) for p, c in publisher_counts.items()
-                    if 'Product News' in publisher_topics[p]]
-    for pub, _ in sorted(product_pubs, key=lambda x: publisher_topics[x[0]]['Product News'], reverse=True)[:3]:
-        count = publisher_topics[pub]['Product News']
+    for pub, count in rankings['Product News']:
         print(f"  • {pub} ({count} product news)")
 
     print("\n" + "="*80)
     print("\n✓ Analysis complete!")
     print("\nNext steps:")
     print("  1. Review publisher profiles above")
-    print("  2. Check etf_news_3days.json for full data")
+    print(f"  2. Check {filename} for full data")
     print("  3. Run fetch_etf_news_multiday.py to get more days if needed")
     print("="*80 + "\n")
 
 if __name__ == "__main__":
-    main()
+    import sys
+    main(*sys.argv[1:2])
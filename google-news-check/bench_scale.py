@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Scale benchmark for the fetch and analysis code on a synthetic corpus
+
+Times, at each corpus size:
+- stage1_filter       googlenews-fetch-news stage1 whitelist / processed / in-batch dedup
+- multiday_merge      fetch_articles_for_days merging (merge_batch over 100-article batches)
+- publisher_aggregate analyze_publishers.aggregate_publishers
+- topic_tagging       topic_tagger.tag_many over all titles
+
+The corpus comes from googlenews-fetch-news/src/synthetic_news.py (deterministic
+for a given seed) and is streamed to each case in --batch sized chunks, so the
+corpus itself never sits in memory; peak RSS grows only with each case's own
+state (dedup sets, merged article list, per-publisher stats). Generation time
+is excluded from the timings. Results are saved as JSON so runs can be compared.
+
+Usage:
+    python bench_scale.py                              # 10k, 100k
+    python bench_scale.py --scales 10000 100000 1000000 10000000 -o bench_results/big.json
+"""
+
+import argparse
+import gc
+import json
+import platform
+import resource
+import sys
+import time
+from datetime import datetime
+from itertools import chain, islice
+from pathlib import Path
+
+import _shared  # noqa: F401  (puts ../googlenews-fetch-news/src on sys.path)
+from synthetic_news import generate, publisher_names
+
+CASES = ('stage1_filter', 'multiday_merge', 'publisher_aggregate', 'topic_tagging')
+BATCH_SIZE = 100
+
+def to_record(article):
+    """etf_news_*.json record shape (as written by fetch_etf_news_multiday.build_output)"""
+    return {
+        'title': article['title'],
+        'source': article['publisher']['title'],
+        'published': article['published date'],
+        'url': article['url'],
+    }
+
+class CorpusStream:
+    """Regenerates the corpus in (raw, records) batches; `overhead` is the time spent generating"""
+
+    def __init__(self, n, seed, publishers, batch):
+        self.n, self.seed, self.publishers, self.batch = n, seed, publishers, batch
+        self.overhead = 0.0
+
+    def __iter__(self):
+        self.overhead = 0.0
+        articles = generate(self.n, seed=self.seed, publishers=self.publishers)
+        while True:
+            t0 = time.perf_counter()
+            raw = list(islice(articles, self.batch))
+            records = [to_record(a) for a in raw]
+            self.overhead += time.perf_counter() - t0
+            if not raw:
+                return
+            yield raw, records
+
+def bench_stage1_filter(stream):
+    from stage1_fetch import filter_articles
+    from run_stats import RunStats
+
+    # 20 most prolific publishers whitelisted, ~10% of URLs already processed; batches are
+    # filtered like successive stage1 runs (kept URLs join the processed set)
+    whitelist = set(publisher_names(20))
+    processed = set()
+    stats = RunStats('bench')
+    seconds, kept = 0.0, 0
+    for raw, _ in stream:
+        processed.update(a['url'] for a in raw[::10])
+        t0 = time.perf_counter()
+        out = filter_articles(raw, whitelist, processed, {}, stats)
+        processed.update(a['url'] for a in out)
+        seconds += time.perf_counter() - t0
+        kept += len(out)
+    return seconds, {'kept': kept, 'drops': dict(stats.drops)}
+
+def bench_multiday_merge(stream):
+    from fetch_etf_news_multiday import merge_batch
+
+    all_articles, seen_urls, dates_seen = [], set(), set()
+    seconds = 0.0
+    for raw, _ in stream:
+        t0 = time.perf_counter()
+        for i in range(0, len(raw), BATCH_SIZE):
+            merge_batch(raw[i:i + BATCH_SIZE], all_articles, seen_urls, dates_seen)
+        seconds += time.perf_counter() - t0
+    return seconds, {'kept': len(all_articles), 'dates': len(dates_seen)}
+
+def bench_publisher_aggregate(stream):
+    from analyze_publishers import aggregate_publishers, top_publishers
+
+    # One streaming pass over all batches; generation time is subtracted
+    t0 = time.perf_counter()
+    stats = aggregate_publishers(chain.from_iterable(records for _, records in stream))
+    top_publishers(stats, 20)
+    return time.perf_counter() - t0 - stream.overhead, {'publishers': len(stats)}
+
+def bench_topic_tagging(stream):
+    from topic_tagger import load_tagger
+
+    tagger = load_tagger()
+    seconds, tagged = 0.0, 0
+    for _, records in stream:
+        titles = [r['title'] for r in records]
+        t0 = time.perf_counter()
+        tags = tagger.tag_many(titles)
+        seconds += time.perf_counter() - t0
+        tagged += sum(1 for t in tags if t != ['General'])
+    return seconds, {'tagged': tagged}
+
+BENCHES = {
+    'stage1_filter': bench_stage1_filter,
+    'multiday_merge': bench_multiday_merge,
+    'publisher_aggregate': bench_publisher_aggregate,
+    'topic_tagging': bench_topic_tagging,
+}
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1 << 20) if sys.platform == 'darwin' else peak / 1024
+
+def main():
+    parser = argparse.ArgumentParser(description='Scale benchmark on a synthetic GNews corpus')
+    parser.add_argument('--scales', nargs='+', type=int, default=[10_000, 100_000])
+    parser.add_argument('--cases', nargs='+', choices=CASES, default=list(CASES))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--publishers', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=1, help='Runs per case (best is reported)')
+    parser.add_argument('--batch', type=int, default=50_000, help='Articles generated per streamed batch')
+    parser.add_argument('-o', '--output', type=Path, default=None,
+                        help='Results JSON (default: bench_results/scale_<timestamp>.json)')
+    args = parser.parse_args()
+
+    output = args.output or Path('bench_results') / f"scale_{datetime.now():%Y%m%d_%H%M%S}.json"
+    results = []
+
+    print("\n" + "="*80)
+    print("SCALE BENCHMARK")
+    print("="*80)
+    for n in args.scales:
+        stream = CorpusStream(n, args.seed, args.publishers, args.batch)
+        print(f"\n{n:,} articles (streamed in batches of {args.batch:,})")
+
+        for case in args.cases:
+            runs = []
+            for _ in range(args.repeat):
+                gc.collect()
+                seconds, info = BENCHES[case](stream)
+                runs.append(seconds)
+            best = min(runs)
+            results.append({
+                'scale': n,
+                'case': case,
+                'seconds': round(best, 6),
+                'runs': [round(r, 6) for r in runs],
+                'articles_per_sec': round(n / best) if best > 0 else None,
+                'peak_rss_mb': round(peak_rss_mb(), 1),
+                'info': info,
+            })
+            print(f"  {case:20s} {best:9.3f}s  {n / best if best > 0 else 0:12,.0f} articles/s  "
+                  f"(generating: {stream.overhead:.1f}s)  {info}")
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        'created_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {'seed': args.seed, 'publishers': args.publishers, 'repeat': args.repeat, 'batch': args.batch},
+        'results': results,
+    }, indent=2), encoding='utf-8')
+    print(f"\n✓ Results saved to: {output}")
+
+if __name__ == "__main__":
+    main()
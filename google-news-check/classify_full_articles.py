@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Economic relevance of full article bodies
+
+Scores each article's full text (inline full_text or the text store) with the
+poc-eco-classify embedding classifier: bodies are split into paragraph chunks,
+chunks are embedded in batches across articles, and an article stops being
+scored as soon as its decision is settled (see method_embedding.classify_documents).
+A positive exit is exact; a negative exit (off-topic lead) is a heuristic that can
+miss an article that turns economic further down. --verify-exit rescores the
+negative exits in full and reports how many decisions that changes.
+Each record gets economic / economic_score / economic_decided / economic_chunks.
+
+Usage:
+    python classify_full_articles.py                                  # etf_news_full_data.json
+    python classify_full_articles.py etf_news_full_data.json --top-k 2 --bundle ../poc-eco-classify/bundles/all-MiniLM-L6-v2
+"""
+
+import argparse
+import json
+import time
+from collections import Counter
+from pathlib import Path
+
+import _shared  # noqa: F401  (puts ../googlenews-fetch-news/src and ../poc-eco-classify on sys.path)
+from text_store import article_text, report_missing
+
+def main():
+    parser = argparse.ArgumentParser(description='Classify full article bodies as economic / not economic')
+    parser.add_argument('input', nargs='?', default='etf_news_full_data.json')
+    parser.add_argument('-o', '--output', default=None, help='Output JSON (default: <input>_relevance.json)')
+    parser.add_argument('--bundle', default=None, help='Offline model bundle (see poc-eco-classify/bundle_model.py)')
+    parser.add_argument('--threshold', type=float, default=None)
+    parser.add_argument('--top-k', type=int, default=1, help='Aggregate the mean of the k best chunks (1 = max)')
+    parser.add_argument('--min-chunks', type=int, default=4, help='Chunks read before a negative early exit')
+    parser.add_argument('--margin', type=float, default=0.10, help='Negative exit when score < threshold - margin')
+    parser.add_argument('--no-early-exit', action='store_true', help='Score every chunk (for comparison)')
+    parser.add_argument('--verify-exit', action='store_true',
+                        help='Rescore negative early exits in full and report decisions that differ')
+    parser.add_argument('--text-store', default=None, help="Text store directory (default: each record's text_store)")
+    args = parser.parse_args()
+
+    from method_embedding import classify_documents, load_scorer
+
+    refs = _shared.CLASSIFY_DIR / 'eco_ref_sentences.txt'
+    model, ref_norm, threshold = load_scorer(str(refs), args.threshold, args.bundle)
+
+    with open(args.input, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    articles = data['articles'] if isinstance(data, dict) else data
+    texts = [article_text(a, args.text_store) for a in articles]
+    titles = [a.get('title', '') for a in articles]
+    print(f"Scoring {len(articles)} articles ({sum(1 for t in texts if t)} with full text)")
+    report_missing()
+
+    t0 = time.perf_counter()
+    if args.no_early_exit:
+        results = classify_documents(model, ref_norm, texts, threshold, titles, args.top_k,
+                                     step=1 << 30, min_chunks=1 << 30)
+    else:
+        results = classify_documents(model, ref_norm, texts, threshold, titles, args.top_k,
+                                     min_chunks=args.min_chunks, margin=args.margin)
+    elapsed = time.perf_counter() - t0
+
+    flipped = None
+    if args.verify_exit and not args.no_early_exit:
+        # Positive exits equal full scoring; only negative exits can differ
+        negatives = [i for i, r in enumerate(results) if r['decided'] == 'negative']
+        full = classify_documents(model, ref_norm, [texts[i] for i in negatives], threshold,
+                                  [titles[i] for i in negatives], args.top_k,
+                                  step=1 << 30, min_chunks=1 << 30)
+        flipped = sum(1 for r in full if r['economic'])
+
+    for article, result in zip(articles, results):
+        article['economic'] = result['economic']
+        article['economic_score'] = result['score']
+        article['economic_decided'] = result['decided']
+        article['economic_chunks'] = [result['chunks_evaluated'], result['chunks_total']]
+
+    evaluated = sum(r['chunks_evaluated'] for r in results)
+    total = sum(r['chunks_total'] for r in results)
+    print("\n" + "="*80)
+    print("FULL-TEXT RELEVANCE")
+    print("="*80)
+    print(f"Economic: {sum(r['economic'] for r in results)} / {len(results)} articles (threshold {threshold:.2f})")
+    print(f"Decided:  {dict(Counter(r['decided'] for r in results))}")
+    print(f"Chunks:   {evaluated:,} of {total:,} evaluated "
+          f"({100 * (1 - evaluated / total) if total else 0:.0f}% skipped by early exit)")
+    if flipped is not None:
+        print(f"Verify:   {flipped} of {sum(1 for r in results if r['decided'] == 'negative')} "
+              f"negative exits are economic when scored in full")
+    elif not args.no_early_exit:
+        print("          negative exits are approximate; --verify-exit counts the decisions they change")
+    print(f"Time:     {elapsed:.2f}s ({len(results) / elapsed if elapsed > 0 else 0:.1f} articles/s)")
+
+    output = Path(args.output or f"{Path(args.input).stem}_relevance.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    print(f"\n✓ Results saved to: {output}")
+
+if __name__ == "__main__":
+    from import_profile import profile_imports_if_requested
+
+    profile_imports_if_requested()
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+ETF ticker / issuer recognition backed by a local symbol dictionary
+
+etf_symbols.csv (ticker, fund name, issuer) is compiled once into:
+- a ticker set, matched against uppercase tokens of the original text
+  ("GLD", "$GLD", "(GLD)");
+- a word-level trie of fund names and issuer names, matched case-insensitively
+  with a longest-match walk ("SPDR Gold Shares" -> GLD, "iShares" -> iShares).
+Each text is scanned once. Results are cached per article hash, so re-analyzing
+the same articles (or the same syndicated story) costs a dict lookup.
+
+Usage:
+    python etf_entities.py GLD --input etf_news_7days.json          # all GLD coverage
+    python etf_entities.py GLD IBIT --input etf_news_*.json --days 7
+    python etf_entities.py --input etf_news_7days.json               # ticker index summary
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import re
+
+import _shared  # noqa: F401  (puts ../googlenews-fetch-news/src on sys.path)
+from article import load_articles
+from text_store import note_missing, read_article_text, report_missing, text_hash
+from topic_tagger import TOKEN_RE
+
+SYMBOLS_FILE = Path(__file__).resolve().parent / 'etf_symbols.csv'
+DEFAULT_CACHE = Path('etf_entities_cache.json')
+
+TICKER_RE = re.compile(r'(?<![A-Za-z0-9])\$?([A-Z]{2,5})(?![A-Za-z0-9])')
+NAME_SUFFIXES = ('etf', 'fund', 'trust')
+
+# Issuer brand names that also identify the issuer on their own
+ISSUER_ALIASES = {
+    'State Street': ['state street', 'spdr'],
+    'iShares': ['ishares', 'blackrock'],
+    'Vanguard': ['vanguard'],
+    'Invesco': ['invesco'],
+    'Schwab': ['schwab'],
+    'JPMorgan': ['jpmorgan', 'j.p. morgan'],
+    'VanEck': ['vaneck'],
+    'ARK Invest': ['ark invest', 'cathie wood'],
+    'Fidelity': ['fidelity'],
+    'Grayscale': ['grayscale'],
+    'ProShares': ['proshares'],
+    'Direxion': ['direxion'],
+    'KraneShares': ['kraneshares'],
+    'Global X': ['global x'],
+    'WisdomTree': ['wisdomtree'],
+    'First Trust': ['first trust'],
+}
+
+
+class EntityRecognizer:
+    """Compiled ticker/fund-name/issuer dictionary with a per-article result cache"""
+
+    def __init__(self, symbols_file=SYMBOLS_FILE, cache_path=None, text_store=None):
+        self.text_store = text_store  # overrides the records' text_store
+        raw = Path(symbols_file).read_bytes()
+        self.dictionary_digest = hashlib.sha1(raw).hexdigest()[:12]
+        self.issuer_of = {}
+        self.trie = {}
+        for row in csv.DictReader(raw.decode('utf-8').splitlines()):
+            ticker = row['ticker'].strip().upper()
+            self.issuer_of[ticker] = row['issuer'].strip()
+            words = TOKEN_RE.findall(row['name'].lower())
+            self._add(words, ('ticker', ticker))
+            if words and words[-1] in NAME_SUFFIXES and len(words) >= 4:
+                self._add(words[:-1], ('ticker', ticker))
+        for issuer, aliases in ISSUER_ALIASES.items():
+            for alias in aliases:
+                self._add(TOKEN_RE.findall(alias), ('issuer', issuer))
+
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.cache = {}
+        if self.cache_path and self.cache_path.exists():
+            stored = json.loads(self.cache_path.read_text(encoding='utf-8'))
+            if stored.get('dictionary') == self.dictionary_digest:
+                self.cache = stored['entities']
+        self._dirty = False
+
+    def _add(self, words, entity):
+        if not words:
+            return
+        node = self.trie
+        for word in words:
+            node = node.setdefault(word, {})
+        node.setdefault(None, set()).add(entity)
+
+    def recognize(self, text):
+        """{'tickers': [...], 'issuers': [...]} mentioned in text (sorted)"""
+        tickers = {t for t in TICKER_RE.findall(text) if t in self.issuer_of}
+        issuers = set()
+
+        tokens = TOKEN_RE.findall(text.lower())
+        i = 0
+        while i < len(tokens):
+            node, match, match_end = self.trie, None, i
+            for j in range(i, len(tokens)):
+                node = node.get(tokens[j])
+                if node is None:
+                    break
+                if None in node:
+                    match, match_end = node[None], j + 1
+            if match:
+                for kind, value in match:
+                    (tickers if kind == 'ticker' else issuers).add(value)
+                i = match_end
+            else:
+                i += 1
+
+        issuers.update(self.issuer_of[t] for t in tickers)
+        return {'tickers': sorted(tickers), 'issuers': sorted(issuers)}
+
+    @staticmethod
+    def article_hash(article):
+        # Same key whether the body is inline (full_text) or in the text store (text_hash)
+        body = article.get('text_hash') or text_hash(article.get('full_text') or '')
+        return hashlib.sha1(f"{article.get('title', '')}\n{body}".encode('utf-8')).hexdigest()
+
+    def recognize_article(self, article):
+        """Entities in an article's title and full text, cached by content hash
+
+        Stored bodies are only read on a cache miss. A body missing from its
+        store is counted (see text_store.report_missing) and its title-only
+        result is not cached, so it is redone once the body is available.
+        """
+        key = self.article_hash(article)
+        entities = self.cache.get(key)
+        if entities is None:
+            try:
+                body = read_article_text(article, self.text_store)
+            except KeyError:
+                note_missing(article, self.text_store)
+                return self.recognize(article.get('title', ''))
+            entities = self.recognize(f"{article.get('title', '')}\n{body}")
+            self.cache[key] = entities
+            self._dirty = True
+        return entities
+
+    def save_cache(self):
+        if self.cache_path and self._dirty:
+            payload = {'dictionary': self.dictionary_digest, 'entities': self.cache}
+            self.cache_path.write_text(json.dumps(payload), encoding='utf-8')
+            self._dirty = False
+
+
+def build_ticker_index(articles, recognizer):
+    """ticker -> [article indices] for a list of articles"""
+    index = defaultdict(list)
+    for i, article in enumerate(articles):
+        for ticker in recognizer.recognize_article(article)['tickers']:
+            index[ticker].append(i)
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Find ETF coverage by ticker')
+    parser.add_argument('tickers', nargs='*', help='Tickers to show coverage for (default: index summary)')
+    parser.add_argument('--input', nargs='+', default=['etf_news_full_data.json'], help='etf_news JSON files')
+    parser.add_argument('--days', type=int, default=None, help='Only articles published in the last N days')
+    parser.add_argument('--cache', type=Path, default=DEFAULT_CACHE, help='Per-article entity cache')
+    parser.add_argument('--text-store', default=None, help="Text store directory (default: each record's text_store)")
+    args = parser.parse_args()
+
+    # First article per URL across all inputs; published_at is naive UTC
+    articles = load_articles(args.input)
+    if args.days:
+        since = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=args.days)
+        articles = [a for a in articles if (a.published_at or since) >= since]
+
+    recognizer = EntityRecognizer(cache_path=args.cache, text_store=args.text_store)
+    index = build_ticker_index(articles, recognizer)
+    recognizer.save_cache()
+    report_missing()
+
+    if not args.tickers:
+        print(f"{len(articles)} articles, {len(index)} tickers mentioned\n")
+        counts = Counter({t: len(ids) for t, ids in index.items()})
+        for ticker, count in counts.most_common(30):
+            print(f"  {ticker:6s} {count:3d} articles  ({recognizer.issuer_of[ticker]})")
+        return
+
+    for ticker in args.tickers:
+        ticker = ticker.upper()
+        hits = index.get(ticker, [])
+        print(f"\n{ticker}: {len(hits)} articles")
+        print("-" * 60)
+        for i in hits:
+            a = articles[i]
+            print(f"  {a.published[:16]:16s}  {a.publisher:25.25s}  {a.title[:70]}")
+
+
+if __name__ == '__main__':
+    main()
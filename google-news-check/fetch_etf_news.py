@@ -3,14 +3,17 @@
 Fetch the last 50 Google News articles with 'ETF' in the title
 """
 
-from gnews import GNews
 from datetime import datetime
 import json
 
+import _shared  # noqa: F401  (puts ../googlenews-fetch-news/src on sys.path)
+from gnews_client import NewsClient
+from url_resolver import resolve_articles
+
 def fetch_etf_news(max_results=100):
     """Fetch Google News articles with ETF in title"""
-    # Initialize GNews with parameters
-    google_news = GNews(
+    # Initialize GNews with parameters (GNEWS_RECORD / GNEWS_REPLAY switch to record / replay)
+    google_news = NewsClient.from_env(
         language='en',
         country='US',
         max_results=max_results  # Configurable limit
@@ -28,6 +31,10 @@ def fetch_etf_news(max_results=100):
 
         print(f"\nFound {len(articles)} articles with 'ETF' in the title\n")
 
+        # Google News links are redirects; store publisher URLs instead
+        stats = resolve_articles(articles, 'url_cache.sqlite', offline=google_news.offline)
+        print(f"Resolved publisher URLs: {stats}\n")
+
         # Display articles
         for i, article in enumerate(articles, 1):
             title = article.get('title', 'No title')
@@ -55,6 +62,7 @@ def fetch_etf_news(max_results=100):
                 'source': article.get('publisher', {}).get('title', ''),
                 'published': article.get('published date', ''),
                 'url': article.get('url', ''),
+                'google_url': article.get('google_url', ''),
                 'description': article.get('description', '')
             })
 
@@ -63,9 +71,12 @@ def fetch_etf_news(max_results=100):
             json.dump(output_data, f, indent=2, ensure_ascii=False)
 
         print(f"\nResults saved to: etf_news_results.json")
+        print(f"Google News requests: {google_news.stats()}")
 
     except Exception as e:
+        # get_news has already retried with backoff (see gnews_client.py)
         print(f"Error fetching news: {e}")
+        print(f"Google News requests: {google_news.stats()}")
         import traceback
         traceback.print_exc()
 
@@ -3,60 +3,82 @@
 Fetch ETF news articles covering multiple days
 """
 
-from gnews import GNews
 from datetime import datetime, timedelta
 from collections import Counter
 import json
 
-def parse_date(date_str):
-    """Parse date from Google News format"""
-    try:
-        # Format: "Fri, 06 Feb 2026 18:45:04 GMT"
-        dt = datetime.strptime(date_str, "%a, %d %b %Y %H:%M:%S %Z")
-        return dt.date()
-    except:
-        return None
+import _shared  # noqa: F401  (puts ../googlenews-fetch-news/src on sys.path)
+from article import parse_published
+from gnews_client import NewsClient, NewsFetchError
+from url_resolver import resolve_articles
 
-def fetch_articles_for_days(target_days=3, max_articles=500):
-    """Fetch articles until we have coverage for target_days"""
+def parse_date(date_str):
+    """Date of a Google News "published date" ("Fri, 06 Feb 2026 18:45:04 GMT")"""
+    dt = parse_published(date_str)
+    return dt.date() if dt else None
+
+def merge_batch(results, all_articles, seen_urls, dates_seen):
+    """Append articles with unseen URLs to all_articles and track their dates; returns how many were new"""
+    new_articles = 0
+    for article in results:
+        # Skip duplicates
+        if article['url'] not in seen_urls:
+            seen_urls.add(article['url'])
+            all_articles.append(article)
+            new_articles += 1
+
+            # Track dates
+            date = parse_date(article.get('published date', ''))
+            if date:
+                dates_seen.add(date)
+    return new_articles
+
+def fetch_articles_for_days(target_days=3, max_articles=500, strict=False):
+    """Fetch articles until we have coverage for target_days
+
+    A failed fetch (NewsFetchError) is raised when no batch succeeded, or always
+    with strict=True, so it never passes for an empty result. Otherwise the
+    articles fetched so far are kept.
+    """
 
     print(f"Fetching ETF news articles covering {target_days} days...")
     print("=" * 80)
 
     all_articles = []
+    seen_urls = set()
     dates_seen = set()
     batch_size = 100
 
+    # GNEWS_RECORD / GNEWS_REPLAY switch to record / replay (see gnews_client.py)
+    gn = NewsClient.from_env(
+        language='en',
+        country='US',
+        max_results=batch_size,
+        start_date=(datetime.now() - timedelta(days=7)).date(),  # Last 7 days
+        end_date=datetime.now().date()
+    )
+
     for batch_num in range(1, (max_articles // batch_size) + 1):
         print(f"\nFetching batch {batch_num} (up to {batch_size} articles)...")
 
-        gn = GNews(
-            language='en',
-            country='US',
-            max_results=batch_size,
-            start_date=(datetime.now() - timedelta(days=7)).date(),  # Last 7 days
-            end_date=datetime.now().date()
-        )
-
-        # Search for articles with "ETF" in the title
-        results = gn.get_news('intitle:ETF')
+        # Search for articles with "ETF" in the title (retried with backoff; empty = confirmed empty)
+        try:
+            results = gn.get_news('intitle:ETF')
+        except NewsFetchError as e:
+            if strict or not all_articles:
+                raise
+            print(f"⚠️  {e}")
+            print("Keeping the articles fetched so far")
+            break
 
         if not results:
             print("No more results available")
             break
 
-        # Process results
-        new_articles = 0
-        for article in results:
-            # Skip duplicates
-            if article['url'] not in [a['url'] for a in all_articles]:
-                all_articles.append(article)
-                new_articles += 1
+        # Dedup on publisher URLs, not Google News redirect links
+        resolve_articles(results, 'url_cache.sqlite', offline=gn.offline)
 
-                # Track dates
-                date = parse_date(article.get('published date', ''))
-                if date:
-                    dates_seen.add(date)
+        new_articles = merge_batch(results, all_articles, seen_urls, dates_seen)
 
         print(f"  Added {new_articles} new articles")
         print(f"  Total articles: {len(all_articles)}")
@@ -72,20 +94,11 @@ def fetch_articles_for_days(target_days=3, max_articles=500):
             print("\n✓ Reached end of available articles")
             break
 
+    print(f"\nGoogle News requests: {gn.stats()}")
     return all_articles, dates_seen
 
-def main():
-    import sys
-
-    target_days = 3
-    if len(sys.argv) > 1:
-        try:
-            target_days = int(sys.argv[1])
-        except ValueError:
-            pass
-
-    articles, dates_seen = fetch_articles_for_days(target_days)
-
+def summarize(articles, dates_seen):
+    """Print collection summary: date and publisher distribution"""
     print("\n" + "=" * 80)
     print(f"COLLECTION SUMMARY")
     print("=" * 80)
@@ -113,7 +126,8 @@ def main():
 
     print(f"\nTotal unique publishers: {len(source_counts)}")
 
-    # Save to file
+def build_output(articles, dates_seen):
+    """Output document saved as etf_news_{N}days.json"""
     output_data = {
         'search_query': 'intitle:ETF',
         'total_results': len(articles),
@@ -131,15 +145,42 @@ def main():
             'source': article.get('publisher', {}).get('title', ''),
             'published': article.get('published date', ''),
             'url': article.get('url', ''),
+            'google_url': article.get('google_url', ''),
             'description': article.get('description', '')
         })
 
-    filename = f'etf_news_{target_days}days.json'
+    return output_data
+
+def fetch_to_file(target_days, filename=None, strict=False):
+    """Fetch, summarize and save N days of articles; returns the output filename.
+    Raises NewsFetchError (nothing is written) if fetching failed, see fetch_articles_for_days."""
+    articles, dates_seen = fetch_articles_for_days(target_days, strict=strict)
+    summarize(articles, dates_seen)
+
+    filename = filename or f'etf_news_{target_days}days.json'
     with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, indent=2, ensure_ascii=False)
+        json.dump(build_output(articles, dates_seen), f, indent=2, ensure_ascii=False)
 
     print(f"\n✓ Data saved to: {filename}")
     print("=" * 80)
+    return filename
+
+def main():
+    import sys
+
+    target_days = 3
+    if len(sys.argv) > 1:
+        try:
+            target_days = int(sys.argv[1])
+        except ValueError:
+            pass
+
+    try:
+        fetch_to_file(target_days)
+    except NewsFetchError as e:
+        print(f"\n❌ {e}")
+        print("   No articles could be fetched; nothing was saved.")
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
@@ -3,43 +3,208 @@
 Fetch full article content for all ETF news articles
 """
 
+import argparse
 import json
+import os
+import queue
+import threading
 import time
-from newspaper import Article
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from datetime import datetime
 import csv
 
-def fetch_article_content(url, title):
-    """Fetch full article content from URL"""
+from text_store import TextStore, store_article_text
+import _shared  # noqa: F401  (puts ../googlenews-fetch-news/src on sys.path)
+from url_resolver import resolve_articles
+
+def empty_content(error):
+    """Content record for an article that could not be downloaded or parsed"""
+    return {
+        'success': False,
+        'error': error,
+        'text': '',
+        'authors': [],
+        'publish_date': None,
+        'top_image': '',
+        'keywords': [],
+        'summary': '',
+        'word_count': 0
+    }
+
+def download_html(url):
+    """Download raw HTML (network stage, runs in a thread)"""
+    from newspaper import Article
+
+    article = Article(url)
+    article.download()
+    if not article.html:
+        raise RuntimeError(getattr(article, 'download_exception_msg', None) or 'empty response')
+    return article.html
+
+def parse_html(url, html):
+    """Extract text, authors and metadata from downloaded HTML (CPU stage, runs in a worker process)
+
+    Returns (content, seconds spent parsing).
+    """
+    from newspaper import Article
+
+    t0 = time.perf_counter()
     try:
         article = Article(url)
-        article.download()
+        article.download(input_html=html)
         article.parse()
-
-        return {
+        text = article.text
+        content = {
             'success': True,
-            'text': article.text,
+            'text': text,
             'authors': article.authors,
             'publish_date': str(article.publish_date) if article.publish_date else None,
             'top_image': article.top_image,
             'keywords': article.keywords if hasattr(article, 'keywords') else [],
-            'summary': article.summary if hasattr(article, 'summary') else ''
+            'summary': article.summary if hasattr(article, 'summary') else '',
+            'word_count': len(text.split()) if text else 0
         }
     except Exception as e:
-        print(f"   ⚠️  Failed to fetch: {title[:60]}...")
-        print(f"      Error: {str(e)[:100]}")
-        return {
-            'success': False,
-            'error': str(e),
-            'text': '',
-            'authors': [],
-            'publish_date': None,
-            'top_image': '',
-            'keywords': [],
-            'summary': ''
-        }
+        content = empty_content(str(e))
+    return content, time.perf_counter() - t0
+
+class StageMeter:
+    """Items, bytes and busy time of one pipeline stage"""
+
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.bytes = 0
+        self.busy = 0.0
+        self.first = None
+        self.last = None
+        self.lock = threading.Lock()
+
+    def record(self, seconds, nbytes=0):
+        now = time.perf_counter()
+        with self.lock:
+            self.items += 1
+            self.bytes += nbytes
+            self.busy += seconds
+            self.first = self.first if self.first is not None else now - seconds
+            self.last = now
+
+    def report(self):
+        wall = (self.last - self.first) if self.items else 0.0
+        rate = self.items / wall if wall > 0 else 0.0
+        utilization = self.busy / (wall * self.workers) if wall > 0 else 0.0
+        line = f"  {self.name:9s} {self.items:4d} items in {wall:6.1f}s  {rate:6.2f}/s  " \
+               f"{self.workers:2d} workers, {utilization:4.0%} busy"
+        if self.bytes:
+            line += f"  {self.bytes / wall / 1e6 if wall > 0 else 0:.2f} MB/s"
+        print(line)
+
+def fetch_all(articles, download_workers=8, parse_workers=None, queue_size=32, delay=1.0):
+    """Download concurrently on threads, parse on a process pool; returns contents in input order
+
+    The stages are joined by a bounded queue: when parsing falls behind,
+    downloaders block on put() instead of piling up HTML in memory.
+    Download starts are spaced at least `delay` seconds apart across all
+    workers, so concurrency hides latency without raising the request rate.
+    """
+    parse_workers = parse_workers or os.cpu_count() or 1
+    results = [None] * len(articles)
+    todo = queue.Queue()
+    for i in range(len(articles)):
+        todo.put(i)
+    html_queue = queue.Queue(maxsize=queue_size)
+    downloads = StageMeter('download', download_workers)
+    parses = StageMeter('parse', parse_workers)
+    pace_lock = threading.Lock()
+    next_start = 0.0
+
+    def wait_turn():
+        # Be polite to servers: one shared schedule for all downloaders
+        nonlocal next_start
+        with pace_lock:
+            now = time.monotonic()
+            start = max(now, next_start)
+            next_start = start + delay
+        if start > now:
+            time.sleep(start - now)
+
+    def downloader():
+        while True:
+            try:
+                i = todo.get_nowait()
+            except queue.Empty:
+                return
+            wait_turn()
+            t0 = time.perf_counter()
+            try:
+                html, error = download_html(articles[i]['url']), None
+            except Exception as e:
+                html, error = None, str(e)
+            downloads.record(time.perf_counter() - t0, len(html or ''))
+            html_queue.put((i, html, error))
+
+    threads = [threading.Thread(target=downloader, daemon=True) for _ in range(download_workers)]
+    for t in threads:
+        t.start()
+
+    def close_queue():
+        for t in threads:
+            t.join()
+        html_queue.put(None)
+
+    threading.Thread(target=close_queue, daemon=True).start()
+
+    done = 0
+
+    def finish(i, content):
+        nonlocal done
+        done += 1
+        results[i] = content
+        title = articles[i]['title']
+        if content['success']:
+            print(f"[{done}/{len(articles)}] ✓ {content['word_count']:5d} words - {title[:60]}")
+        else:
+            print(f"[{done}/{len(articles)}] ⚠️  Failed to fetch: {title[:60]}...")
+            print(f"      Error: {content['error'][:100]}")
+
+    def collect(futures):
+        for future in futures:
+            content, seconds = future.result()
+            parses.record(seconds)
+            finish(in_flight.pop(future), content)
+
+    in_flight = {}
+    with ProcessPoolExecutor(max_workers=parse_workers) as pool:
+        while True:
+            item = html_queue.get()
+            if item is None:
+                break
+            i, html, error = item
+            if error is not None:
+                finish(i, empty_content(error))
+                continue
+            # Cap submitted-but-unparsed pages so backpressure reaches the downloaders
+            while len(in_flight) >= 2 * parse_workers:
+                completed, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(completed)
+            in_flight[pool.submit(parse_html, articles[i]['url'], html)] = i
+        collect(list(in_flight))
+
+    print(f"\nStage throughput:")
+    downloads.report()
+    parses.report()
+    return results
 
 def main():
+    parser = argparse.ArgumentParser(description='Fetch full article content for ETF news articles')
+    parser.add_argument('--download-workers', type=int, default=8, help='Concurrent downloads (default: 8)')
+    parser.add_argument('--parse-workers', type=int, default=None, help='Parser processes (default: CPU count)')
+    parser.add_argument('--queue-size', type=int, default=32, help='Downloaded pages waiting to be parsed (default: 32)')
+    parser.add_argument('--delay', type=float, default=1.0, help='Minimum seconds between download starts across all workers (default: 1s = 1 request/s)')
+    parser.add_argument('--text-store', default='article_texts', help='Directory for compressed article bodies')
+    args = parser.parse_args()
+
     print("Loading existing ETF news data...")
     with open('etf_news_results.json', 'r', encoding='utf-8') as f:
         data = json.load(f)
@@ -47,18 +212,19 @@ def main():
     articles = data['articles']
     print(f"Found {len(articles)} articles to process\n")
 
-    enriched_articles = []
-
-    for i, article in enumerate(articles, 1):
-        print(f"[{i}/{len(articles)}] Fetching: {article['title'][:60]}...")
+    # Older files hold Google News redirect links; resolve them once (cached) instead of per download
+    stats = resolve_articles(articles, 'url_cache.sqlite')
+    print(f"Publisher URLs: {stats}\n")
 
-        # Fetch full content
-        content = fetch_article_content(article['url'], article['title'])
+    contents = fetch_all(articles, args.download_workers, args.parse_workers, args.queue_size, args.delay)
 
+    # Bodies go to the content-addressed store; records keep hash and lengths
+    store = TextStore(args.text_store)
+    enriched_articles = []
+    for article, content in zip(articles, contents):
         # Merge with existing data
-        enriched_article = {
+        enriched_articles.append(store_article_text({
             **article,
-            'full_text': content['text'],
             'authors': content['authors'],
             'article_publish_date': content['publish_date'],
             'top_image': content['top_image'],
@@ -66,16 +232,8 @@ def main():
             'article_summary': content['summary'],
             'fetch_success': content['success'],
             'fetch_error': content.get('error', ''),
-            'word_count': len(content['text'].split()) if content['text'] else 0
-        }
-
-        enriched_articles.append(enriched_article)
-
-        if content['success']:
-            print(f"   ✓ Success - {enriched_article['word_count']} words")
-
-        # Be polite to servers
-        time.sleep(1)
+            'word_count': content['word_count']
+        }, content['text'], store))
 
     # Save enriched data to JSON
     output_data = {
@@ -91,6 +249,8 @@ def main():
         json.dump(output_data, f, indent=2, ensure_ascii=False)
 
     print(f"\n✓ Full data saved to: {json_filename}")
+    blobs, size = store.stats()
+    print(f"✓ Article texts: {blobs} unique bodies in {store.root}/ ({size / 1e6:.1f} MB compressed)")
 
     # Save to CSV for easy analysis
     csv_filename = 'etf_news_analysis.csv'
@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+Semantic search index over fetched headlines and article bodies
+
+An IVF (inverted file) index built with numpy: vectors are clustered around
+k-means centroids and a query only scans the closest `nprobe` clusters.
+Storage is append-only, so new batches are inserted incrementally (in
+memory too: an insert costs O(batch), not a reload of the index):
+
+    <index>/meta.json      model, dim, counters
+    <index>/centroids.npy  k-means centroids (absent until trained)
+    <index>/vectors.f16    normalized float16 vectors, one row per item
+    <index>/assign.i32     cluster id per row
+    <index>/items.jsonl    one record per row (article url, kind, chunk, title, source, published)
+    <index>/deleted.i32    tombstoned row ids
+
+A batch is appended to vectors, assign and items in that order; items.jsonl
+is written last, so rows beyond its length belong to an interrupted insert
+and are truncated away on load. Deleting an article tombstones its rows, so
+re-adding it later indexes fresh rows and the old ones stay hidden.
+
+Usage:
+    python news_index.py add etf_news_3days.json etf_news_full_data.json ../googlenews-fetch-news/data/articles_*.yaml
+    python news_index.py query "gold ETF inflows" -k 10
+    python news_index.py delete https://example.com/story
+    python news_index.py train --nlist 512
+    python news_index.py stats
+"""
+
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+import _shared  # noqa: F401  (puts ../googlenews-fetch-news/src on sys.path)
+from article import iter_articles
+from text_store import article_text, report_missing
+
+DEFAULT_INDEX = Path('news_index')
+DEFAULT_MODEL = 'all-MiniLM-L6-v2'
+CHUNK_WORDS = 200
+TRAIN_MIN_ITEMS = 2000   # below this a brute-force scan is already fast
+TRAIN_SAMPLE = 50000
+KMEANS_ITERS = 20
+
+
+def load_articles(path, text_store=None):
+    """Load articles from etf_news_*.json, stage1 articles_*.yaml or JSONL as dicts with url/title/source/published/text"""
+    articles = []
+    for a in iter_articles(path):
+        if not a.url:
+            continue
+        articles.append({
+            'url': a.url,
+            'title': a.title,
+            'source': a.publisher,
+            'published': a.published,
+            'text': article_text(a, text_store),
+        })
+    return articles
+
+
+def chunk_text(text, words=CHUNK_WORDS):
+    """Split body text into ~`words`-word chunks on paragraph boundaries"""
+    chunks, current = [], []
+    for para in text.split('\n'):
+        current.extend(para.split())
+        if len(current) >= words:
+            chunks.append(' '.join(current))
+            current = []
+    if len(current) >= 20 or (current and not chunks):
+        chunks.append(' '.join(current))
+    return chunks
+
+
+def kmeans(vectors, k, iters=KMEANS_ITERS, seed=0):
+    """Spherical k-means on normalized vectors; returns (k, dim) normalized centroids"""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=k, replace=False)].astype(np.float32)
+    for _ in range(iters):
+        assign = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, vectors)
+        empty = np.bincount(assign, minlength=k) == 0
+        sums[empty] = vectors[rng.choice(len(vectors), size=int(empty.sum()))]
+        centroids = sums / np.linalg.norm(sums, axis=1, keepdims=True)
+    return centroids
+
+
+class NewsIndex:
+    """Append-only IVF index with tombstone deletes, persisted in a directory"""
+
+    def __init__(self, path=DEFAULT_INDEX, model_name=DEFAULT_MODEL):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        meta_path = self.path / 'meta.json'
+        self.meta = json.loads(meta_path.read_text()) if meta_path.exists() else {'model': model_name, 'dim': None}
+        self._model = None
+        self._load()
+
+    # -- storage ----------------------------------------------------------
+
+    def _load(self):
+        self.items = []
+        torn = False
+        items_path = self.path / 'items.jsonl'
+        if items_path.exists():
+            with items_path.open(encoding='utf-8') as f:
+                for line in f:
+                    if not line.endswith('\n'):
+                        torn = True  # last line of an interrupted insert
+                        break
+                    self.items.append(json.loads(line))
+        self._repair(torn)
+
+        dim = self.meta['dim']
+        vec_path = self.path / 'vectors.f16'
+        n = len(self.items)
+        if dim and n:
+            self.vectors = np.memmap(vec_path, dtype=np.float16, mode='r', shape=(n, dim))
+        else:
+            self.vectors = np.zeros((0, dim or 0), dtype=np.float16)
+        assign_path = self.path / 'assign.i32'
+        self.assign = np.fromfile(assign_path, dtype=np.int32, count=n) if n else np.zeros(0, np.int32)
+        centroids_path = self.path / 'centroids.npy'
+        self.centroids = np.load(centroids_path) if centroids_path.exists() else None
+
+        self.dead = np.zeros(n, dtype=bool)
+        deleted_path = self.path / 'deleted.i32'
+        if deleted_path.exists():
+            rows = np.fromfile(deleted_path, dtype=np.int32)
+            self.dead[rows[rows < n]] = True
+        self.urls = {item['url'] for item in self.items}
+        legacy_path = self.path / 'deleted.txt'
+        if legacy_path.exists():
+            # Older indexes tombstoned urls; convert to row tombstones
+            legacy = set(legacy_path.read_text(encoding='utf-8').split())
+            rows = np.array([i for i, item in enumerate(self.items) if item['url'] in legacy], dtype=np.int32)
+            with deleted_path.open('ab') as f:
+                f.write(rows.tobytes())
+            self.dead[rows] = True
+            legacy_path.unlink()
+        self.live_urls = {item['url'] for item, dead in zip(self.items, self.dead) if not dead}
+        self._build_lists()
+
+    def _repair(self, torn=False):
+        """Cut vectors / assign / items back to the rows all three hold (an insert interrupted mid-way)"""
+        dim = self.meta['dim']
+        if not dim:
+            return
+        vec_path, assign_path, items_path = (self.path / name for name in ('vectors.f16', 'assign.i32', 'items.jsonl'))
+        vec_bytes = vec_path.stat().st_size if vec_path.exists() else 0
+        assign_bytes = assign_path.stat().st_size if assign_path.exists() else 0
+        vec_rows, assign_rows = vec_bytes // (2 * dim), assign_bytes // 4
+        n = min(vec_rows, assign_rows, len(self.items))
+        if vec_bytes == n * 2 * dim and assign_bytes == n * 4 and len(self.items) == n and not torn:
+            return
+        print(f"⚠️  {self.path}: incomplete insert (vectors {vec_rows}, assign {assign_rows}, "
+              f"items {len(self.items)} rows); truncating to {n} rows")
+        if vec_path.exists():
+            os.truncate(vec_path, n * 2 * dim)
+        if assign_path.exists():
+            os.truncate(assign_path, n * 4)
+        del self.items[n:]
+        tmp = items_path.with_suffix('.tmp')
+        with tmp.open('w', encoding='utf-8') as f:
+            for item in self.items:
+                f.write(json.dumps(item, ensure_ascii=False) + '\n')
+        os.replace(tmp, items_path)
+
+    def _build_lists(self):
+        """Inverted lists: row ids grouped by cluster (one argsort, no per-row Python work)"""
+        if self.centroids is None:
+            self.lists = None
+            return
+        order = np.argsort(self.assign, kind='stable')
+        bounds = np.searchsorted(self.assign[order], np.arange(len(self.centroids) + 1))
+        self.lists = [order[bounds[c]:bounds[c + 1]] for c in range(len(self.centroids))]
+
+    @property
+    def deleted(self):
+        """Indexed urls with no live rows"""
+        return self.urls - self.live_urls
+
+    def _save_meta(self):
+        (self.path / 'meta.json').write_text(json.dumps(self.meta, indent=2))
+
+    @property
+    def model(self):
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+            self._model = SentenceTransformer(self.meta['model'])
+        return self._model
+
+    def encode(self, texts):
+        emb = np.asarray(self.model.encode(texts, batch_size=64), dtype=np.float32)
+        emb /= np.linalg.norm(emb, axis=1, keepdims=True)
+        return emb
+
+    # -- updates ----------------------------------------------------------
+
+    def add(self, articles, bodies=True):
+        """Insert new articles (title + body chunks); urls with live rows are skipped. Returns rows added."""
+        new_items, texts = [], []
+        for a in articles:
+            if a['url'] in self.live_urls:
+                continue
+            self.live_urls.add(a['url'])
+            meta = {'url': a['url'], 'title': a['title'], 'source': a['source'], 'published': a['published']}
+            new_items.append({**meta, 'kind': 'title', 'chunk': 0})
+            texts.append(a['title'])
+            if bodies and a['text']:
+                for i, chunk in enumerate(chunk_text(a['text'])):
+                    new_items.append({**meta, 'kind': 'chunk', 'chunk': i})
+                    texts.append(chunk)
+        if not new_items:
+            return 0
+
+        emb = self.encode(texts)
+        if self.meta['dim'] is None:
+            self.meta['dim'] = int(emb.shape[1])
+            self._save_meta()
+        assign = (np.argmax(emb @ self.centroids.T, axis=1).astype(np.int32)
+                  if self.centroids is not None else np.zeros(len(emb), dtype=np.int32))
+
+        # Fixed order, items last: _load() trusts only rows present in all three files
+        with (self.path / 'vectors.f16').open('ab') as f:
+            f.write(emb.astype(np.float16).tobytes())
+        with (self.path / 'assign.i32').open('ab') as f:
+            f.write(assign.tobytes())
+        with (self.path / 'items.jsonl').open('a', encoding='utf-8') as f:
+            f.write(''.join(json.dumps(item, ensure_ascii=False) + '\n' for item in new_items))
+
+        # In-memory update: reopen the vector map and extend the small arrays and lists
+        first = len(self.items)
+        self.items.extend(new_items)
+        self.urls.update(item['url'] for item in new_items)
+        self.vectors = np.memmap(self.path / 'vectors.f16', dtype=np.float16, mode='r',
+                                 shape=(len(self.items), self.meta['dim']))
+        self.assign = np.concatenate([self.assign, assign])
+        self.dead = np.concatenate([self.dead, np.zeros(len(new_items), dtype=bool)])
+        if self.lists is not None:
+            rows = np.arange(first, len(self.items))
+            for c in np.unique(assign):
+                self.lists[c] = np.concatenate([self.lists[c], rows[assign == c]])
+
+        if self.centroids is None and len(self.items) >= TRAIN_MIN_ITEMS:
+            self.train()
+        return len(new_items)
+
+    def delete(self, urls):
+        """Tombstone articles by url (all their current rows); queries skip them"""
+        removed = {u for u in urls if u in self.live_urls}
+        if not removed:
+            return 0
+        rows = np.array([i for i, item in enumerate(self.items) if item['url'] in removed and not self.dead[i]],
+                        dtype=np.int32)
+        with (self.path / 'deleted.i32').open('ab') as f:
+            f.write(rows.tobytes())
+        self.dead[rows] = True
+        self.live_urls -= removed
+        return len(removed)
+
+    def train(self, nlist=None):
+        """(Re)cluster: fit centroids on a sample, then reassign every row in blocks"""
+        n = len(self.vectors)
+        if n == 0:
+            return
+        nlist = nlist or max(1, int(4 * np.sqrt(n)))
+        nlist = min(nlist, n)
+        rng = np.random.default_rng(0)
+        sample_ids = np.sort(rng.choice(n, size=min(n, TRAIN_SAMPLE), replace=False))
+        centroids = kmeans(np.asarray(self.vectors[sample_ids], dtype=np.float32), nlist)
+
+        assign = np.empty(n, dtype=np.int32)
+        for start in range(0, n, 65536):
+            block = np.asarray(self.vectors[start:start + 65536], dtype=np.float32)
+            assign[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+        np.save(self.path / 'centroids.npy', centroids)
+        tmp = self.path / 'assign.i32.tmp'
+        assign.tofile(tmp)
+        os.replace(tmp, self.path / 'assign.i32')
+        self.meta['nlist'] = nlist
+        self._save_meta()
+        self._load()
+
+    # -- queries ----------------------------------------------------------
+
+    def query(self, text, k=10, nprobe=8):
+        """Top-k articles for a query: best-matching row per article, tombstones skipped"""
+        if len(self.vectors) == 0:
+            return []
+        q = self.encode([text])[0]
+        if self.lists is None:
+            candidates = np.arange(len(self.vectors))
+        else:
+            probe = np.argsort(-(self.centroids @ q))[:nprobe]
+            candidates = np.sort(np.concatenate([self.lists[c] for c in probe]))
+        scores = np.asarray(self.vectors[candidates], dtype=np.float32) @ q
+
+        results, seen = [], set()
+        for i in np.argsort(-scores):
+            row = candidates[i]
+            item = self.items[row]
+            if self.dead[row] or item['url'] in seen:
+                continue
+            seen.add(item['url'])
+            results.append({**item, 'score': float(scores[i])})
+            if len(results) == k:
+                break
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Semantic search index over fetched ETF news')
+    parser.add_argument('--index', type=Path, default=DEFAULT_INDEX, help='Index directory (default: news_index/)')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_add = sub.add_parser('add', help='Index articles from etf_news_*.json / articles_*.yaml files')
+    p_add.add_argument('files', nargs='+')
+    p_add.add_argument('--no-bodies', action='store_true', help='Index headlines only')
+    p_add.add_argument('--text-store', default=None, help="Text store directory (default: each record's text_store)")
+    p_add.add_argument('--model', default=DEFAULT_MODEL, help='Embedding model (new index only)')
+
+    p_query = sub.add_parser('query', help='Find articles similar to a text')
+    p_query.add_argument('text')
+    p_query.add_argument('-k', type=int, default=10)
+    p_query.add_argument('--nprobe', type=int, default=8, help='Clusters scanned per query')
+
+    p_delete = sub.add_parser('delete', help='Remove articles by url')
+    p_delete.add_argument('urls', nargs='+')
+
+    p_train = sub.add_parser('train', help='(Re)build clusters')
+    p_train.add_argument('--nlist', type=int, default=None, help='Number of clusters (default: 4*sqrt(n))')
+
+    sub.add_parser('stats', help='Show index size')
+    args = parser.parse_args()
+
+    index = NewsIndex(args.index, model_name=getattr(args, 'model', DEFAULT_MODEL))
+
+    if args.command == 'add':
+        for filename in args.files:
+            t0 = time.perf_counter()
+            added = index.add(load_articles(filename, args.text_store), bodies=not args.no_bodies)
+            print(f"  {filename}: +{added} rows ({time.perf_counter() - t0:.1f}s)")
+        report_missing()
+        print(f"Index: {len(index.items)} rows, {len(index.live_urls)} articles")
+    elif args.command == 'query':
+        index.model  # load before timing
+        t0 = time.perf_counter()
+        results = index.query(args.text, k=args.k, nprobe=args.nprobe)
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        for i, r in enumerate(results, 1):
+            where = 'title' if r['kind'] == 'title' else f"chunk {r['chunk']}"
+            print(f"{i:2d}. [{r['score']:.3f}] {r['title'][:70]}")
+            print(f"     {r['source']} | {r['published']} | {where}")
+            print(f"     {r['url']}")
+        print(f"\n{len(results)} results in {elapsed_ms:.1f} ms")
+    elif args.command == 'delete':
+        print(f"Deleted {index.delete(args.urls)} articles")
+    elif args.command == 'train':
+        t0 = time.perf_counter()
+        index.train(args.nlist)
+        print(f"Trained {index.meta.get('nlist')} clusters over {len(index.items)} rows in {time.perf_counter() - t0:.1f}s")
+    elif args.command == 'stats':
+        print(f"Model: {index.meta['model']} ({index.meta['dim']}-dim)")
+        print(f"Rows: {len(index.items)} ({int(index.dead.sum())} tombstoned)  "
+              f"Articles: {len(index.live_urls)} live, {len(index.deleted)} deleted")
+        print(f"Clusters: {index.meta.get('nlist', 0) if index.centroids is not None else 'untrained (brute force)'}")
+
+
+if __name__ == '__main__':
+    import _shared  # noqa: F401
+    from import_profile import profile_imports_if_requested
+
+    profile_imports_if_requested()
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Small in-process DAG runner with per-stage output caching
+
+Each stage writes one output file. Its fingerprint covers the stage name,
+its parameters, the source files that implement it, and the content of
+its dependencies' outputs. A stage is skipped when the recorded
+fingerprint matches, the output file still exists and (if the stage has a
+max_age) the output is young enough. Manifests live in .pipeline/.
+"""
+
+import hashlib
+import inspect
+import json
+import time
+from pathlib import Path
+
+DEFAULT_CACHE_DIR = Path('.pipeline')
+
+
+def file_digest(path):
+    """sha256 of a file's bytes"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+class Stage:
+    """One pipeline step: func(inputs, output, **params) writes `output`
+
+    inputs maps each dependency name to that dependency's output Path.
+    """
+
+    def __init__(self, name, func, output, deps=(), params=None, max_age=None, code=()):
+        self.name = name
+        self.func = func
+        self.output = Path(output)
+        self.deps = list(deps)
+        self.params = params or {}
+        self.max_age = max_age  # seconds; None = valid until inputs/params/code change, 0 = never cached
+        self.code = [Path(inspect.getsourcefile(func))] + [Path(c) for c in code]
+
+    def code_digest(self):
+        """Digest of the source files the stage runs (its own module plus `code`)"""
+        return hashlib.sha256(''.join(file_digest(p) for p in self.code).encode('utf-8')).hexdigest()
+
+
+class Pipeline:
+    """Runs stages in dependency order, reusing cached outputs when fresh"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+        self.stages = {}
+
+    def add(self, stage):
+        for dep in stage.deps:
+            if dep not in self.stages:
+                raise ValueError(f"Stage {stage.name!r} depends on unknown stage {dep!r}")
+        self.stages[stage.name] = stage
+        return stage
+
+    def _manifest_path(self, stage):
+        return self.cache_dir / f"{stage.name}--{stage.output.name}.json"
+
+    def fingerprint(self, stage):
+        inputs = {}
+        for dep in stage.deps:
+            path = self.stages[dep].output
+            inputs[dep] = file_digest(path) if path.exists() else None
+        blob = json.dumps({
+            'stage': stage.name,
+            'params': stage.params,
+            'code': stage.code_digest(),
+            'inputs': inputs,
+            'output': str(stage.output),
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+    def is_fresh(self, stage):
+        """(fresh, reason) for a stage's cached output"""
+        manifest_path = self._manifest_path(stage)
+        if stage.max_age == 0:
+            return False, 'always re-run (max_age=0)'
+        if not stage.output.exists() or not manifest_path.exists():
+            return False, 'no cached output'
+        manifest = json.loads(manifest_path.read_text())
+        if manifest.get('fingerprint') != self.fingerprint(stage):
+            return False, 'inputs, parameters or code changed'
+        age = time.time() - manifest['finished_at']
+        if stage.max_age is not None and age > stage.max_age:
+            return False, f'output is {age / 60:.0f} min old (max {stage.max_age / 60:.0f} min)'
+        return True, f'cached {age / 60:.0f} min ago'
+
+    def run_stage(self, stage, force=False):
+        """Run one stage unless its cached output is fresh. Returns True if it ran."""
+        fresh, reason = self.is_fresh(stage)
+        if fresh and not force:
+            print(f"[{stage.name}] up to date ({reason}) -> {stage.output}")
+            return False
+        for dep in stage.deps:
+            if not self.stages[dep].output.exists():
+                raise FileNotFoundError(f"[{stage.name}] missing input from stage {dep!r}: {self.stages[dep].output}")
+
+        print(f"[{stage.name}] running ({'forced' if force else reason})")
+        t0 = time.perf_counter()
+        inputs = {dep: self.stages[dep].output for dep in stage.deps}
+        stage.func(inputs, stage.output, **stage.params)
+        elapsed = time.perf_counter() - t0
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._manifest_path(stage).write_text(json.dumps({
+            'fingerprint': self.fingerprint(stage),
+            'finished_at': time.time(),
+            'seconds': round(elapsed, 3),
+            'output': str(stage.output),
+        }, indent=2))
+        print(f"[{stage.name}] done in {elapsed:.1f}s -> {stage.output}")
+        return True
+
+    def order(self, target=None):
+        """Stages in dependency order (all stages, or `target` and its ancestors)"""
+        ordered, seen = [], set()
+
+        def visit(name):
+            if name in seen:
+                return
+            seen.add(name)
+            for dep in self.stages[name].deps:
+                visit(dep)
+            ordered.append(self.stages[name])
+
+        for name in ([target] if target else self.stages):
+            visit(name)
+        return ordered
+
+    def run(self, target=None, only=False, force=False):
+        """Run `target` (default: every stage) and whatever it depends on.
+
+        only=True runs just the target stage, using existing dependency outputs.
+        force=True reruns the selected stages even if cached.
+        """
+        stages = [self.stages[target]] if only and target else self.order(target)
+        for stage in stages:
+            self.run_stage(stage, force=force)
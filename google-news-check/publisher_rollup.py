@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Rolling per-publisher statistics persisted across runs
+
+Each fetched batch is folded into a SQLite store of per-publisher, per-day
+partials (article count, topic counts, first/last seen). Window rankings
+("last 7/30/90 days") are answered by summing those daily rows, never by
+re-reading raw articles, so a monthly view costs about the same as a daily one.
+URLs already counted are remembered (articles without one by a hash of title and
+publisher), so overlapping batches are safe to ingest. Days are UTC days.
+
+Usage:
+    python publisher_rollup.py ingest etf_news_3days.json
+    python publisher_rollup.py top                 # 7, 30 and 90 day rankings
+    python publisher_rollup.py top --days 30 -n 10
+"""
+
+import argparse
+import hashlib
+import sqlite3
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import _shared  # noqa: F401  (puts ../googlenews-fetch-news/src on sys.path)
+from article import iter_articles, published_at
+from topic_tagger import load_tagger
+
+DEFAULT_DB = Path('publisher_rollup.sqlite')
+
+
+def utc_now():
+    """Current time as naive UTC, like article.parse_published"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def seen_key(article):
+    """seen_urls key: the URL, or a hash of title and publisher for articles without one"""
+    url = article.get('url')
+    if url:
+        return url
+    digest = hashlib.sha1(f"{article.get('title', '')}\n{article.get('source', '')}".encode('utf-8')).hexdigest()
+    return f"sha1:{digest}"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen_urls (url TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS daily (
+    publisher TEXT NOT NULL,
+    day TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    PRIMARY KEY (publisher, day)
+);
+CREATE TABLE IF NOT EXISTS daily_topics (
+    publisher TEXT NOT NULL,
+    day TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (publisher, day, topic)
+);
+CREATE INDEX IF NOT EXISTS daily_day ON daily (day);
+CREATE INDEX IF NOT EXISTS daily_topics_day ON daily_topics (day);
+"""
+
+
+class PublisherRollup:
+    """Per-publisher, per-day partials in SQLite"""
+
+    def __init__(self, path=DEFAULT_DB):
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def ingest(self, articles, fallback_time=None):
+        """
+        Fold a batch of articles into the daily partials. Returns number of new articles counted.
+        fallback_time (naive UTC, default now) dates articles whose published date is missing.
+        """
+        fallback_time = fallback_time or utc_now()
+        tagger = load_tagger()
+        counts = Counter()
+        first_seen, last_seen = {}, {}
+        topics = defaultdict(Counter)
+
+        with self.conn:
+            for article in articles:
+                cur = self.conn.execute("INSERT OR IGNORE INTO seen_urls VALUES (?)", (seen_key(article),))
+                if cur.rowcount == 0:
+                    continue
+                published = published_at(article) or fallback_time
+                key = (article['source'], published.date().isoformat())
+                stamp = published.isoformat(sep=' ')
+                counts[key] += 1
+                first_seen[key] = min(first_seen.get(key, stamp), stamp)
+                last_seen[key] = max(last_seen.get(key, stamp), stamp)
+                # Enriched data (run_publisher_analysis enrich stage) already carries topics
+                topics[key].update(article.get('topics') or tagger.tag(article['title']))
+
+            self.conn.executemany(
+                """INSERT INTO daily VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT (publisher, day) DO UPDATE SET
+                       count = count + excluded.count,
+                       first_seen = min(first_seen, excluded.first_seen),
+                       last_seen = max(last_seen, excluded.last_seen)""",
+                [(pub, day, n, first_seen[(pub, day)], last_seen[(pub, day)]) for (pub, day), n in counts.items()],
+            )
+            self.conn.executemany(
+                """INSERT INTO daily_topics VALUES (?, ?, ?, ?)
+                   ON CONFLICT (publisher, day, topic) DO UPDATE SET count = count + excluded.count""",
+                [(pub, day, topic, n) for (pub, day), c in topics.items() for topic, n in c.items()],
+            )
+        return sum(counts.values())
+
+    def rankings(self, days, until=None, top=20):
+        """Top publishers over the `days` days ending at `until` (default today, UTC), merged from daily partials"""
+        until = until or utc_now().date()
+        since = (until - timedelta(days=days - 1)).isoformat()
+        until = until.isoformat()
+        rows = self.conn.execute(
+            """SELECT publisher, SUM(count) AS n, MIN(first_seen), MAX(last_seen), COUNT(*)
+               FROM daily WHERE day BETWEEN ? AND ?
+               GROUP BY publisher ORDER BY n DESC, publisher LIMIT ?""",
+            (since, until, top),
+        ).fetchall()
+        topic_rows = self.conn.execute(
+            """SELECT publisher, topic, SUM(count) FROM daily_topics
+               WHERE day BETWEEN ? AND ? GROUP BY publisher, topic""",
+            (since, until),
+        ).fetchall()
+        publisher_topics = defaultdict(Counter)
+        for publisher, topic, n in topic_rows:
+            publisher_topics[publisher][topic] = n
+        return [
+            {
+                'publisher': publisher,
+                'articles': n,
+                'first_seen': first,
+                'last_seen': last,
+                'active_days': active_days,
+                'topics': publisher_topics[publisher],
+            }
+            for publisher, n, first, last, active_days in rows
+        ]
+
+
+def print_rankings(rollup, windows=(7, 30, 90), top=20, until=None):
+    """Print window rankings from the rollup store"""
+    for days in windows:
+        print("\n" + "="*80)
+        print(f"TOP PUBLISHERS - LAST {days} DAYS")
+        print("="*80)
+        ranked = rollup.rankings(days, until=until, top=top)
+        if not ranked:
+            print("  (no data in this window)")
+        for i, r in enumerate(ranked, 1):
+            main_topics = ', '.join(t for t, _ in r['topics'].most_common(3))
+            print(f"{i:2d}. {r['publisher']:35s} {r['articles']:4d} articles, {r['active_days']:3d} days  {main_topics}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rolling per-publisher statistics')
+    parser.add_argument('--db', type=Path, default=DEFAULT_DB, help='Rollup store (default: publisher_rollup.sqlite)')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_ingest = sub.add_parser('ingest', help='Fold fetched etf_news_*.json files into the store')
+    p_ingest.add_argument('files', nargs='+')
+
+    p_top = sub.add_parser('top', help='Show window rankings')
+    p_top.add_argument('--days', type=int, nargs='+', default=[7, 30, 90])
+    p_top.add_argument('-n', type=int, default=20, help='Publishers per window')
+    p_top.add_argument('--until', type=date.fromisoformat, default=None, help='Last day of the window (YYYY-MM-DD)')
+    args = parser.parse_args()
+
+    rollup = PublisherRollup(args.db)
+    try:
+        if args.command == 'ingest':
+            for filename in args.files:
+                header = {}
+                articles = list(iter_articles(filename, header))
+                fetched_at = None
+                if header.get('fetched_at'):
+                    # Fetch scripts write local time; astimezone treats a naive value as local
+                    fetched_at = datetime.fromisoformat(header['fetched_at']).astimezone(timezone.utc).replace(tzinfo=None)
+                added = rollup.ingest(articles, fallback_time=fetched_at)
+                print(f"  {filename}: {added} new articles")
+        else:
+            print_rankings(rollup, args.days, top=args.n, until=args.until)
+    finally:
+        rollup.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -2,65 +2,171 @@
 """
 ONE-CLICK ETF Publisher Analysis
 
+Runs fetch -> enrich -> rollup / analyze in-process (see pipeline.py). Each
+stage's output is cached and reused while its inputs and code are unchanged;
+fetched data is reused for --max-age minutes before Google News is queried
+again. The rollup stage folds the batch into publisher_rollup.sqlite, and
+the rolling 7/30/90-day rankings are read from it live on every run (they
+depend on the store and today's date, so they are never cached).
+
 Usage:
-    python run_publisher_analysis.py          # Analyze 3 days (default)
-    python run_publisher_analysis.py 7        # Analyze 7 days
+    python run_publisher_analysis.py                   # Analyze 3 days (default)
+    python run_publisher_analysis.py 7                 # Analyze 7 days
+    python run_publisher_analysis.py 7 --stage analyze # Only re-run the analysis on cached data
+    python run_publisher_analysis.py --force           # Refetch and recompute everything
 """
 
+import argparse
+import contextlib
+import io
+import json
 import sys
-import subprocess
+import traceback
+from datetime import datetime
 from pathlib import Path
 
+from pipeline import Pipeline, Stage
+
+HERE = Path(__file__).resolve().parent
+STAGES = ('fetch', 'enrich', 'rollup', 'analyze')
+ROLLUP_DB = Path('publisher_rollup.sqlite')
+
+
+def fetch_stage(inputs, output, days):
+    """Fetch N days of ETF news from Google News; any failed request fails the stage (nothing is cached)"""
+    from fetch_etf_news_multiday import fetch_to_file
+    fetch_to_file(days, str(output), strict=True)
+
+
+def enrich_stage(inputs, output):
+    """Tag topics and tickers per article"""
+    from etf_entities import EntityRecognizer
+    from text_store import report_missing
+    from topic_tagger import load_tagger
+
+    with open(inputs['fetch'], 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    tagger = load_tagger()
+    recognizer = EntityRecognizer(cache_path='etf_entities_cache.json')
+    for article in data['articles']:
+        article['topics'] = tagger.tag(article['title'])
+        article['tickers'] = recognizer.recognize_article(article)['tickers']
+    recognizer.save_cache()
+    report_missing()
+
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    print(f"  Enriched {len(data['articles'])} articles")
+
+
+def rollup_stage(inputs, output, db):
+    """Fold the enriched batch into the rolling publisher store; output records the ingest"""
+    from publisher_rollup import PublisherRollup
+
+    with open(inputs['enrich'], 'r', encoding='utf-8') as f:
+        articles = json.load(f)['articles']
+
+    rollup = PublisherRollup(db)
+    try:
+        added = rollup.ingest(articles)
+    finally:
+        rollup.close()
+    Path(output).write_text(json.dumps({
+        'db': str(db),
+        'ingested_at': datetime.now().isoformat(),
+        'articles': len(articles),
+        'added': added,
+    }, indent=2), encoding='utf-8')
+    print(f"  {added} of {len(articles)} articles new in rolling statistics ({db})")
+
+
+def analyze_stage(inputs, output):
+    """Publisher report for the fetched batch, saved as text"""
+    import analyze_publishers
+
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        analyze_publishers.main(str(inputs['enrich']))
+    Path(output).write_text(buffer.getvalue(), encoding='utf-8')
+
+
+def build_pipeline(days, max_age_minutes=60, db=ROLLUP_DB):
+    code = lambda *names: [HERE / name for name in names]
+    shared = lambda *names: [HERE.parent / 'googlenews-fetch-news' / 'src' / name for name in names]
+    pipeline = Pipeline()
+    pipeline.add(Stage('fetch', fetch_stage, f'etf_news_{days}days.json',
+                       params={'days': days}, max_age=max_age_minutes * 60,
+                       code=code('fetch_etf_news_multiday.py')))
+    pipeline.add(Stage('enrich', enrich_stage, f'etf_news_{days}days.enriched.json', deps=['fetch'],
+                       code=code('topic_tagger.py', 'topics.yaml', 'etf_entities.py', 'etf_symbols.csv',
+                                 'text_store.py') + shared('article.py')))
+    # max_age=0: always re-run. Ingest is idempotent (seen URLs are skipped), and the store may have
+    # been reset or moved since the recorded ingest, which no input fingerprint would show.
+    pipeline.add(Stage('rollup', rollup_stage, f'publisher_rollup_{days}days.ingest.json', deps=['enrich'],
+                       params={'db': str(db)}, max_age=0,
+                       code=code('publisher_rollup.py', 'topic_tagger.py') + shared('article.py')))
+    pipeline.add(Stage('analyze', analyze_stage, f'publisher_report_{days}days.txt', deps=['enrich'],
+                       code=code('analyze_publishers.py', 'topic_tagger.py') + shared('article.py')))
+    return pipeline
+
+
+def print_live_rankings(db=ROLLUP_DB, top=10):
+    """Rolling 7/30/90-day rankings as of today, straight from the store"""
+    from publisher_rollup import PublisherRollup, print_rankings
+
+    if not Path(db).exists():
+        print(f"\n(no rolling statistics yet: {db} does not exist)")
+        return
+    rollup = PublisherRollup(db)
+    try:
+        print_rankings(rollup, top=top)
+    finally:
+        rollup.close()
+
+
 def main():
+    parser = argparse.ArgumentParser(description='ETF publisher analysis: fetch -> enrich -> rollup / analyze')
+    parser.add_argument('days', nargs='?', type=int, default=3, help='Days of news to analyze (default: 3)')
+    parser.add_argument('--stage', choices=STAGES, default=None,
+                        help='Run only this stage, using cached outputs of earlier stages')
+    parser.add_argument('--force', action='store_true', help='Ignore cached outputs')
+    parser.add_argument('--max-age', type=int, default=60, help='Minutes before fetched data is refetched (default: 60)')
+    args = parser.parse_args()
+    days = args.days
+
     print("\n" + "="*80)
     print("ETF PUBLISHER ANALYSIS - ONE-CLICK RUN")
     print("="*80)
+    print(f"\n📊 Running analysis for {days} days of ETF news...\n")
 
-    # Get number of days from argument
-    days = 3
-    if len(sys.argv) > 1:
-        try:
-            days = int(sys.argv[1])
-        except ValueError:
-            print("Usage: python run_publisher_analysis.py [days]")
-            print("Using default: 3 days")
-
-    print(f"\n📊 Running analysis for {days} days of ETF news...")
-
-    # Step 1: Fetch articles
-    print("\n" + "-"*80)
-    print("STEP 1: Fetching articles from Google News...")
-    print("-"*80)
-
-    result = subprocess.run(
-        [sys.executable, 'fetch_etf_news_multiday.py', str(days)],
-        capture_output=False
-    )
-
-    if result.returncode != 0:
-        print("\n❌ Error fetching articles. Check your internet connection.")
+    pipeline = build_pipeline(days, args.max_age)
+    try:
+        pipeline.run(target=args.stage, only=args.stage is not None, force=args.force)
+    except FileNotFoundError as e:
+        print(f"\n❌ {e}")
+        print("   Run without --stage first to produce it.")
         return 1
-
-    # Step 2: Analyze publishers
-    print("\n" + "-"*80)
-    print("STEP 2: Analyzing publishers...")
-    print("-"*80)
-
-    result = subprocess.run(
-        [sys.executable, 'analyze_publishers.py'],
-        capture_output=False
-    )
-
-    if result.returncode != 0:
-        print("\n❌ Error analyzing publishers.")
+    except Exception as e:
+        traceback.print_exc()
+        print(f"\n❌ Error: {e}")
+        print("   If fetching failed, check your internet connection.")
         return 1
 
+    report = pipeline.stages['analyze'].output
+    if args.stage in (None, 'analyze') and report.exists():
+        print(report.read_text(encoding='utf-8'))
+    if args.stage in (None, 'rollup', 'analyze'):
+        print_live_rankings()
+
     # Done
     print("\n" + "="*80)
     print("✓ ANALYSIS COMPLETE!")
     print("="*80)
     print(f"\n📁 Files created:")
-    print(f"   - etf_news_{days}days.json (raw data)")
+    for stage in pipeline.stages.values():
+        print(f"   - {stage.output} ({stage.name})")
+    print(f"   - publisher_rollup.sqlite (rolling 7/30/90-day statistics)")
     print(f"\n💡 Next time, just tell Claude:")
     print(f'   "Run the publisher analysis for {days} days"')
     print("\n" + "="*80 + "\n")
@@ -68,4 +174,8 @@ def main():
     return 0
 
 if __name__ == "__main__":
+    import _shared  # noqa: F401
+    from import_profile import profile_imports_if_requested
+
+    profile_imports_if_requested()
     sys.exit(main())
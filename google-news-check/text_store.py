@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Content-addressed, compressed storage for article full text
+
+Each body is stored once under the sha256 of its UTF-8 text
+(article_texts/ab/abcdef....zst, or .gz when the zstandard package is not
+installed), so syndicated stories that appear under many URLs cost one
+blob. Article records keep only text_hash / text_chars / word_count and
+text_store (the store directory the body was written to, so readers find it
+wherever it lives); article_text() reads a body only when an analysis
+actually needs it.
+
+Usage:
+    python text_store.py pack etf_news_full_data.json    # move inline full_text into the store
+    python text_store.py stats
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+from collections import defaultdict
+from functools import lru_cache
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DEFAULT_ROOT = Path('article_texts')
+
+# store root -> hashes of bodies that were referenced but not found
+_missing = defaultdict(set)
+
+
+def text_hash(text):
+    """Key of a body in the store"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class TextStore:
+    """Blob directory of compressed texts keyed by text_hash()"""
+
+    def __init__(self, root=DEFAULT_ROOT):
+        self.root = Path(root)
+        self.location = str(self.root.resolve())  # recorded on articles as text_store
+        self.suffix = '.zst' if zstandard else '.gz'
+
+    def _path(self, digest, suffix):
+        return self.root / digest[:2] / f"{digest}{suffix}"
+
+    def _find(self, digest):
+        for suffix in ('.zst', '.gz'):
+            path = self._path(digest, suffix)
+            if path.exists():
+                return path
+        return None
+
+    def put(self, text):
+        """Store text (no-op if already present); returns its hash"""
+        digest = text_hash(text)
+        if self._find(digest):
+            return digest
+        data = text.encode('utf-8')
+        if zstandard:
+            blob = zstandard.ZstdCompressor(level=10).compress(data)
+        else:
+            blob = gzip.compress(data, compresslevel=6, mtime=0)
+        path = self._path(digest, self.suffix)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(blob)
+        os.replace(tmp, path)
+        return digest
+
+    def get(self, digest):
+        """Text stored under digest; KeyError if missing"""
+        path = self._find(digest)
+        if path is None:
+            raise KeyError(digest)
+        blob = path.read_bytes()
+        if path.suffix == '.zst':
+            if not zstandard:
+                raise RuntimeError(f"{path} is zstd-compressed: pip install zstandard")
+            data = zstandard.ZstdDecompressor().decompress(blob)
+        else:
+            data = gzip.decompress(blob)
+        return data.decode('utf-8')
+
+    def stats(self):
+        """(blob count, compressed bytes on disk)"""
+        blobs = [p for p in self.root.glob('*/*') if p.suffix in ('.zst', '.gz')]
+        return len(blobs), sum(p.stat().st_size for p in blobs)
+
+
+@lru_cache(maxsize=8)
+def open_store(root=DEFAULT_ROOT):
+    return TextStore(root)
+
+
+@lru_cache(maxsize=256)
+def _cached_text(root, digest):
+    return open_store(root).get(digest)
+
+
+def text_root(article, root=None):
+    """Store an article's body lives in: root if given, else the record's text_store, else DEFAULT_ROOT"""
+    return str(root or article.get('text_store') or DEFAULT_ROOT)
+
+
+def read_article_text(article, root=None):
+    """Full text of an article record, inline (full_text) or from the store (text_hash)
+
+    KeyError if the record points at a blob that is not in its store.
+    """
+    if article.get('full_text'):
+        return article['full_text']
+    digest = article.get('text_hash')
+    if not digest:
+        return ''
+    return _cached_text(text_root(article, root), digest)
+
+
+def article_text(article, root=None):
+    """Like read_article_text(), but a missing blob reads as '' (title-only analysis)
+
+    Misses are counted; call report_missing() at the end of a run.
+    """
+    try:
+        return read_article_text(article, root)
+    except KeyError:
+        note_missing(article, root)
+        return ''
+
+
+def note_missing(article, root=None):
+    """Count an article whose stored body was not found"""
+    _missing[text_root(article, root)].add(article['text_hash'])
+
+
+def missing_texts():
+    """{store root: number of referenced bodies not found}"""
+    return {root: len(digests) for root, digests in _missing.items()}
+
+
+def report_missing():
+    """Print a warning for bodies that were referenced but missing; returns how many"""
+    missing = missing_texts()
+    for root, count in missing.items():
+        print(f"⚠️  {count} article bodies missing from text store {root} (analyzed by title only); "
+              f"pass --text-store if the store was moved")
+    return sum(missing.values())
+
+
+def store_article_text(article, text, store):
+    """Put text in the store and record hash and lengths on the article (in place)"""
+    article.pop('full_text', None)
+    if text:
+        article['text_hash'] = store.put(text)
+        article['text_chars'] = len(text)
+        article['text_store'] = store.location
+    else:
+        article['text_hash'] = None
+        article['text_chars'] = 0
+        article.pop('text_store', None)
+    return article
+
+
+def pack(path, store):
+    """Rewrite an etf_news JSON file so its bodies live in the store"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    moved = 0
+    for article in data['articles']:
+        if 'full_text' in article:
+            store_article_text(article, article.get('full_text') or '', store)
+            moved += 1
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    return moved
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Content-addressed article text store')
+    parser.add_argument('--root', type=Path, default=DEFAULT_ROOT, help='Store directory')
+    sub = parser.add_subparsers(dest='command', required=True)
+    p = sub.add_parser('pack', help='Move inline full_text of JSON files into the store')
+    p.add_argument('files', nargs='+')
+    sub.add_parser('stats', help='Blob count and size')
+    args = parser.parse_args()
+
+    store = TextStore(args.root)
+    if args.command == 'pack':
+        for filename in args.files:
+            before = os.path.getsize(filename)
+            moved = pack(filename, store)
+            print(f"{filename}: {moved} bodies moved, {before / 1e6:.1f} MB -> {os.path.getsize(filename) / 1e6:.1f} MB")
+    blobs, size = store.stats()
+    print(f"{store.root}: {blobs} texts, {size / 1e6:.1f} MB compressed ({'zstd' if zstandard else 'gzip'})")
+
+
+if __name__ == '__main__':
+    main()
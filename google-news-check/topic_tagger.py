@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Single-pass topic tagging for article titles
+
+The taxonomy in topics.yaml is compiled once into a word-level trie, so
+matches always start and end on word boundaries. Each title is tokenized
+once and the trie is walked from every token, collecting every keyword that
+starts there (a plain trie walk per start token, no failure links). The walk
+stops as soon as a token has no child, so tagging cost depends on title
+length and keyword length in words, not on how many topics or keywords the
+taxonomy has.
+"""
+
+from functools import lru_cache
+from pathlib import Path
+import re
+
+import yaml
+
+TOPICS_FILE = Path(__file__).resolve().parent / 'topics.yaml'
+DEFAULT_TOPIC = 'General'
+
+# Words, keeping inner & and . (s&p, u.s.); apostrophes split ("blackrock's" -> blackrock, s)
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:[&.][a-z0-9]+)*")
+
+
+class _Node:
+    __slots__ = ('children', 'prefixes', 'topics')
+
+    def __init__(self):
+        self.children = {}   # next word -> _Node
+        self.prefixes = {}   # word prefix (from "word*") -> set of topic ids
+        self.topics = set()  # topic ids of keywords ending here
+
+
+class TopicTagger:
+    """Compiled taxonomy: tag(title) -> topics in taxonomy order"""
+
+    def __init__(self, taxonomy):
+        self.topics = list(taxonomy)
+        self.root = _Node()
+        self.prefix_lengths = set()
+        for topic_id, keywords in enumerate(taxonomy.values()):
+            for keyword in keywords:
+                self._add(str(keyword).lower(), topic_id)
+
+    @classmethod
+    def from_yaml(cls, path=TOPICS_FILE):
+        data = yaml.safe_load(Path(path).read_text(encoding='utf-8'))
+        return cls(data['topics'])
+
+    def _add(self, keyword, topic_id):
+        words = TOKEN_RE.findall(keyword.rstrip('*'))
+        if not words:
+            return
+        node = self.root
+        for word in words[:-1]:
+            node = node.children.setdefault(word, _Node())
+        last = words[-1]
+        if keyword.endswith('*'):
+            node.prefixes.setdefault(last, set()).add(topic_id)
+            self.prefix_lengths.add(len(last))
+        else:
+            node.children.setdefault(last, _Node()).topics.add(topic_id)
+
+    def _match_ids(self, title):
+        tokens = TOKEN_RE.findall(title.lower())
+        found = set()
+        for start in range(len(tokens)):
+            node = self.root
+            for token in tokens[start:]:
+                if node.prefixes:
+                    for n in self.prefix_lengths:
+                        ids = node.prefixes.get(token[:n]) if n <= len(token) else None
+                        if ids:
+                            found |= ids
+                node = node.children.get(token)
+                if node is None:
+                    break
+                found |= node.topics
+        return found
+
+    def tag(self, title, default=DEFAULT_TOPIC):
+        """Topics found in title (taxonomy order); [default] if none"""
+        ids = self._match_ids(title)
+        if not ids:
+            return [default] if default else []
+        return [self.topics[i] for i in sorted(ids)]
+
+    def tag_many(self, titles, default=DEFAULT_TOPIC):
+        """Tag a whole list of titles"""
+        return [self.tag(title, default) for title in titles]
+
+
+@lru_cache(maxsize=None)
+def load_tagger(path=TOPICS_FILE):
+    """Compiled tagger for a taxonomy file (compiled once per process)"""
+    return TopicTagger.from_yaml(path)
+
+
+if __name__ == '__main__':
+    import sys
+
+    tagger = load_tagger()
+    for line in sys.stdin:
+        if line.strip():
+            print(f"{', '.join(tagger.tag(line))}\t{line.strip()}")
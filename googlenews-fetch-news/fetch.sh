@@ -6,6 +6,6 @@ echo "━━━━━━━━━━━━━━━━━━━━━━━━
 uv run python src/stage1_fetch.py "$@"
 
 echo ""
-echo "✓ Complete! Results saved to data/ (timestamped YAML)"
+echo "✓ Complete! New articles queued in data/work_queue.sqlite (+ timestamped YAML in data/)"
 echo ""
-echo "Next: Run external application for content fetching & summarization"
+echo "Next: Run external application for content fetching & summarization (consumes the work queue)"
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Compact article record shared by googlenews-fetch-news and google-news-check.
+- Article uses __slots__ for the common fields (url, title, publisher, published,
+  description); anything else (full_text, text_hash, topics, ...) goes in `extra`,
+  which stays None for plain metadata records.
+- published_at is parsed once at load time (GNews "Fri, 06 Feb 2026 18:45:04 GMT",
+  stage1 "2026-02-06 18:45:04" or ISO; naive UTC) and the date string is not kept:
+  published is rendered from it in GNews format (only unparseable strings are stored).
+  Publisher names are interned, so each name is one string object however many
+  articles it has.
+- Field-name differences are normalized: publisher / publisher.title / source and
+  published / published date. get() and [] accept either name, so code written for
+  the dict records keeps working with Articles.
+- iter_articles() loads etf_news_*.json ({"articles": [...]}), stage1 articles_*.yaml,
+  plain JSON lists and JSONL (.gz too). JSONL streams in constant memory; JSON / YAML
+  documents are parsed once and each record is freed as soon as it is converted.
+
+Usage:
+    python src/article.py data/articles_*.yaml ../google-news-check/etf_news_7days.json
+"""
+
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Iterator
+import argparse
+import gzip
+import json
+import sys
+import time
+
+GNEWS_FORMAT = "%a, %d %b %Y %H:%M:%S GMT"
+DATE_FORMATS = ("%a, %d %b %Y %H:%M:%S %Z", "%Y-%m-%d %H:%M:%S")
+MONTHS = {m: i for i, m in enumerate(("Jan", "Feb", "Mar", "Apr", "May", "Jun",
+                                      "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"), 1)}
+ALIASES = {"source": "publisher", "published date": "published"}
+KNOWN_KEYS = {"url", "title", "publisher", "source", "published", "published date", "description"}
+_MISSING = object()
+
+
+def parse_published(value) -> datetime | None:
+    """Naive-UTC datetime for a GNews, stage1 or ISO date string; None if unparseable."""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value
+    # Fast path for "Fri, 06 Feb 2026 18:45:04 GMT" (strptime is ~5x slower)
+    parts = value.split(" ") if isinstance(value, str) else ()
+    if len(parts) == 6 and parts[5] in ("GMT", "UTC") and parts[2] in MONTHS:
+        try:
+            hh, mm, ss = parts[4].split(":")
+            return datetime(int(parts[3]), MONTHS[parts[2]], int(parts[1]), int(hh), int(mm), int(ss))
+        except ValueError:
+            pass
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except (TypeError, ValueError):
+            pass
+    try:
+        dt = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    return dt.astimezone(timezone.utc).replace(tzinfo=None) if dt.tzinfo else dt
+
+
+def publisher_name(record: dict) -> str:
+    """Publisher of a raw GNews article (publisher.title), stage1 record (publisher) or etf record (source)."""
+    pub = record.get("publisher")
+    if isinstance(pub, dict):
+        pub = pub.get("title")
+    name = pub if isinstance(pub, str) and pub else record.get("source")
+    return sys.intern(name.strip()) if isinstance(name, str) else ""
+
+
+class Article:
+    """One news article; published_at is parsed, publisher interned."""
+
+    __slots__ = ("url", "title", "publisher", "published_at", "description", "extra", "_unparsed")
+
+    def __init__(self, url: str = "", title: str = "", publisher: str = "", published: str = "",
+                 description: str = "", extra: dict | None = None):
+        self.url = url
+        self.title = title
+        self.publisher = sys.intern(publisher)
+        self.published = published
+        self.description = description
+        self.extra = extra or None
+
+    @property
+    def published(self) -> str:
+        """Publication time in GNews format (or the original string if it could not be parsed)."""
+        if self.published_at is not None:
+            return self.published_at.strftime(GNEWS_FORMAT)
+        return self._unparsed
+
+    @published.setter
+    def published(self, value) -> None:
+        self.published_at = parse_published(value)
+        self._unparsed = None if self.published_at is not None else (value or "")
+
+    @classmethod
+    def from_dict(cls, record: dict) -> "Article":
+        extra = {k: v for k, v in record.items() if k not in KNOWN_KEYS}
+        published = record.get("published") or record.get("published date") or ""
+        return cls(
+            url=(record.get("url") or "").strip(),
+            title=(record.get("title") or "").strip(),
+            publisher=publisher_name(record),
+            published=published if isinstance(published, str) else str(published),
+            description=record.get("description") or "",
+            extra=extra,
+        )
+
+    def to_dict(self, publisher_key: str = "source") -> dict:
+        """etf_news record shape (publisher_key="publisher" for stage1's)."""
+        record = {"title": self.title, publisher_key: self.publisher, "published": self.published, "url": self.url}
+        if self.description:
+            record["description"] = self.description
+        if self.extra:
+            record.update(self.extra)
+        return record
+
+    def get(self, key: str, default=None):
+        key = ALIASES.get(key, key)
+        if key in KNOWN_KEYS:
+            return getattr(self, key)
+        return self.extra.get(key, default) if self.extra else default
+
+    def __getitem__(self, key: str):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value) -> None:
+        key = ALIASES.get(key, key)
+        if key in KNOWN_KEYS:
+            setattr(self, key, sys.intern(value) if key == "publisher" else value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __repr__(self) -> str:
+        return f"Article({self.publisher!r}, {self.published_at}, {self.title[:60]!r})"
+
+
+def published_at(article) -> datetime | None:
+    """published_at of an Article, or parsed from a dict record."""
+    if isinstance(article, Article):
+        return article.published_at
+    return parse_published(article.get("published") or article.get("published date"))
+
+
+def _open_text(path: Path):
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def _drain(records: list) -> Iterator[dict]:
+    # Drop the list's reference to each record once handed out, so parsed dicts are freed as they are converted
+    for i in range(len(records)):
+        record, records[i] = records[i], None
+        yield record
+
+
+def iter_records(path: Path | str, header: dict | None = None) -> Iterator[dict]:
+    """
+    Raw article dicts from a JSON / YAML / JSONL file (.gz allowed).
+    header, if given, receives the file's top-level fields other than articles
+    (fetched_at, search_query, date_range, ...) once iteration starts.
+    """
+    path = Path(path)
+    kind = path.with_suffix("").suffix if path.suffix == ".gz" else path.suffix
+    if kind == ".jsonl":
+        with _open_text(path) as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        return
+    with _open_text(path) as f:
+        if kind in (".yaml", ".yml"):
+            import yaml
+
+            data = yaml.load(f, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader)) or {}
+        else:
+            data = json.load(f)
+    if isinstance(data, dict):
+        records = data.pop("articles", None) or []
+        if header is not None:
+            header.update(data)
+    else:
+        records = data
+    del data
+    yield from _drain(records)
+
+
+def iter_articles(path: Path | str, header: dict | None = None) -> Iterator[Article]:
+    """Articles from one file, converted record by record (see iter_records)."""
+    for record in iter_records(path, header):
+        yield Article.from_dict(record)
+
+
+def load_articles(paths: Iterable[Path | str], headers: list[dict] | None = None, dedup: bool = True) -> list[Article]:
+    """
+    Articles from several files; with dedup, the first article per URL wins.
+    headers, if given, gets one {"file": ..., **header} dict per file.
+    """
+    articles, seen = [], set()
+    for path in paths:
+        header = {}
+        for article in iter_articles(path, header):
+            if dedup and article.url:
+                if article.url in seen:
+                    continue
+                seen.add(article.url)
+            articles.append(article)
+        if headers is not None:
+            headers.append({"file": str(path), **header})
+    return articles
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load article files and report counts, date range and load time.")
+    parser.add_argument("files", nargs="+", type=Path)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    articles = load_articles(args.files)
+    elapsed = time.perf_counter() - t0
+    dated = [a.published_at for a in articles if a.published_at]
+    publishers = {a.publisher for a in articles}
+    print(f"{len(articles)} unique articles from {len(args.files)} files in {elapsed:.2f}s "
+          f"({len(publishers)} publishers, {len(articles) - len(dated)} without a parseable date)")
+    if dated:
+        print(f"Published {min(dated):%Y-%m-%d %H:%M} .. {max(dated):%Y-%m-%d %H:%M} UTC")
+
+
+if __name__ == "__main__":
+    main()
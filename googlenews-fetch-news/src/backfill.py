@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Building blocks for stage1's historical backfill (stage1_fetch.py --backfill START END).
+- windows() splits [start, end) into day or hour windows (UTC, like GNews dates).
+- Checkpoint records finished windows in a JSON file (rewritten atomically), so an
+  interrupted backfill resumes where it stopped.
+- GNews only sends day-granular after:/before: dates to Google, so the backfill fetches
+  one request per day; hour windows split that day's result (split_day) and keep the
+  articles published inside each hour. Hour windows therefore cannot return more than
+  the day's max_results.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+import json
+import os
+
+WINDOW_SIZES = {"day": timedelta(days=1), "hour": timedelta(hours=1)}
+GNEWS_DATE_FORMAT = "%a, %d %b %Y %H:%M:%S %Z"
+
+
+def parse_bound(value: str, end: bool = False) -> datetime:
+    """Naive-UTC bound from an ISO date or datetime (offsets are converted); a bare END date includes that whole day."""
+    dt = datetime.fromisoformat(value)
+    if end and len(value) <= 10:
+        dt += timedelta(days=1)
+    return dt.astimezone(timezone.utc).replace(tzinfo=None) if dt.tzinfo else dt
+
+
+def windows(start: datetime, end: datetime, size: timedelta) -> list[tuple[datetime, datetime]]:
+    """Consecutive [start, end) windows of the given size; the last one is clipped to end."""
+    out = []
+    cursor = start
+    while cursor < end:
+        out.append((cursor, min(cursor + size, end)))
+        cursor += size
+    return out
+
+
+def published_at(article: dict) -> datetime | None:
+    """Parsed GNews "published date" (GMT, naive), or None."""
+    try:
+        return datetime.strptime(article.get("published date") or "", GNEWS_DATE_FORMAT)
+    except ValueError:
+        return None
+
+
+def in_window(article: dict, start: datetime, end: datetime, first: bool = False) -> bool:
+    """Published inside [start, end); undated articles belong only to the day's first window (first=True)."""
+    published = published_at(article)
+    if published is None:
+        return first
+    return start <= published < end
+
+
+class Checkpoint:
+    """Finished windows of one backfill (same query / range / window size), persisted as JSON."""
+
+    def __init__(self, path: Path, meta: dict):
+        self.path = path
+        self.meta = meta
+        self.done: set[str] = set()
+        if path.exists():
+            saved = json.loads(path.read_text(encoding="utf-8"))
+            if saved.get("meta") != meta:
+                raise ValueError(f"Checkpoint {path} belongs to a different backfill: {saved.get('meta')}")
+            self.done = set(saved.get("done", []))
+
+    @staticmethod
+    def key(window_start: datetime) -> str:
+        return window_start.isoformat(timespec="minutes")
+
+    def is_done(self, window_start: datetime) -> bool:
+        return self.key(window_start) in self.done
+
+    def mark(self, window_start: datetime) -> None:
+        self.done.add(self.key(window_start))
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"meta": self.meta, "updated_at": datetime.now().isoformat(),
+                                   "done": sorted(self.done)}, indent=1), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+def split_day(raw: list[dict], day_windows: list[tuple[datetime, datetime]],
+              first_start: datetime | None = None) -> list[tuple[tuple[datetime, datetime], list[dict]]]:
+    """
+    (window, articles in it) for each of one day's windows, from that day's single response.
+    Undated articles go to the window starting at first_start: the day's first window of the
+    whole backfill (default: the first of day_windows), which need not start at midnight.
+    """
+    if len(day_windows) == 1 and day_windows[0][1] - day_windows[0][0] >= timedelta(days=1):
+        return [(day_windows[0], raw)]
+    first_start = day_windows[0][0] if first_start is None else first_start
+    return [(w, [a for a in raw if in_window(a, *w, first=w[0] == first_start)]) for w in day_windows]
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+GNews wrapper with record / replay of raw get_news responses.
+- live:   call Google News.
+- record: call Google News and append each response, with its query and GNews
+          parameters, to a gzip JSONL archive.
+- replay: serve responses from the archive (no network), optionally with simulated
+          latency and scaled to N x the recorded volume for offline benchmarks.
+
+Live requests go through a shared request layer:
+- Exceptions are retried with jittered exponential backoff.
+- GNews swallows HTTP errors (429s included) and returns [], so an empty response is
+  treated as suspect and retried at the paced rate. Only a response that stays empty
+  after the empty-retries is accepted as "no articles". Empty responses are not throttle
+  signals: a query with many genuinely empty days must not drag the rate down.
+- An AIMD RateController paces requests: +increase req/s after each success, x decrease
+  on each throttle signal (an exception), so the rate settles just below where Google
+  starts refusing.
+  One controller is shared by all clients in the process (fan-out, backfills).
+- stats() reports requests, retries, throttle signals, failures, latency p50/p95 and rate.
+
+Replay matches on query + parameters; date parameters are ignored when there is no
+exact match, so a recording keeps working on later days. Repeated calls with the
+same key return the recorded responses in order (cycling).
+
+Scripts can also be switched by environment variables (see from_env):
+    GNEWS_RECORD=data/gnews.jsonl.gz python src/stage1_fetch.py
+    GNEWS_REPLAY=data/gnews.jsonl.gz GNEWS_REPLAY_SCALE=100 python src/stage1_fetch.py
+
+Usage:
+    python src/gnews_client.py data/gnews.jsonl.gz     # list archive contents
+"""
+
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+
+DATE_PARAMS = ("start_date", "end_date", "period")
+
+
+def _params_json(params: dict) -> dict:
+    return {k: (v if isinstance(v, (int, float, bool)) or v is None else str(v)) for k, v in sorted(params.items())}
+
+
+def response_key(query: str, params: dict, ignore_dates: bool = False) -> str:
+    """Archive lookup key for a query and GNews parameters."""
+    kept = {k: v for k, v in _params_json(params).items() if not (ignore_dates and k in DATE_PARAMS)}
+    blob = json.dumps({"query": query, "params": kept}, sort_keys=True)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+
+def scale_articles(articles: list[dict], scale: int) -> list[dict]:
+    """articles repeated scale times; copies get distinct URLs so they survive dedup."""
+    if scale <= 1:
+        return articles
+    out = list(articles)
+    for k in range(1, scale):
+        for article in articles:
+            url = article.get("url") or ""
+            out.append({**article, "url": f"{url}{'&' if '?' in url else '?'}replay={k}"})
+    return out
+
+
+class NewsFetchError(RuntimeError):
+    """get_news kept failing after all retries."""
+
+
+class RateController:
+    """Thread-safe AIMD pacing of requests (rate in requests per second)."""
+
+    def __init__(self, rate: float = 1.0, min_rate: float = 0.05, max_rate: float = 5.0,
+                 increase: float = 0.1, decrease: float = 0.5):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self._next_at = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until the next request slot."""
+        with self._lock:
+            now = time.monotonic()
+            at = max(now, self._next_at)
+            self._next_at = at + 1.0 / self.rate
+        if at > now:
+            time.sleep(at - now)
+
+    def on_success(self) -> None:
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self) -> None:
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            # Back off the schedule immediately, not only from the next slot on
+            self._next_at = max(self._next_at, time.monotonic() + 1.0 / self.rate)
+
+
+_shared_controller = RateController(rate=float(os.environ.get("GNEWS_RATE", "1.0")))
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 60.0) -> float:
+    """Full-jitter exponential backoff: uniform(0, min(cap, base * 2**attempt))."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def percentile(values: list[float], q: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class NewsClient:
+    """Drop-in for GNews(...).get_news(query) with record / replay support."""
+
+    def __init__(self, mode: str = "live", archive: Path | str | None = None, latency: float | str | None = None,
+                 scale: int = 1, *, max_retries: int = 4, empty_retries: int = 2, backoff_base: float = 1.0,
+                 controller: RateController | None = None, **params):
+        if mode not in ("live", "record", "replay"):
+            raise ValueError(f"Unknown mode: {mode}")
+        if mode != "live" and archive is None:
+            raise ValueError(f"{mode} mode needs an archive path")
+        self.mode = mode
+        self.archive = Path(archive) if archive else None
+        self.latency = latency  # seconds, "recorded", or None
+        self.scale = scale
+        self.params = params
+        self.max_retries = max_retries
+        self.empty_retries = empty_retries
+        self.backoff_base = backoff_base
+        self.controller = controller or _shared_controller
+        self.counters = {"requests": 0, "attempts": 0, "retries": 0, "throttled": 0, "empty": 0, "failures": 0}
+        self.latencies: list[float] = []
+        self._lock = threading.Lock()
+        self._exact: dict[str, list[dict]] = defaultdict(list)
+        self._loose: dict[str, list[dict]] = defaultdict(list)
+        self._cursor: dict[str, int] = defaultdict(int)
+        if mode == "replay":
+            self._load()
+
+    @classmethod
+    def from_env(cls, **params) -> "NewsClient":
+        """Client configured by GNEWS_RECORD / GNEWS_REPLAY (+ _LATENCY, _SCALE); live otherwise."""
+        if os.environ.get("GNEWS_REPLAY"):
+            latency = os.environ.get("GNEWS_REPLAY_LATENCY")
+            if latency and latency != "recorded":
+                latency = float(latency)
+            return cls("replay", os.environ["GNEWS_REPLAY"], latency=latency or None,
+                       scale=int(os.environ.get("GNEWS_REPLAY_SCALE", "1")), **params)
+        if os.environ.get("GNEWS_RECORD"):
+            return cls("record", os.environ["GNEWS_RECORD"], **params)
+        return cls(**params)
+
+    @property
+    def offline(self) -> bool:
+        return self.mode == "replay"
+
+    def _load(self) -> None:
+        for entry in read_archive(self.archive):
+            self._exact[entry["key"]].append(entry)
+            self._loose[entry["loose_key"]].append(entry)
+
+    def _replay(self, query: str, params: dict) -> list[dict]:
+        key = response_key(query, params)
+        entries = self._exact.get(key) or self._loose.get(response_key(query, params, ignore_dates=True))
+        if not entries:
+            raise KeyError(f"No recorded response for query {query!r} in {self.archive}")
+        with self._lock:
+            entry = entries[self._cursor[key] % len(entries)]
+            self._cursor[key] += 1
+        if self.latency == "recorded":
+            time.sleep(entry.get("elapsed", 0))
+        elif self.latency:
+            time.sleep(float(self.latency))
+        return scale_articles([dict(a) for a in entry["articles"]], self.scale)
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[key] += n
+
+    def _fetch(self, query: str, params: dict) -> tuple[list[dict], float]:
+        """One live request with retries; returns (articles, seconds of the successful attempt)."""
+        from gnews import GNews
+
+        self._count("requests")
+        empties = 0
+        raised = None  # last exception; an empty response after a failure is not a clean "no articles"
+        elapsed = 0.0
+        backoffs = 0
+        failed = False  # previous attempt raised
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._count("retries")
+            if failed:
+                time.sleep(backoff_delay(backoffs - 1, self.backoff_base))
+            failed = False
+            self.controller.acquire()
+            self._count("attempts")
+            t0 = time.perf_counter()
+            try:
+                articles = GNews(**params).get_news(query) or []
+            except Exception as e:
+                raised, failed = e, True
+                backoffs += 1
+                self._count("throttled")
+                self.controller.on_throttle()
+            else:
+                elapsed = time.perf_counter() - t0
+                with self._lock:
+                    self.latencies.append(elapsed)
+                if articles:
+                    self.controller.on_success()
+                    return articles, elapsed
+                # Empty: maybe a swallowed 429 / network error, maybe really nothing
+                empties += 1
+                self._count("empty")
+                if empties > self.empty_retries:
+                    break
+        if raised is not None:
+            self._count("failures")
+            raise NewsFetchError(f"get_news({query!r}) failed after {attempt + 1} attempts "
+                                 f"({empties} empty): {raised}") from raised
+        return [], elapsed
+
+    def stats(self) -> dict:
+        """Request, retry and latency counters plus the current paced rate."""
+        with self._lock:
+            latencies = list(self.latencies)
+            counters = dict(self.counters)
+        return {
+            **counters,
+            "latency_p50": round(percentile(latencies, 0.50) or 0, 3),
+            "latency_p95": round(percentile(latencies, 0.95) or 0, 3),
+            "rate_per_sec": round(self.controller.rate, 3),
+        }
+
+    def get_news(self, query: str, **overrides) -> list[dict]:
+        """
+        Articles for query; [] only if it stays empty after retries. Raises NewsFetchError on failure.
+        overrides replace GNews parameters for this call only (e.g. start_date / end_date of a backfill window).
+        """
+        params = {**self.params, **overrides}
+        if self.mode == "replay":
+            return self._replay(query, params)
+
+        articles, elapsed = self._fetch(query, params)
+        if self.mode == "record":
+            entry = {
+                "key": response_key(query, params),
+                "loose_key": response_key(query, params, ignore_dates=True),
+                "query": query,
+                "params": _params_json(params),
+                "recorded_at": datetime.now().isoformat(),
+                "elapsed": round(elapsed, 3),
+                "articles": articles,
+            }
+            self.archive.parent.mkdir(parents=True, exist_ok=True)
+            # Appending gzip members keeps the archive one valid gzip stream
+            with self._lock, gzip.open(self.archive, "at", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+        return articles
+
+
+def read_archive(path: Path | str) -> list[dict]:
+    """All recorded responses, oldest first."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="List a recorded Google News archive.")
+    parser.add_argument("archive", type=Path)
+    args = parser.parse_args()
+
+    entries = read_archive(args.archive)
+    for entry in entries:
+        params = entry["params"]
+        dates = f"{params.get('start_date', '')}..{params.get('end_date', '')}"
+        print(f"{entry['recorded_at'][:19]}  {len(entry['articles']):4d} articles  {entry['elapsed']:6.2f}s  "
+              f"{dates:24s}  {entry['query'][:60]}")
+    print(f"{len(entries)} responses, {sum(len(e['articles']) for e in entries)} articles, "
+          f"{args.archive.stat().st_size / 1e3:.1f} kB")
+
+
+if __name__ == "__main__":
+    main()
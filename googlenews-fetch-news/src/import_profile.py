@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+--import-profile support for CLI entry points (shared by all four projects; the others
+reach it through their _shared.py).
+Call profile_imports_if_requested() at the start of the __main__ block: if the flag is
+on the command line, the script re-runs itself under `python -X importtime` (flag
+removed), then prints total import time and the slowest imports to stderr.
+- --import-profile: the child stops right after the script's module-level imports, so
+  no fetches, model loads or writes happen; this is the startup cost.
+- --import-profile=full: the child runs the whole command, which also profiles the
+  lazy imports inside main() (and repeats all of its work).
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+FLAG = "--import-profile"
+FULL_FLAG = "--import-profile=full"
+CHILD_ENV = "IMPORT_PROFILE_CHILD"
+
+
+def parse_importtime(stderr: str) -> tuple[list[tuple[str, int, int, int]], list[str]]:
+    """(rows of (module, self_us, cumulative_us, depth), other stderr lines)."""
+    rows, other = [], []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            other.append(line)
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        name = parts[2]
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), int(parts[0]), int(parts[1]), depth))
+    return rows, other
+
+
+def format_report(rows: list[tuple[str, int, int, int]], wall: float, top: int = 15) -> str:
+    top_level = [r for r in rows if r[3] == 0]
+    total_us = sum(r[2] for r in top_level)
+    lines = [
+        "",
+        "=" * 60,
+        f"IMPORT PROFILE: {total_us / 1e3:.0f} ms of {wall * 1e3:.0f} ms wall ({len(rows)} modules)",
+        "=" * 60,
+        "Slowest top-level imports (cumulative, incl. dependencies):",
+    ]
+    lines += [f"  {cum / 1e3:9.1f} ms  {name}" for name, _, cum, _ in sorted(top_level, key=lambda r: -r[2])[:top]]
+    lines.append("Slowest modules (self time):")
+    lines += [f"  {own / 1e3:9.1f} ms  {name}" for name, own, _, _ in sorted(rows, key=lambda r: -r[1])[:top]]
+    return "\n".join(lines)
+
+
+def profile_imports_if_requested(argv: list[str] | None = None) -> None:
+    """Re-run the current script with -X importtime when --import-profile is given; exits."""
+    if os.environ.get(CHILD_ENV) == "startup":
+        # Profiled child: module-level imports are done, skip the actual run
+        sys.exit(0)
+    argv = sys.argv if argv is None else argv
+    if FLAG not in argv and FULL_FLAG not in argv:
+        return
+    mode = "full" if FULL_FLAG in argv else "startup"
+    args = [a for a in argv if a not in (FLAG, FULL_FLAG)]
+    env = {**os.environ, CHILD_ENV: mode}
+    t0 = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", *args], stderr=subprocess.PIPE, text=True, env=env)
+    wall = time.perf_counter() - t0
+    rows, other = parse_importtime(proc.stderr)
+    if other:
+        print("\n".join(other), file=sys.stderr)
+    print(format_report(rows, wall), file=sys.stderr)
+    if mode == "startup":
+        print(f"(module-level imports only; {FULL_FLAG} runs the whole command)", file=sys.stderr)
+    sys.exit(proc.returncode)
+
+
+if __name__ == "__main__":
+    # python src/import_profile.py some_script.py [args...]  (profiles the whole run)
+    profile_imports_if_requested([*sys.argv[1:], FULL_FLAG])
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Per-run instrumentation: stage wall times, items in/out, drop reasons and gauges.
+- write_json(): one machine-readable run record (kept per run, for trending).
+- write_prometheus(): node_exporter textfile-collector format (latest run).
+"""
+
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+import json
+import os
+import time
+
+
+class RunStats:
+    """Collects timings and counters for one pipeline run."""
+
+    def __init__(self, job: str):
+        self.job = job
+        self.started_at = datetime.now().isoformat()
+        self._t0 = time.perf_counter()
+        self.stages: dict[str, dict] = {}
+        self.drops: Counter = Counter()
+        self.gauges: dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str, items_in: int | None = None):
+        """Time a stage; set record["items_out"] (and items_in) inside the block."""
+        record = {"seconds": 0.0, "items_in": items_in, "items_out": None}
+        self.stages[name] = record
+        t0 = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["seconds"] = round(time.perf_counter() - t0, 6)
+
+    def drop(self, reason: str, n: int = 1) -> None:
+        self.drops[reason] += n
+
+    def gauge(self, name: str, value: float) -> None:
+        self.gauges[name] = value
+
+    def to_dict(self) -> dict:
+        return {
+            "job": self.job,
+            "started_at": self.started_at,
+            "total_seconds": round(time.perf_counter() - self._t0, 6),
+            "stages": self.stages,
+            "drops": dict(self.drops),
+            "gauges": self.gauges,
+        }
+
+    def summary(self) -> str:
+        """One line per stage, for the console."""
+        lines = []
+        for name, rec in self.stages.items():
+            flow = "" if rec["items_out"] is None else str(rec["items_out"])
+            if rec["items_in"] is not None:
+                flow = f"{rec['items_in']} -> {flow}"
+            lines.append(f"  {name:20s} {rec['seconds'] * 1000:9.1f} ms  {flow}")
+        if self.drops:
+            lines.append("  dropped: " + ", ".join(f"{k}={v}" for k, v in self.drops.most_common()))
+        return "\n".join(lines)
+
+    def write_json(self, path: Path) -> None:
+        path.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+
+    def write_prometheus(self, path: Path) -> None:
+        """Write metrics atomically (the textfile collector may read at any time)."""
+        job = self.job
+        data = self.to_dict()
+        lines = [
+            f"# HELP {job}_run_seconds Wall time of the last run.",
+            f"# TYPE {job}_run_seconds gauge",
+            f"{job}_run_seconds {data['total_seconds']}",
+            f"# HELP {job}_last_run_timestamp_seconds Unix time the last run finished.",
+            f"# TYPE {job}_last_run_timestamp_seconds gauge",
+            f"{job}_last_run_timestamp_seconds {time.time():.0f}",
+        ]
+        for metric, key, help_text in (
+            ("stage_seconds", "seconds", "Wall time per stage of the last run."),
+            ("stage_items_in", "items_in", "Items entering each stage in the last run."),
+            ("stage_items_out", "items_out", "Items leaving each stage in the last run."),
+        ):
+            lines += [f"# HELP {job}_{metric} {help_text}", f"# TYPE {job}_{metric} gauge"]
+            lines += [f'{job}_{metric}{{stage="{name}"}} {rec[key]}'
+                      for name, rec in self.stages.items() if rec[key] is not None]
+        lines += [f"# HELP {job}_dropped_items Items dropped in the last run, by reason.",
+                  f"# TYPE {job}_dropped_items gauge"]
+        lines += [f'{job}_dropped_items{{reason="{reason}"}} {n}' for reason, n in sorted(self.drops.items())]
+        for name, value in sorted(self.gauges.items()):
+            lines += [f"# TYPE {job}_{name} gauge", f"{job}_{name} {value}"]
+
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        os.replace(tmp, path)
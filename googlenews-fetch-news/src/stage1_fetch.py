@@ -2,16 +2,32 @@
 """
 Stage 1: Fetch article metadata from Google News.
 - Reads publisher whitelist and search queries from config files.
-- Fetches articles (last 1 day), filters by whitelist, deduplicates by URL.
-- Outputs data/articles_YYYYMMDD_HHMMSS.yaml (timestamped) and appends new URLs to data/processed_urls.txt.
+- Fetches articles (last 1 day), filters by whitelist, resolves Google News redirect
+  links to publisher URLs and deduplicates by canonical URL.
+- Google News responses can be recorded to / replayed from an archive (see gnews_client.py).
+- Enqueues new articles into data/work_queue.sqlite for downstream consumers (see work_queue.py).
+- Also outputs data/articles_YYYYMMDD_HHMMSS.yaml (timestamped; --no-yaml to skip) and appends
+  new URLs to data/processed_urls.txt.
+- Records stage timings, counts and drop reasons in articles_*.stats.json and data/stage1.prom.
+- --backfill START END walks a historical range in day or hour windows (bounded concurrency,
+  checkpointed so an interrupted backfill resumes) through the same filter, dedup and outputs.
 """
 
-from gnews import GNews
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
 from datetime import datetime, timedelta
 from pathlib import Path
 import argparse
+import hashlib
 import yaml
 
+from article import parse_published, publisher_name
+from backfill import WINDOW_SIZES, Checkpoint, parse_bound, split_day, windows
+from gnews_client import NewsClient, NewsFetchError
+from run_stats import RunStats
+from url_resolver import UrlResolver
+from work_queue import WorkQueue
+
 
 def project_root() -> Path:
     """Project root (directory containing publisher_whitelist.txt)."""
@@ -46,24 +62,13 @@ def combined_query(queries: list[str]) -> str:
 
 def get_publisher(article: dict) -> str:
     """Extract publisher name from GNews article (publisher.title or source)."""
-    pub = article.get("publisher")
-    if isinstance(pub, dict) and pub.get("title"):
-        return pub["title"].strip()
-    if isinstance(article.get("source"), str):
-        return article["source"].strip()
-    return ""
+    return publisher_name(article)
 
 
 def parse_published_date(date_str: str) -> str:
     """Parse GNews date and return YAML-friendly string (YYYY-MM-DD HH:MM:SS)."""
-    if not date_str:
-        return ""
-    try:
-        # Format: "Fri, 06 Feb 2026 18:45:04 GMT"
-        dt = datetime.strptime(date_str, "%a, %d %b %Y %H:%M:%S %Z")
-        return dt.strftime("%Y-%m-%d %H:%M:%S")
-    except Exception:
-        return date_str
+    dt = parse_published(date_str)
+    return dt.strftime("%Y-%m-%d %H:%M:%S") if dt else (date_str or "")
 
 
 def load_processed_urls(data_dir: Path) -> set[str]:
@@ -94,62 +99,297 @@ def resolve_data_dir(root: Path, cli_arg: str | None, config_path: Path) -> Path
     return (root / "data").resolve()
 
 
-def run() -> None:
+def make_client(args: argparse.Namespace) -> NewsClient:
+    """Live, record or replay Google News client for the last day."""
+    params = dict(
+        language="en",
+        country="US",
+        max_results=100,
+        start_date=(datetime.now() - timedelta(days=1)).date(),
+        end_date=datetime.now().date(),
+    )
+    if args.replay:
+        latency = args.replay_latency if args.replay_latency in (None, "recorded") else float(args.replay_latency)
+        return NewsClient("replay", args.replay, latency=latency, scale=args.replay_scale, **params)
+    if args.record:
+        return NewsClient("record", args.record, **params)
+    return NewsClient.from_env(**params)
+
+
+def resolve_urls(raw: list[dict], whitelist: set[str], data_dir: Path, offline: bool,
+                 verbose: bool = True) -> dict[str, str]:
+    """Canonical URLs for whitelisted articles' redirect links (cached in data_dir/url_cache.sqlite)."""
+    links = [(a.get("url") or "").strip() for a in raw if get_publisher(a) in whitelist]
+    resolver = UrlResolver(data_dir / "url_cache.sqlite", offline=offline)
+    try:
+        canonical = resolver.resolve_many(links)
+    finally:
+        resolver.close()
+    if verbose:
+        print(f"URL resolution: {resolver.stats}")
+    return canonical
+
+
+def filter_articles(raw: list[dict], whitelist: set[str], processed: set[str], canonical: dict[str, str],
+                    stats: RunStats | None = None) -> list[dict]:
+    """Whitelisted, not yet processed, first occurrence per canonical URL; drop reasons go to stats."""
+    seen_urls = set()
+    articles_out = []
+    for article in raw:
+        google_url = (article.get("url") or "").strip()
+        url = canonical.get(google_url, google_url)
+        publisher = get_publisher(article)
+        if not url:
+            reason = "no_url"
+        elif publisher not in whitelist:
+            reason = "not_whitelisted"
+        # processed_urls.txt may still hold redirect links from earlier runs
+        elif url in processed or google_url in processed:
+            reason = "already_processed"
+        elif url in seen_urls:
+            reason = "duplicate_in_batch"
+        else:
+            seen_urls.add(url)
+            articles_out.append({
+                "title": (article.get("title") or "").strip(),
+                "publisher": publisher,
+                "url": url,
+                "google_url": google_url,
+                "published": parse_published_date(article.get("published date", "")),
+                "description": (article.get("description") or "").strip(),
+            })
+            continue
+        if stats is not None:
+            stats.drop(reason)
+    return articles_out
+
+
+def output_path(data_dir: Path) -> Path:
+    """data_dir/articles_YYYYMMDD_HHMMSS.yaml for this run."""
+    return data_dir / f"articles_{datetime.now().strftime('%Y%m%d_%H%M%S')}.yaml"
+
+
+def enqueue_articles(articles: list[dict], queue_path: Path, payload_extra: dict) -> tuple[int, dict]:
+    """Enqueue articles (keyed by URL); returns (# newly queued, queue stats)."""
+    queue = WorkQueue(queue_path)
+    try:
+        added = queue.enqueue([{**article, **payload_extra} for article in articles])
+        return added, queue.stats()
+    finally:
+        queue.close()
+
+
+def write_yaml(payload: dict, data_dir: Path, out_path: Path | None = None) -> Path:
+    """Write data_dir/articles_YYYYMMDD_HHMMSS.yaml (or out_path)."""
+    out_path = out_path or output_path(data_dir)
+    with out_path.open("w", encoding="utf-8") as f:
+        yaml.dump(payload, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+    return out_path
+
+
+def deliver(payload: dict, args: argparse.Namespace, data_dir: Path, out_path: Path, processed: set[str],
+            stats: RunStats | None = None) -> dict:
+    """
+    Hand new articles downstream: work queue, YAML side channel, processed_urls.txt (and processed,
+    in place). Stages are timed in stats if given. Returns {"queued", "queue_stats", "queue_path"}.
+    """
+    stage = stats.stage if stats is not None else (lambda name, items_in=None: nullcontext({}))
+    articles = payload["articles"]
+    new_urls = [a["url"] for a in articles]
+    result = {"queued": 0, "queue_stats": None, "queue_path": None}
+    if not args.no_queue:
+        queue_path = Path(args.queue) if args.queue else data_dir / "work_queue.sqlite"
+        with stage("enqueue", items_in=len(articles)) as st:
+            extra = {"fetched_at": payload["fetched_at"], "query": payload["query"]}
+            result["queued"], result["queue_stats"] = enqueue_articles(articles, queue_path, extra)
+            st["items_out"] = result["queued"]
+        result["queue_path"] = queue_path
+    if not args.no_yaml:
+        with stage("write_yaml", items_in=len(articles)) as st:
+            write_yaml(payload, data_dir, out_path)
+            st["items_out"] = len(articles)
+    if new_urls:
+        with stage("append_dedup_index", items_in=len(new_urls)) as st:
+            append_processed_urls(data_dir, new_urls)
+            processed.update(new_urls)
+            st["items_out"] = len(new_urls)
+    return result
+
+
+def run_backfill(args: argparse.Namespace, data_dir: Path, whitelist: set[str], query_str: str,
+                 processed: set[str]) -> int:
+    """Fetch [START, END) window by window; windows already in the checkpoint are skipped."""
+    stats = RunStats("stage1_backfill")
+    size = WINDOW_SIZES[args.window]
+    start, end = parse_bound(args.backfill[0]), parse_bound(args.backfill[1], end=True)
+    meta = {"query": query_str, "start": start.isoformat(), "end": end.isoformat(), "window": args.window}
+    digest = hashlib.sha1(query_str.encode("utf-8")).hexdigest()[:8]
+    checkpoint_path = Path(args.checkpoint) if args.checkpoint else (
+        data_dir / f"backfill_{start:%Y%m%d%H}-{end:%Y%m%d%H}_{args.window}_{digest}.json")
+    checkpoint = Checkpoint(checkpoint_path, meta)
+
+    all_windows = windows(start, end, size)
+    todo = [w for w in all_windows if not checkpoint.is_done(w[0])]
+    print(f"Backfill {start:%Y-%m-%d %H:%M} .. {end:%Y-%m-%d %H:%M} in {args.window} windows: "
+          f"{len(all_windows)} total, {len(all_windows) - len(todo)} already done, {len(todo)} to fetch "
+          f"(concurrency {args.concurrency})")
+    print(f"Checkpoint: {checkpoint_path}")
+    stats.gauge("windows_total", len(all_windows))
+    stats.gauge("windows_skipped", len(all_windows) - len(todo))
+
+    # One client (shared pacing, retries and stats); each window overrides the date parameters
+    gn = make_client(args)
+
+    def fetch_day(day) -> list[dict]:
+        return gn.get_news(query_str, start_date=day, end_date=day + timedelta(days=1)) or []
+
+    # GNews dates are day-granular: one request per day on the pool; the main thread splits
+    # each day into its windows, so --concurrency applies to days for both window sizes
+    by_day: dict = {}
+    for window in todo:
+        by_day.setdefault(window[0].date(), []).append(window)
+    # Undated articles go to each day's first window, even if that one finished in an earlier run
+    first_of_day: dict = {}
+    for window in all_windows:
+        first_of_day.setdefault(window[0].date(), window[0])
+
+    totals = {"raw": 0, "new": 0, "queued": 0, "done": 0, "failed": 0}
+
+    def deliver_window(window: tuple[datetime, datetime], raw: list[dict]) -> None:
+        canonical = {} if args.no_resolve else resolve_urls(raw, whitelist, data_dir, gn.offline, verbose=False)
+        articles_out = filter_articles(raw, whitelist, processed, canonical, stats)
+        payload = {
+            "fetched_at": datetime.now().isoformat(),
+            "query": query_str,
+            "window": [window[0].isoformat(), window[1].isoformat()],
+            "publishers_filter": sorted(whitelist),
+            "articles": articles_out,
+        }
+        out_path = data_dir / f"articles_backfill_{window[0]:%Y%m%d_%H%M%S}.yaml"
+        result = deliver(payload, args, data_dir, out_path, processed)
+        checkpoint.mark(window[0])
+        totals["raw"] += len(raw)
+        totals["new"] += len(articles_out)
+        totals["queued"] += result["queued"]
+        totals["done"] += 1
+        print(f"  {window[0]:%Y-%m-%d %H:%M}  {len(raw):5d} raw  {len(articles_out):5d} new  [{totals['done']}/{len(todo)}]")
+
+    with stats.stage("backfill", items_in=len(todo)) as st, ThreadPoolExecutor(args.concurrency) as pool:
+        futures = {pool.submit(fetch_day, day): day for day in by_day}
+        for future in as_completed(futures):
+            day = futures[future]
+            try:
+                day_raw = future.result()
+            except NewsFetchError as e:
+                # Not checkpointed: the next run retries these windows
+                totals["failed"] += len(by_day[day])
+                print(f"  {day}  failed ({len(by_day[day])} windows): {e}")
+                continue
+            for window, raw in split_day(day_raw, by_day[day], first_of_day[day]):
+                deliver_window(window, raw)
+        st["items_out"] = totals["done"]
+
+    stats.gauge("windows_done", totals["done"])
+    stats.gauge("windows_failed", totals["failed"])
+    stats.gauge("dedup_index_size", len(processed))
+    for key, value in gn.stats().items():
+        stats.gauge(f"gnews_{key}", value)
+    stats.write_json(checkpoint_path.with_suffix(".stats.json"))
+    stats.write_prometheus(data_dir / "stage1_backfill.prom")
+
+    print(f"Backfill: {totals['done']} windows done, {totals['failed']} failed; "
+          f"{totals['raw']} raw, {totals['new']} new articles, {totals['queued']} queued.")
+    print(f"Google News requests: {gn.stats()}")
+    print(stats.summary())
+    if totals["failed"]:
+        print("Some windows failed; run the same command again to retry them.")
+        return 1
+    return 0
+
+
+def run() -> int:
     root = project_root()
     parser = argparse.ArgumentParser(description="Stage 1: Fetch article metadata from Google News.")
     parser.add_argument("--data-dir", type=str, default=None, help="Output directory for YAML and processed_urls.txt")
+    parser.add_argument("--no-resolve", action="store_true", help="Keep Google News redirect links (no publisher URL lookup)")
+    parser.add_argument("--record", type=str, default=None, help="Append raw Google News responses to this archive (.jsonl.gz)")
+    parser.add_argument("--replay", type=str, default=None, help="Serve Google News responses from this archive (offline)")
+    parser.add_argument("--replay-latency", type=str, default=None,
+                        help="Simulated latency per request when replaying: seconds or 'recorded'")
+    parser.add_argument("--replay-scale", type=int, default=1, help="Replay N x the recorded articles")
+    parser.add_argument("--queue", type=str, default=None, help="Work queue database (default: <data-dir>/work_queue.sqlite)")
+    parser.add_argument("--no-queue", action="store_true", help="Do not enqueue new articles")
+    parser.add_argument("--no-yaml", action="store_true", help="Do not write the articles_*.yaml side channel")
+    parser.add_argument("--backfill", nargs=2, metavar=("START", "END"), default=None,
+                        help="Fetch history from START to END (UTC ISO dates/datetimes; a bare END date is inclusive)")
+    parser.add_argument("--window", choices=sorted(WINDOW_SIZES), default="day",
+                        help="Backfill window size. GNews queries whole days, so hour windows split one request "
+                             "per day and together cannot exceed its max_results (100) articles")
+    parser.add_argument("--concurrency", type=int, default=4, help="Backfill days fetched in parallel")
+    parser.add_argument("--checkpoint", type=str, default=None,
+                        help="Backfill checkpoint file (default: <data-dir>/backfill_<range>_<window>_<query>.json)")
     args = parser.parse_args()
 
+    stats = RunStats("stage1")
     data_dir = resolve_data_dir(root, args.data_dir, root / "config.yaml")
     data_dir.mkdir(parents=True, exist_ok=True)
 
-    whitelist = load_whitelist(root)
+    with stats.stage("load_config") as st:
+        whitelist = load_whitelist(root)
+        queries = load_search_queries(root)
+        st["items_out"] = len(whitelist)
     if not whitelist:
         print("No publishers in publisher_whitelist.txt. Add at least one.")
-        return
+        return 1
 
-    queries = load_search_queries(root)
     query_str = combined_query(queries)
     print(f"Query: {query_str}")
     print(f"Publishers: {sorted(whitelist)}")
 
-    processed = load_processed_urls(data_dir)
-
-    gn = GNews(
-        language="en",
-        country="US",
-        max_results=100,
-        start_date=(datetime.now() - timedelta(days=1)).date(),
-        end_date=datetime.now().date(),
-    )
-    raw = gn.get_news(query_str)
-    if not raw:
-        print("No articles returned from Google News.")
-        # Still write YAML with empty articles for consistency
-        raw = []
-
-    seen_urls = set()
-    articles_out = []
-    new_urls = []
-
-    for article in raw:
-        url = (article.get("url") or "").strip()
-        if not url or url in seen_urls:
-            continue
-        publisher = get_publisher(article)
-        if publisher not in whitelist:
-            continue
-        if url in processed:
-            continue
-        seen_urls.add(url)
-        new_urls.append(url)
-        articles_out.append({
-            "title": (article.get("title") or "").strip(),
-            "publisher": publisher,
-            "url": url,
-            "published": parse_published_date(article.get("published date", "")),
-            "description": (article.get("description") or "").strip(),
-        })
+    with stats.stage("load_dedup_index") as st:
+        processed = load_processed_urls(data_dir)
+        st["items_out"] = len(processed)
+    stats.gauge("dedup_index_size", len(processed))
+
+    if args.backfill:
+        return run_backfill(args, data_dir, whitelist, query_str, processed)
+
+    gn = make_client(args)
+    with stats.stage("fetch") as st:
+        try:
+            raw = gn.get_news(query_str)
+        except NewsFetchError as e:
+            # No articles written (a failed fetch must not look like an empty day), but the run is recorded
+            print(f"Google News request failed: {e}")
+            print(f"Request stats: {gn.stats()}")
+            failed = True
+        else:
+            failed = False
+        if not failed and not raw:
+            print("No articles returned from Google News.")
+            # Still write YAML with empty articles for consistency
+            raw = []
+        st["items_out"] = None if failed else len(raw)
+    for key, value in gn.stats().items():
+        stats.gauge(f"gnews_{key}", value)
+    stats.gauge("fetch_failed", int(failed))
+    if failed:
+        out_path = output_path(data_dir)
+        stats.write_json(out_path.with_suffix(".stats.json"))
+        stats.write_prometheus(data_dir / "stage1.prom")
+        print(f"Run stats: {out_path.with_suffix('.stats.json')}")
+        return 1
+
+    canonical: dict[str, str] = {}
+    if not args.no_resolve:
+        with stats.stage("resolve_urls", items_in=len(raw)) as st:
+            canonical = resolve_urls(raw, whitelist, data_dir, gn.offline)
+            st["items_out"] = len(canonical)
+
+    with stats.stage("filter", items_in=len(raw)) as st:
+        articles_out = filter_articles(raw, whitelist, processed, canonical, stats)
+        st["items_out"] = len(articles_out)
+    new_urls = [a["url"] for a in articles_out]
 
     payload = {
         "fetched_at": datetime.now().isoformat(),
@@ -157,20 +397,33 @@ def run() -> None:
         "publishers_filter": sorted(whitelist),
         "articles": articles_out,
     }
-
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    out_path = data_dir / f"articles_{timestamp}.yaml"
-    with out_path.open("w", encoding="utf-8") as f:
-        yaml.dump(payload, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
-
-    if new_urls:
-        append_processed_urls(data_dir, new_urls)
+    out_path = output_path(data_dir)
+    delivered = deliver(payload, args, data_dir, out_path, processed, stats)
+    queue_stats = delivered["queue_stats"]
+    if queue_stats:
+        stats.gauge("queue_ready", queue_stats["ready"])
+        stats.gauge("queue_dead", queue_stats["dead"])
+    stats.gauge("dedup_index_size", len(processed))
+
+    # Per-run JSON record next to the YAML; Prometheus textfile holds the latest run
+    stats.write_json(out_path.with_suffix(".stats.json"))
+    stats.write_prometheus(data_dir / "stage1.prom")
 
     print(f"Fetched {len(raw)} raw; after whitelist + dedup: {len(articles_out)} new articles.")
-    print(f"Written: {out_path}")
+    if queue_stats:
+        print(f"Queued {delivered['queued']} new jobs in {delivered['queue_path']} (queue: {queue_stats['ready']} ready, "
+              f"{queue_stats['leased']} leased, {queue_stats['dead']} dead)")
+    if not args.no_yaml:
+        print(f"Written: {out_path}")
     if new_urls:
         print(f"Appended {len(new_urls)} URLs to processed_urls.txt.")
+    print(f"Google News requests: {gn.stats()}")
+    print(stats.summary())
+    return 0
 
 
 if __name__ == "__main__":
-    run()
+    from import_profile import profile_imports_if_requested
+
+    profile_imports_if_requested()
+    raise SystemExit(run())
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Deterministic synthetic Google News corpus (GNews-shaped article dicts).
+- Publishers follow a Zipf distribution (a few outlets write most of the coverage).
+- A share of items repeat an earlier URL (the same story returned again) and a share
+  are syndicated copies (same headline and description, different publisher and URL;
+  the title carries each copy's own " - Publisher" suffix, as in GNews).
+- Title lengths are log-normal around ~11 words, built from ETF news vocabulary.
+The same seed and parameters always give the same corpus.
+
+Usage:
+    python src/synthetic_news.py 100000 -o /tmp/synthetic.jsonl
+"""
+
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+from pathlib import Path
+import argparse
+import json
+import math
+import random
+
+# Real outlet names first so whitelists such as publisher_whitelist.txt match some of the corpus
+KNOWN_PUBLISHERS = [
+    "Yahoo Finance", "The Motley Fool", "ETF Trends", "Reuters", "Bloomberg", "CNBC", "MarketWatch",
+    "Barron's", "Seeking Alpha", "ETF.com", "Zacks Investment Research", "Benzinga", "Investopedia",
+    "Morningstar", "Financial Times", "The Wall Street Journal", "Forbes", "Business Insider",
+    "Nasdaq", "Kiplinger",
+]
+SUBJECTS = [
+    "Vanguard S&P 500 ETF", "iShares Bitcoin Trust", "SPDR Gold Shares", "Invesco QQQ", "Schwab U.S. Dividend Equity ETF",
+    "bitcoin ETFs", "gold ETFs", "bond ETFs", "Treasury ETFs", "covered call ETFs", "China ETFs", "emerging market funds",
+    "tech ETFs", "healthcare ETFs", "energy ETFs", "dividend ETFs", "growth stocks", "value funds", "ether ETFs",
+    "BlackRock", "VanEck", "ARK Invest", "this ETF", "the fund", "momentum ETFs", "silver ETFs", "space ETFs",
+]
+VERBS = [
+    "sees", "posts", "draws", "loses", "launches", "files for", "beats", "lags", "extends", "rallies on",
+    "slides on", "hits record", "adds", "cuts", "tops",
+]
+OBJECTS = [
+    "record inflows", "heavy outflows", "new highs", "volatility", "rate cut bets", "strong volume",
+    "billion in assets", "investor demand", "a fee cut", "the market", "Fed decision", "earnings season",
+    "inflation data", "portfolio rebalancing", "global selloff", "a rebound",
+]
+FILLERS = [
+    "as", "amid", "after", "ahead of", "while", "with", "despite", "on", "for", "investors", "analysts", "say",
+    "should you buy", "now", "this week", "in 2026", "here's why", "what to know", "the best", "top",
+]
+
+
+def zipf_weights(n: int, s: float) -> list[float]:
+    return [1.0 / (rank ** s) for rank in range(1, n + 1)]
+
+
+def publisher_names(n: int) -> list[str]:
+    names = KNOWN_PUBLISHERS[:n]
+    names += [f"Outlet {i:05d} News" for i in range(len(names), n)]
+    return names
+
+
+def make_title(rng: random.Random, mean_words: float = 11.0) -> str:
+    target = max(4, int(rng.lognormvariate(math.log(mean_words), 0.35)))
+    words = f"{rng.choice(SUBJECTS)} {rng.choice(VERBS)} {rng.choice(OBJECTS)}".split()
+    while len(words) < target:
+        words += rng.choice(FILLERS + OBJECTS).split()
+    return " ".join(words[:target]).capitalize()
+
+
+def generate(n: int, seed: int = 0, publishers: int = 2000, zipf_s: float = 1.1, dup_rate: float = 0.15,
+             syndication_rate: float = 0.05, days: int = 7, end: datetime | None = None):
+    """Yield n GNews-shaped article dicts."""
+    rng = random.Random(seed)
+    names = publisher_names(publishers)
+    cum_weights = list(accumulate(zipf_weights(publishers, zipf_s)))
+    end = end or datetime(2026, 2, 7, 23, 59, tzinfo=timezone.utc)
+    span = days * 86400
+    emitted: list[dict] = []
+    # Keep a bounded pool of earlier items to duplicate / syndicate from (memory stays flat at 10M)
+    pool_size = 50_000
+
+    for i in range(n):
+        roll = rng.random()
+        if emitted and roll < dup_rate:
+            article = dict(rng.choice(emitted))
+        else:
+            publisher = rng.choices(names, cum_weights=cum_weights)[0]
+            if emitted and roll < dup_rate + syndication_rate:
+                # description holds the bare headline; the title already ends in the source's suffix
+                title = rng.choice(emitted)["description"]
+            else:
+                title = make_title(rng)
+            published = end - timedelta(seconds=rng.randrange(span))
+            slug = "-".join(title.lower().split()[:6])
+            article = {
+                "title": f"{title} - {publisher}",
+                "description": title,
+                "published date": published.strftime("%a, %d %b %Y %H:%M:%S GMT"),
+                "url": f"https://news.google.com/rss/articles/SYN{seed:x}{i:09d}?{slug}",
+                "publisher": {"href": f"https://www.{publisher.lower().replace(' ', '')}.com", "title": publisher},
+            }
+            if len(emitted) < pool_size:
+                emitted.append(article)
+            else:
+                emitted[rng.randrange(pool_size)] = article
+        yield article
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic GNews-shaped corpus as JSONL.")
+    parser.add_argument("n", type=int)
+    parser.add_argument("-o", "--output", type=Path, required=True)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--publishers", type=int, default=2000)
+    parser.add_argument("--dup-rate", type=float, default=0.15)
+    parser.add_argument("--syndication-rate", type=float, default=0.05)
+    args = parser.parse_args()
+
+    with args.output.open("w", encoding="utf-8") as f:
+        for article in generate(args.n, args.seed, args.publishers, dup_rate=args.dup_rate,
+                                syndication_rate=args.syndication_rate):
+            f.write(json.dumps(article, ensure_ascii=False) + "\n")
+    print(f"Written {args.n} articles to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
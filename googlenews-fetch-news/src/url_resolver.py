@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Resolve Google News redirect links to canonical publisher URLs.
+- Links whose host is in redirect_hosts are followed (HTTP redirects, then the
+  publisher link embedded in the Google News interstitial page); others are kept.
+- Resolution runs on a thread pool; results persist in a SQLite redirect -> canonical
+  cache, so each link costs one round trip ever.
+- canonicalize() normalizes publisher URLs (tracking parameters, fragments,
+  trailing slashes) so they can be used as dedup keys.
+- redirect_hosts is configurable, so a local stub server that emits 302s
+  (e.g. redirect_hosts=("127.0.0.1:8000",)) can stand in for Google News.
+
+Usage:
+    python src/url_resolver.py URL [URL ...] [--cache data/url_cache.sqlite]
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import argparse
+import html
+import re
+import sqlite3
+import time
+
+GOOGLE_NEWS_HOSTS = ("news.google.com",)
+DEFAULT_CACHE = Path("url_cache.sqlite")
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+FAILURE_RETRY_SECONDS = 24 * 3600
+TRACKING_PARAMS = re.compile(r"^(utm_\w+|ocid|cmpid|guccounter|guce_\w+|fbclid|gclid|mc_cid|mc_eid|taid|smid)$", re.I)
+EMBEDDED_URL_RES = (
+    re.compile(rb'data-n-au="([^"]+)"'),
+    re.compile(rb'<a[^>]+href="(https?://[^"]+)"[^>]*>\s*(?:Opening|Continue)', re.I),
+    re.compile(rb'http-equiv="refresh"[^>]+url=([^"\'>]+)', re.I),
+)
+
+
+def canonicalize(url: str) -> str:
+    """Normalized URL for dedup: lowercase host, no fragment, tracking params or trailing slash."""
+    url = (url or "").strip()
+    if not url:
+        return ""
+    parts = urlsplit(url)
+    host = parts.netloc.lower()
+    if host.endswith(":80") and parts.scheme == "http" or host.endswith(":443") and parts.scheme == "https":
+        host = host.rsplit(":", 1)[0]
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not TRACKING_PARAMS.match(k)])
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), host, path, query, ""))
+
+
+class _LeftRedirectHost(Exception):
+    """Raised by the redirect handler once a redirect points off the redirect hosts."""
+
+    def __init__(self, url: str):
+        super().__init__(url)
+        self.url = url
+
+
+def _stop_at_publisher_opener(redirect_hosts: tuple[str, ...]):
+    """Opener that follows redirects only while they stay on redirect hosts (never fetches the publisher page)."""
+    # urllib.request pulls in http.client and ssl; only pay for it when something needs resolving
+    import urllib.request
+
+    class StopAtPublisher(urllib.request.HTTPRedirectHandler):
+        def redirect_request(self, req, fp, code, msg, headers, newurl):
+            if urlsplit(newurl).netloc.lower() not in redirect_hosts:
+                raise _LeftRedirectHost(newurl)
+            return super().redirect_request(req, fp, code, msg, headers, newurl)
+
+    return urllib.request.build_opener(StopAtPublisher())
+
+
+class UrlResolver:
+    """Concurrent redirect resolver with a persistent redirect -> canonical mapping."""
+
+    def __init__(self, cache_path: Path | str = DEFAULT_CACHE, workers: int = 16, timeout: float = 10.0,
+                 redirect_hosts: tuple[str, ...] = GOOGLE_NEWS_HOSTS, offline: bool = False):
+        self.workers = workers
+        self.offline = offline  # cache lookups only; misses map to themselves
+        self.timeout = timeout
+        self.redirect_hosts = tuple(h.lower() for h in redirect_hosts)
+        self.stats = {"cached": 0, "resolved": 0, "failed": 0, "passthrough": 0}
+        self.opener = None  # built on the first cache miss
+        self.db = sqlite3.connect(str(cache_path))
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS url_map ("
+            " redirect TEXT PRIMARY KEY, canonical TEXT, resolved_at REAL NOT NULL, error TEXT)"
+        )
+
+    def close(self) -> None:
+        self.db.close()
+
+    def needs_resolution(self, url: str) -> bool:
+        """True if url points at a redirect host."""
+        return urlsplit(url).netloc.lower() in self.redirect_hosts
+
+    def _fetch(self, url: str) -> str:
+        """Follow HTTP redirects; if still on a redirect host, read the embedded publisher link."""
+        import urllib.request
+
+        request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+        try:
+            with self.opener.open(request, timeout=self.timeout) as response:
+                body = response.read(512 * 1024)
+        except _LeftRedirectHost as redirect:
+            return redirect.url
+        for pattern in EMBEDDED_URL_RES:
+            match = pattern.search(body)
+            if match:
+                return html.unescape(match.group(1).decode("utf-8", "replace"))
+        raise ValueError("no publisher link found")
+
+    def _resolve_one(self, url: str) -> tuple[str, str | None, str | None]:
+        try:
+            return url, canonicalize(self._fetch(url)), None
+        except Exception as e:
+            return url, None, str(e)[:200]
+
+    def resolve_many(self, urls: list[str]) -> dict[str, str]:
+        """Map each url to its canonical URL (unresolvable redirects map to themselves)."""
+        result: dict[str, str] = {}
+        pending: list[str] = []
+        now = time.time()
+        for url in dict.fromkeys(u for u in urls if u):
+            if not self.needs_resolution(url):
+                result[url] = canonicalize(url)
+                self.stats["passthrough"] += 1
+                continue
+            row = self.db.execute("SELECT canonical, resolved_at FROM url_map WHERE redirect = ?", (url,)).fetchone()
+            if row and (row[0] or now - row[1] < FAILURE_RETRY_SECONDS):
+                result[url] = row[0] or url
+                self.stats["cached"] += 1
+            else:
+                pending.append(url)
+
+        if pending and self.offline:
+            result.update((url, url) for url in pending)
+            self.stats["failed"] += len(pending)
+        elif pending:
+            if self.opener is None:
+                self.opener = _stop_at_publisher_opener(self.redirect_hosts)
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(pending))) as pool:
+                resolved = list(pool.map(self._resolve_one, pending))
+            with self.db:
+                self.db.executemany(
+                    "INSERT OR REPLACE INTO url_map (redirect, canonical, resolved_at, error) VALUES (?, ?, ?, ?)",
+                    [(url, canonical, time.time(), error) for url, canonical, error in resolved],
+                )
+            for url, canonical, _ in resolved:
+                result[url] = canonical or url
+                self.stats["resolved" if canonical else "failed"] += 1
+        return result
+
+    def resolve(self, url: str) -> str:
+        return self.resolve_many([url]).get(url, url)
+
+
+def resolve_articles(articles: list[dict], cache_path: Path | str = DEFAULT_CACHE, workers: int = 16,
+                     offline: bool = False) -> dict:
+    """Replace each article's url with its canonical URL (original kept as google_url); returns stats."""
+    resolver = UrlResolver(cache_path, workers=workers, offline=offline)
+    try:
+        canonical = resolver.resolve_many([a.get("url") or "" for a in articles])
+    finally:
+        resolver.close()
+    for article in articles:
+        url = article.get("url") or ""
+        if url in canonical and canonical[url] != url:
+            if resolver.needs_resolution(url):
+                article.setdefault("google_url", url)
+            article["url"] = canonical[url]
+    return resolver.stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Resolve Google News redirect links to publisher URLs.")
+    parser.add_argument("urls", nargs="+")
+    parser.add_argument("--cache", type=Path, default=DEFAULT_CACHE, help="SQLite redirect cache")
+    parser.add_argument("--workers", type=int, default=16)
+    args = parser.parse_args()
+
+    resolver = UrlResolver(args.cache, workers=args.workers)
+    try:
+        for url, canonical in resolver.resolve_many(args.urls).items():
+            print(f"{url}\n  -> {canonical}")
+        print(resolver.stats)
+    finally:
+        resolver.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Durable SQLite work queue between stage1 and downstream consumers (content fetch,
+summarization).
+- stage1 enqueues each new article once (keyed by canonical URL; re-enqueueing is a no-op).
+- Consumers lease jobs: a lease hides the job from other consumers for the visibility
+  timeout. ack() finishes it; nack() makes it available again after a backoff delay.
+  A consumer that dies simply lets its lease expire and the job is handed out again.
+- After max_attempts failed (or expired) leases a job is dead-lettered; requeue_dead()
+  puts dead jobs back.
+- Any number of consumer processes can share one queue file (WAL mode; leases are taken
+  in an IMMEDIATE transaction). Use one WorkQueue per thread.
+
+Consumer:
+    q = WorkQueue("data/work_queue.sqlite")
+    for job in q.lease("fetcher-1", n=10):
+        try:
+            handle(job["payload"])
+        except Exception as e:
+            q.nack(job, str(e))
+        else:
+            q.ack(job)
+
+    or: consume(q, handle, "fetcher-1")
+
+Usage:
+    python src/work_queue.py stats data/work_queue.sqlite
+    python src/work_queue.py peek data/work_queue.sqlite --state dead
+    python src/work_queue.py requeue-dead data/work_queue.sqlite
+    python src/work_queue.py purge data/work_queue.sqlite --days 30
+"""
+
+from pathlib import Path
+import argparse
+import json
+import sqlite3
+import time
+import uuid
+
+DEFAULT_QUEUE = "articles"
+STATES = ("ready", "leased", "done", "dead")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    queue TEXT NOT NULL,
+    key TEXT,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'ready',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL,
+    lease_expires REAL,
+    token TEXT,
+    consumer TEXT,
+    error TEXT,
+    enqueued_at REAL NOT NULL,
+    finished_at REAL,
+    UNIQUE (queue, key)
+);
+CREATE INDEX IF NOT EXISTS jobs_available ON jobs (queue, state, available_at);
+"""
+
+
+class WorkQueue:
+    """Lease / ack / nack queue of JSON payloads in one SQLite file."""
+
+    def __init__(self, path: Path | str, queue: str = DEFAULT_QUEUE, visibility_timeout: float = 300.0,
+                 max_attempts: int = 5, retry_delay: float = 30.0, max_retry_delay: float = 3600.0):
+        self.path = Path(path)
+        self.queue = queue
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit; multi-statement changes use explicit BEGIN IMMEDIATE
+        self.db = sqlite3.connect(str(self.path), timeout=30.0, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.db.close()
+
+    def enqueue(self, payloads: list[dict], key: str | None = "url") -> int:
+        """Add payloads; with key, payloads whose payload[key] is already queued are skipped. Returns # added."""
+        now = time.time()
+        rows = [(self.queue, payload.get(key) if key else None, json.dumps(payload, ensure_ascii=False, default=str),
+                 now, now) for payload in payloads]
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            before = self.db.total_changes
+            self.db.executemany(
+                "INSERT OR IGNORE INTO jobs (queue, key, payload, available_at, enqueued_at) VALUES (?, ?, ?, ?, ?)", rows)
+            added = self.db.total_changes - before
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        return added
+
+    def lease(self, consumer: str, n: int = 1, visibility_timeout: float | None = None) -> list[dict]:
+        """Up to n available jobs (ready, or leased with an expired lease), hidden from others until the lease ends."""
+        now = time.time()
+        expires = now + (visibility_timeout or self.visibility_timeout)
+        token = uuid.uuid4().hex
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            # Expired leases that used up their attempts are dead-lettered instead of handed out again
+            self.db.execute(
+                "UPDATE jobs SET state = 'dead', error = 'lease expired', finished_at = ?, token = NULL"
+                " WHERE queue = ? AND state = 'leased' AND lease_expires <= ? AND attempts >= ?",
+                (now, self.queue, now, self.max_attempts))
+            ids = [row[0] for row in self.db.execute(
+                "SELECT id FROM jobs WHERE queue = ? AND ("
+                " (state = 'ready' AND available_at <= ?) OR (state = 'leased' AND lease_expires <= ?))"
+                " ORDER BY available_at, id LIMIT ?", (self.queue, now, now, n))]
+            self.db.executemany(
+                "UPDATE jobs SET state = 'leased', attempts = attempts + 1, lease_expires = ?, token = ?, consumer = ?"
+                " WHERE id = ?", [(expires, token, consumer, i) for i in ids])
+            rows = self.db.execute(
+                f"SELECT id, key, payload, attempts FROM jobs WHERE id IN ({','.join('?' * len(ids))}) ORDER BY id",
+                ids).fetchall() if ids else []
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        return [{"id": i, "key": k, "payload": json.loads(p), "attempts": a, "token": token, "lease_expires": expires}
+                for i, k, p, a in rows]
+
+    def _finish(self, job: dict, sql: str, params: tuple) -> bool:
+        cur = self.db.execute(sql + " WHERE id = ? AND token = ? AND state = 'leased'", (*params, job["id"], job["token"]))
+        return cur.rowcount == 1
+
+    def ack(self, job: dict) -> bool:
+        """Mark a leased job done. False if the lease was lost (expired and handed to another consumer)."""
+        return self._finish(job, "UPDATE jobs SET state = 'done', finished_at = ?, token = NULL, error = NULL",
+                            (time.time(),))
+
+    def nack(self, job: dict, error: str = "", delay: float | None = None) -> bool:
+        """Release a failed job: retried after delay (default exponential backoff) or dead-lettered at max_attempts."""
+        now = time.time()
+        if job["attempts"] >= self.max_attempts:
+            return self._finish(job, "UPDATE jobs SET state = 'dead', finished_at = ?, token = NULL, error = ?",
+                                (now, error[:500]))
+        if delay is None:
+            delay = min(self.max_retry_delay, self.retry_delay * 2 ** (job["attempts"] - 1))
+        return self._finish(job, "UPDATE jobs SET state = 'ready', available_at = ?, token = NULL, error = ?",
+                            (now + delay, error[:500]))
+
+    def extend(self, job: dict, seconds: float | None = None) -> bool:
+        """Push the lease deadline out (heartbeat for long jobs)."""
+        expires = time.time() + (seconds or self.visibility_timeout)
+        ok = self._finish(job, "UPDATE jobs SET lease_expires = ?", (expires,))
+        if ok:
+            job["lease_expires"] = expires
+        return ok
+
+    def requeue_dead(self) -> int:
+        """Make dead jobs ready again with a fresh attempt budget."""
+        cur = self.db.execute(
+            "UPDATE jobs SET state = 'ready', attempts = 0, available_at = ?, finished_at = NULL"
+            " WHERE queue = ? AND state = 'dead'", (time.time(), self.queue))
+        return cur.rowcount
+
+    def purge(self, older_than_days: float) -> int:
+        """Delete done jobs finished more than older_than_days ago (their keys can then be enqueued again)."""
+        cutoff = time.time() - older_than_days * 86400
+        cur = self.db.execute("DELETE FROM jobs WHERE queue = ? AND state = 'done' AND finished_at < ?",
+                              (self.queue, cutoff))
+        return cur.rowcount
+
+    def stats(self) -> dict:
+        """Job counts per state (ready split into available / delayed, leased into active / expired)."""
+        now = time.time()
+        counts = {state: 0 for state in STATES}
+        counts.update(self.db.execute(
+            "SELECT state, COUNT(*) FROM jobs WHERE queue = ? GROUP BY state", (self.queue,)).fetchall())
+        counts["delayed"] = self.db.execute(
+            "SELECT COUNT(*) FROM jobs WHERE queue = ? AND state = 'ready' AND available_at > ?",
+            (self.queue, now)).fetchone()[0]
+        counts["expired_leases"] = self.db.execute(
+            "SELECT COUNT(*) FROM jobs WHERE queue = ? AND state = 'leased' AND lease_expires <= ?",
+            (self.queue, now)).fetchone()[0]
+        oldest = self.db.execute(
+            "SELECT MIN(enqueued_at) FROM jobs WHERE queue = ? AND state IN ('ready', 'leased')", (self.queue,)).fetchone()[0]
+        counts["oldest_pending_age_s"] = round(now - oldest, 1) if oldest else 0
+        return counts
+
+    def pending(self) -> int:
+        """Jobs not yet done or dead (ready, delayed or leased)."""
+        return self.db.execute("SELECT COUNT(*) FROM jobs WHERE queue = ? AND state IN ('ready', 'leased')",
+                               (self.queue,)).fetchone()[0]
+
+    def peek(self, state: str = "ready", limit: int = 20) -> list[dict]:
+        rows = self.db.execute(
+            "SELECT id, key, attempts, consumer, error, payload FROM jobs WHERE queue = ? AND state = ?"
+            " ORDER BY id LIMIT ?", (self.queue, state, limit)).fetchall()
+        return [{"id": i, "key": k, "attempts": a, "consumer": c, "error": e, "payload": json.loads(p)}
+                for i, k, a, c, e, p in rows]
+
+
+def consume(queue: WorkQueue, handler, consumer: str, batch: int = 1, poll: float = 1.0,
+            stop_when_empty: bool = False) -> dict:
+    """
+    Lease / handle / ack loop: handler(payload) raising means nack. With stop_when_empty it
+    returns the counts once no job is pending (delayed retries and other leases included).
+    """
+    counts = {"acked": 0, "nacked": 0, "lost": 0}
+    while True:
+        jobs = queue.lease(consumer, batch)
+        if not jobs:
+            if stop_when_empty and not queue.pending():
+                return counts
+            time.sleep(poll)
+            continue
+        for job in jobs:
+            try:
+                handler(job["payload"])
+            except Exception as e:
+                ok = queue.nack(job, f"{type(e).__name__}: {e}")
+                counts["nacked" if ok else "lost"] += 1
+            else:
+                counts["acked" if queue.ack(job) else "lost"] += 1
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inspect and maintain a stage1 work queue.")
+    parser.add_argument("command", choices=("stats", "peek", "requeue-dead", "purge"))
+    parser.add_argument("db", type=Path)
+    parser.add_argument("--queue", default=DEFAULT_QUEUE)
+    parser.add_argument("--state", default="ready", choices=STATES, help="peek: which jobs to show")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--days", type=float, default=30, help="purge: keep done jobs newer than this")
+    args = parser.parse_args()
+
+    q = WorkQueue(args.db, args.queue)
+    try:
+        if args.command == "stats":
+            print(json.dumps(q.stats(), indent=2))
+        elif args.command == "peek":
+            for job in q.peek(args.state, args.limit):
+                print(f"{job['id']:6d}  attempts={job['attempts']}  {job['key']}"
+                      + (f"\n        {job['consumer']}: {job['error']}" if job["error"] else ""))
+        elif args.command == "requeue-dead":
+            print(f"Requeued {q.requeue_dead()} dead jobs")
+        else:
+            print(f"Purged {q.purge(args.days)} done jobs")
+    finally:
+        q.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""url_resolver against a local http.server stub standing in for Google News.
+
+Run from googlenews-fetch-news: python -m unittest discover tests  (or pytest tests)
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from url_resolver import UrlResolver, canonicalize  # noqa: E402
+
+PUBLISHER = "https://www.publisher.example/markets/gold-etf-inflows"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """/chain/N redirects N times before leaving for the publisher; /interstitial embeds the link; else 404."""
+
+    hits: list[str] = []
+
+    def do_GET(self) -> None:
+        self.hits.append(self.path)
+        if self.path.startswith("/chain/"):
+            remaining = int(self.path.rsplit("/", 1)[1])
+            location = f"/chain/{remaining - 1}" if remaining > 1 else f"{PUBLISHER}/?utm_source=gn#top"
+            self.send_response(302)
+            self.send_header("Location", location)
+            self.end_headers()
+        elif self.path == "/interstitial":
+            body = (f'<html><body><c-wiz><div data-n-au="{PUBLISHER}?id=7&amp;utm_medium=rss">'
+                    f"</div></c-wiz></body></html>").encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self.send_error(404)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class UrlResolverStubTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        cls.host = f"127.0.0.1:{cls.server.server_port}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self) -> None:
+        StubHandler.hits.clear()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = Path(self.tmp.name) / "url_cache.sqlite"
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def resolver(self, **kwargs) -> UrlResolver:
+        resolver = UrlResolver(self.cache, workers=4, timeout=5.0, redirect_hosts=(self.host,), **kwargs)
+        self.addCleanup(resolver.close)
+        return resolver
+
+    def url(self, path: str) -> str:
+        return f"http://{self.host}{path}"
+
+    def test_redirect_chain_stops_at_publisher(self) -> None:
+        resolver = self.resolver()
+        self.assertEqual(resolver.resolve(self.url("/chain/3")), PUBLISHER)
+        # Three hops on the stub; the publisher page itself is never requested
+        self.assertEqual(StubHandler.hits, ["/chain/3", "/chain/2", "/chain/1"])
+        self.assertEqual(resolver.stats["resolved"], 1)
+
+    def test_interstitial_link(self) -> None:
+        resolver = self.resolver()
+        self.assertEqual(resolver.resolve(self.url("/interstitial")), f"{PUBLISHER}?id=7")
+
+    def test_not_found_maps_to_itself_and_is_not_retried(self) -> None:
+        url = self.url("/gone")
+        resolver = self.resolver()
+        self.assertEqual(resolver.resolve(url), url)
+        self.assertEqual(resolver.stats["failed"], 1)
+        row = resolver.db.execute("SELECT canonical, error FROM url_map WHERE redirect = ?", (url,)).fetchone()
+        self.assertIsNone(row[0])
+        self.assertIn("404", row[1])
+
+        # A recent failure is served from the cache instead of being fetched again
+        again = self.resolver()
+        self.assertEqual(again.resolve(url), url)
+        self.assertEqual(again.stats["cached"], 1)
+        self.assertEqual(StubHandler.hits, ["/gone"])
+
+    def test_cache_hit_skips_network(self) -> None:
+        urls = [self.url("/chain/2"), self.url("/interstitial")]
+        first = self.resolver().resolve_many(urls)
+        hits = len(StubHandler.hits)
+
+        second = self.resolver()
+        self.assertEqual(second.resolve_many(urls), first)
+        self.assertEqual(second.stats["cached"], 2)
+        self.assertEqual(len(StubHandler.hits), hits)
+
+        # Offline mode answers from the cache too
+        self.assertEqual(self.resolver(offline=True).resolve_many(urls), first)
+
+    def test_other_hosts_pass_through_canonicalized(self) -> None:
+        resolver = self.resolver()
+        self.assertEqual(resolver.resolve(f"{PUBLISHER}/?utm_campaign=x"), PUBLISHER)
+        self.assertEqual(resolver.stats["passthrough"], 1)
+        self.assertEqual(StubHandler.hits, [])
+
+    def test_canonicalize(self) -> None:
+        self.assertEqual(canonicalize("HTTPS://Example.COM:443/a/?b=1&utm_source=x#frag"), "https://example.com/a?b=1")
+        self.assertEqual(canonicalize(""), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,13 @@
+"""
+Access to modules shared with sibling projects
+
+Import this before importing from them:
+- ../googlenews-fetch-news/src  (import_profile); appended, so this
+                                project's own modules always win
+"""
+import sys
+from pathlib import Path
+
+SHARED_SRC = Path(__file__).resolve().parent.parent / "googlenews-fetch-news" / "src"
+if str(SHARED_SRC) not in sys.path:
+    sys.path.append(str(SHARED_SRC))
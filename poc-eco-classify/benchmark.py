@@ -3,13 +3,13 @@ Benchmark: compare sentence embedding vs zero-shot classification
 for economic news. Runs each method in a separate subprocess so
 memory is fully released between runs (avoids OOM on 16GB Macs).
 """
+import argparse
 import json
 import subprocess
 import sys
 from pathlib import Path
 
 import yaml
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
 
 
 def load_sampledata(path: str = "sampledata.yaml") -> tuple[list[str], list[str]]:
@@ -25,10 +25,10 @@ def load_target(path: str = "labels.yaml") -> str:
     return data["target"]
 
 
-def run_method(script: str, data_file: str = "sampledata.yaml") -> dict:
+def run_method(script: str, data_file: str = "sampledata.yaml", bundle: str | None = None) -> dict:
     """Run a method script as a subprocess and return parsed JSON output."""
     result = subprocess.run(
-        [sys.executable, script, data_file],
+        [sys.executable, script, data_file, *([bundle] if bundle else [])],
         capture_output=True,
         text=True,
         cwd=str(Path(__file__).parent),
@@ -43,6 +43,8 @@ def run_method(script: str, data_file: str = "sampledata.yaml") -> dict:
 
 
 def print_method_results(name, y_true, predictions, elapsed, n, misclassified_info):
+    from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
+
     acc = accuracy_score(y_true, predictions)
     prec = precision_score(y_true, predictions, zero_division=0)
     rec = recall_score(y_true, predictions, zero_division=0)
@@ -67,6 +69,11 @@ def print_method_results(name, y_true, predictions, elapsed, n, misclassified_in
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare embedding vs zero-shot classification.")
+    parser.add_argument("--embedding-bundle", default=None, help="Offline bundle dir for the embedding method")
+    parser.add_argument("--zeroshot-bundle", default=None, help="Offline bundle dir for the zero-shot method")
+    args = parser.parse_args()
+
     titles, answers = load_sampledata()
     target = load_target()
     y_true = [a == target for a in answers]
@@ -82,7 +89,7 @@ def main() -> None:
 
     # --- Method 1: Embedding (subprocess) ---
     print("Running embedding method (subprocess)...")
-    emb_result = run_method("method_embedding.py")
+    emb_result = run_method("method_embedding.py", bundle=args.embedding_bundle)
 
     acc_emb = prec_emb = rec_emb = f1_emb = time_emb = None
     if emb_result:
@@ -105,7 +112,7 @@ def main() -> None:
 
     # --- Method 2: Zero-shot (subprocess) ---
     print("Running zero-shot method (subprocess)...")
-    zs_result = run_method("method_zeroshot.py")
+    zs_result = run_method("method_zeroshot.py", bundle=args.zeroshot_bundle)
 
     acc_zs = prec_zs = rec_zs = f1_zs = time_zs = None
     if zs_result:
@@ -149,4 +156,8 @@ def main() -> None:
 
 
 if __name__ == "__main__":
+    import _shared  # noqa: F401  (puts ../googlenews-fetch-news/src on sys.path)
+    from import_profile import profile_imports_if_requested
+
+    profile_imports_if_requested()
     main()
@@ -0,0 +1,221 @@
+"""
+Offline model bundles for the classifiers.
+
+A bundle is one local directory holding everything a classifier needs:
+the model weights (safetensors), its tokenizer, and bundle.json with the
+settings it was tuned with. Embedding bundles also hold refs.npy, the
+L2-normalized reference embeddings, so references are never re-encoded.
+
+Loading never touches the Hugging Face hub: weights are memory-mapped
+from model.safetensors and refs.npy is opened with mmap_mode="r".
+
+Usage:
+    python bundle_model.py embedding --model all-MiniLM-L6-v2 --refs eco_ref_sentences.txt --threshold 0.40
+    python bundle_model.py zeroshot --model MoritzLaurer/DeBERTa-v3-base-mnli-fever-anli
+    python bundle_model.py verify bundles/all-MiniLM-L6-v2
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+BUNDLE_DIR = Path(__file__).resolve().parent / "bundles"
+BUNDLE_FILE = "bundle.json"
+REFS_FILE = "refs.npy"
+SCORERS = ("max",)  # scorers load_scorer applies to a bundle's threshold
+
+
+def bundle_path_for(model_id: str, root: Path = BUNDLE_DIR) -> Path:
+    """Default bundle directory for a hub model id."""
+    return root / model_id.replace("/", "--")
+
+
+def _offline() -> None:
+    """Forbid hub lookups for everything loaded after this call."""
+    os.environ["HF_HUB_OFFLINE"] = "1"
+    os.environ["TRANSFORMERS_OFFLINE"] = "1"
+
+
+def _digest(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _write_manifest(out_dir: Path, meta: dict) -> dict:
+    files = sorted(p for p in out_dir.rglob("*") if p.is_file() and p.name != BUNDLE_FILE)
+    meta = {
+        **meta,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "files": {str(p.relative_to(out_dir)): _digest(p) for p in files},
+    }
+    (out_dir / BUNDLE_FILE).write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    return meta
+
+
+def read_manifest(bundle_dir: Path | str) -> dict:
+    path = Path(bundle_dir) / BUNDLE_FILE
+    if not path.exists():
+        raise FileNotFoundError(f"Not a model bundle (no {BUNDLE_FILE}): {bundle_dir}")
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _check_scorer(scorer: str, where: object) -> None:
+    # load_scorer / classify_documents score by max similarity; a threshold tuned
+    # for another scorer would be applied to the wrong scale
+    if scorer not in SCORERS:
+        raise ValueError(f"{where}: scorer {scorer!r} is not supported (only {', '.join(SCORERS)})")
+
+
+def build_embedding_bundle(
+    model_id: str,
+    ref_file: str,
+    out_dir: Path,
+    threshold: float,
+    scorer: str = "max",
+) -> dict:
+    """
+    Materialize a SentenceTransformer model, its tokenizer and the normalized
+    reference embeddings into out_dir. Needs network (or a warm hub cache) once.
+    scorer records how threshold was tuned; only max similarity is supported.
+    """
+    _check_scorer(scorer, model_id)
+    from sentence_transformers import SentenceTransformer
+
+    from method_embedding import _load_ref_sentences, _normalize
+
+    refs = _load_ref_sentences(ref_file)
+    model = SentenceTransformer(model_id)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    model.save(str(out_dir), safe_serialization=True)
+    ref_norm = _normalize(model.encode(refs))
+    np.save(out_dir / REFS_FILE, ref_norm)
+    return _write_manifest(out_dir, {
+        "kind": "embedding",
+        "model_id": model_id,
+        "ref_file": Path(ref_file).name,
+        "ref_sha256": _digest(Path(ref_file)),
+        "n_refs": len(refs),
+        "dim": int(ref_norm.shape[1]),
+        "threshold": threshold,
+        "scorer": scorer,
+    })
+
+
+def build_zeroshot_bundle(model_id: str, labels_file: str, out_dir: Path) -> dict:
+    """
+    Materialize a zero-shot (NLI) model and tokenizer as safetensors, plus the
+    candidate labels from labels_file.
+    """
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    from method_zeroshot import _load_labels
+
+    target, label_list = _load_labels(labels_file)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    AutoModelForSequenceClassification.from_pretrained(model_id).save_pretrained(out_dir, safe_serialization=True)
+    AutoTokenizer.from_pretrained(model_id).save_pretrained(out_dir)
+    return _write_manifest(out_dir, {
+        "kind": "zeroshot",
+        "model_id": model_id,
+        "target": target,
+        "labels": label_list,
+    })
+
+
+def load_embedding_bundle(bundle_dir: Path | str):
+    """
+    Returns (model, ref_norm, meta) from a local bundle without hub access.
+    ref_norm is a read-only memory map of the normalized reference embeddings.
+    """
+    bundle_dir = Path(bundle_dir)
+    meta = read_manifest(bundle_dir)
+    if meta["kind"] != "embedding":
+        raise ValueError(f"{bundle_dir} is a {meta['kind']} bundle, not an embedding bundle")
+    _check_scorer(meta.get("scorer", "max"), bundle_dir)
+    _offline()
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(str(bundle_dir), device="cpu", local_files_only=True)
+    ref_norm = np.load(bundle_dir / REFS_FILE, mmap_mode="r")
+    return model, ref_norm, meta
+
+
+def load_zeroshot_bundle(bundle_dir: Path | str):
+    """
+    Returns (pipeline, meta) for a local zero-shot bundle without hub access.
+    """
+    bundle_dir = Path(bundle_dir)
+    meta = read_manifest(bundle_dir)
+    if meta["kind"] != "zeroshot":
+        raise ValueError(f"{bundle_dir} is a {meta['kind']} bundle, not a zero-shot bundle")
+    _offline()
+    from transformers import pipeline
+
+    pipe = pipeline("zero-shot-classification", model=str(bundle_dir), tokenizer=str(bundle_dir), device=-1)
+    return pipe, meta
+
+
+def verify_bundle(bundle_dir: Path | str) -> list[str]:
+    """Files whose checksum no longer matches bundle.json (empty list = intact)."""
+    bundle_dir = Path(bundle_dir)
+    meta = read_manifest(bundle_dir)
+    return [name for name, digest in meta["files"].items()
+            if not (bundle_dir / name).exists() or _digest(bundle_dir / name) != digest]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build or verify offline classifier bundles.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("embedding", help="Bundle a sentence-embedding model with its reference embeddings")
+    p.add_argument("--model", default="all-MiniLM-L6-v2")
+    p.add_argument("--refs", default="eco_ref_sentences.txt")
+    p.add_argument("--threshold", type=float, default=0.40)
+    p.add_argument("--scorer", default="max", choices=SCORERS, help="Scorer the threshold was tuned for")
+    p.add_argument("-o", "--output", type=Path, default=None)
+
+    p = sub.add_parser("zeroshot", help="Bundle a zero-shot NLI model with its candidate labels")
+    p.add_argument("--model", default="MoritzLaurer/DeBERTa-v3-base-mnli-fever-anli")
+    p.add_argument("--labels", default="labels.yaml")
+    p.add_argument("-o", "--output", type=Path, default=None)
+
+    p = sub.add_parser("verify", help="Check checksums and time an offline cold load")
+    p.add_argument("bundle", type=Path)
+    args = parser.parse_args()
+
+    if args.command == "verify":
+        bad = verify_bundle(args.bundle)
+        print("Checksums: OK" if not bad else f"Checksums: {len(bad)} changed/missing: {', '.join(bad)}")
+        meta = read_manifest(args.bundle)
+        t0 = time.perf_counter()
+        if meta["kind"] == "embedding":
+            model, refs, _ = load_embedding_bundle(args.bundle)
+            model.encode(["warm-up"])
+        else:
+            load_zeroshot_bundle(args.bundle)
+        print(f"Offline cold load: {time.perf_counter() - t0:.2f}s ({meta['kind']}, {meta['model_id']})")
+        return
+
+    out_dir = args.output or bundle_path_for(args.model)
+    if args.command == "embedding":
+        meta = build_embedding_bundle(args.model, args.refs, out_dir, args.threshold, args.scorer)
+    else:
+        meta = build_zeroshot_bundle(args.model, args.labels, out_dir)
+    size = sum((out_dir / name).stat().st_size for name in meta["files"])
+    print(f"Bundle written: {out_dir} ({len(meta['files'])} files, {size / 1e6:.0f} MB)")
+
+
+if __name__ == "__main__":
+    import _shared  # noqa: F401  (puts ../googlenews-fetch-news/src on sys.path)
+    from import_profile import profile_imports_if_requested
+
+    profile_imports_if_requested()
+    main()
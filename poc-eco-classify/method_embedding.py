@@ -2,11 +2,16 @@
 Sentence embedding classifier for economic news.
 Uses all-MiniLM-L6-v2; classifies as economic if max cosine similarity
 to reference sentences exceeds threshold.
+With a bundle (see bundle_model.py) the model, reference embeddings and
+threshold are loaded from a local directory with no hub access.
+classify_documents scores article bodies chunk by chunk with early exit.
 """
+import re
 from pathlib import Path
 
 import numpy as np
-from sentence_transformers import SentenceTransformer
+
+DEFAULT_THRESHOLD = 0.40
 
 
 def _load_ref_sentences(ref_file: str) -> list[str]:
@@ -17,53 +22,230 @@ def _load_ref_sentences(ref_file: str) -> list[str]:
     return [line.strip() for line in lines if line.strip()]
 
 
+def _normalize(emb: np.ndarray) -> np.ndarray:
+    """L2-normalize rows in place (float32)."""
+    emb = np.asarray(emb, dtype=np.float32)
+    emb /= np.linalg.norm(emb, axis=1, keepdims=True)
+    return emb
+
+
+def max_similarities(
+    model,
+    ref_embeddings: np.ndarray,
+    articles: list[str],
+    chunk_size: int = 1024,
+    normalized: bool = False,
+) -> np.ndarray:
+    """
+    Max cosine similarity of each article to any reference, computed chunk by chunk.
+    Only one (chunk_size, dim) embedding block and (chunk_size, n_refs) similarity
+    block exist at a time, so memory stays flat for large article lists.
+    normalized=True uses ref_embeddings as given (e.g. a bundle's read-only refs.npy).
+    """
+    ref_norm = np.asarray(ref_embeddings) if normalized else _normalize(ref_embeddings)
+    max_sims = np.empty(len(articles), dtype=np.float32)
+    for start in range(0, len(articles), chunk_size):
+        chunk = articles[start:start + chunk_size]
+        art_norm = _normalize(model.encode(chunk))
+        # (chunk, dim) @ (dim, n_refs) -> (chunk, n_refs); cosine sim with normalized vecs
+        np.max(art_norm @ ref_norm.T, axis=1, out=max_sims[start:start + len(chunk)])
+    return max_sims
+
+
+_PARAGRAPH = re.compile(r"\n\s*\n")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def split_chunks(text: str, max_chars: int = 600, min_chars: int = 40) -> list[str]:
+    """
+    Split an article body into paragraph chunks of at most max_chars; long
+    paragraphs are packed sentence by sentence. Pieces shorter than min_chars
+    (bylines, captions, one-line paragraphs) are merged into the following
+    chunk, or the preceding one when nothing fits after them, so no text is
+    lost; they stand alone only if no neighbour has room.
+    """
+    pieces = []
+    for para in _PARAGRAPH.split(text or ""):
+        para = " ".join(para.split())
+        if len(para) <= max_chars:
+            if para:
+                pieces.append(para)
+            continue
+        current = ""
+        for sentence in _SENTENCE_END.split(para):
+            if current and len(current) + 1 + len(sentence) > max_chars:
+                pieces.append(current)
+                current = sentence
+            else:
+                current = f"{current} {sentence}" if current else sentence
+        if current:
+            pieces.append(current)
+
+    chunks: list[str] = []
+    short = ""  # short pieces waiting for a neighbour
+    for piece in pieces:
+        if short and len(short) + 1 + len(piece) <= max_chars:
+            piece = f"{short} {piece}"
+        elif short:
+            if chunks and len(chunks[-1]) + 1 + len(short) <= max_chars:
+                chunks[-1] = f"{chunks[-1]} {short}"
+            else:
+                chunks.append(short)
+            short = ""
+        if len(piece) < min_chars:
+            short = piece
+        else:
+            chunks.append(piece)
+            short = ""
+    if short:
+        if chunks and len(chunks[-1]) + 1 + len(short) <= max_chars:
+            chunks[-1] = f"{chunks[-1]} {short}"
+        else:
+            chunks.append(short)
+    return chunks
+
+
+def classify_documents(
+    model,
+    ref_norm: np.ndarray,
+    documents: list[str],
+    threshold: float,
+    titles: list[str] | None = None,
+    top_k: int = 1,
+    step: int = 4,
+    min_chunks: int = 4,
+    margin: float = 0.10,
+    max_chunks: int | None = None,
+    batch_size: int = 64,
+) -> list[dict]:
+    """
+    Body-level classification: each document is split into chunks, scored
+    against the references, and aggregated as the mean of its top_k chunk
+    scores (top_k=1 is max). The title, if given, is the first chunk.
+
+    Chunks are evaluated in reading order, step per document per round, with
+    the chunks of all undecided documents encoded together in batches. A
+    document stops early:
+    - positive: the aggregate of at least top_k chunks exceeds threshold. More
+      chunks can only raise a top-k mean, so this equals scoring everything.
+    - negative: after min_chunks chunks the aggregate is still below
+      threshold - margin (news leads with its subject, so an off-topic lead
+      rarely turns economic later).
+    Returns one dict per document: economic, score, decided
+    (positive/negative/exhausted), chunks_evaluated, chunks_total.
+    """
+    chunk_lists = []
+    for i, doc in enumerate(documents):
+        chunks = split_chunks(doc)
+        if titles is not None and titles[i]:
+            chunks.insert(0, titles[i])
+        chunk_lists.append(chunks[:max_chunks] if max_chunks else chunks)
+
+    top_scores = [np.full(top_k, -1.0, dtype=np.float32) for _ in documents]
+    seen = [0] * len(documents)
+    decided: list[str | None] = [None if chunks else "exhausted" for chunks in chunk_lists]
+
+    def aggregate(i: int) -> float:
+        valid = top_scores[i][top_scores[i] > -1.0]
+        return float(valid.mean()) if len(valid) else 0.0
+
+    while True:
+        pending = [i for i, d in enumerate(decided) if d is None]
+        if not pending:
+            break
+        owners, texts = [], []
+        for i in pending:
+            batch = chunk_lists[i][seen[i]:seen[i] + step]
+            owners.extend([i] * len(batch))
+            texts.extend(batch)
+        sims = max_similarities(model, ref_norm, texts, chunk_size=batch_size, normalized=True)
+        for i, sim in zip(owners, sims):
+            row = top_scores[i]
+            j = int(np.argmin(row))
+            if sim > row[j]:
+                row[j] = sim
+            seen[i] += 1
+        for i in pending:
+            score = aggregate(i)
+            # Below k chunks the mean can still drop; from k on it only rises
+            if score > threshold and seen[i] >= min(top_k, len(chunk_lists[i])):
+                decided[i] = "positive"
+            elif seen[i] >= min_chunks and score < threshold - margin:
+                decided[i] = "negative"
+            elif seen[i] >= len(chunk_lists[i]):
+                decided[i] = "exhausted"
+
+    results = []
+    for i, chunks in enumerate(chunk_lists):
+        score = aggregate(i)
+        results.append({
+            "economic": score > threshold,
+            "score": round(score, 4),
+            "decided": decided[i],
+            "chunks_evaluated": seen[i],
+            "chunks_total": len(chunks),
+        })
+    return results
+
+
 def classify(
     articles: list[str],
     ref_file: str = "eco_ref_sentences.txt",
-    threshold: float = 0.40,
+    threshold: float | None = None,
+    bundle: str | None = None,
 ) -> tuple[list[bool], float]:
     """
     Returns (predictions, elapsed_seconds).
     predictions[i] is True if article i is classified as economic.
     Only inference time is measured (model load excluded).
     """
-    ref_sentences = _load_ref_sentences(ref_file)
-    model = SentenceTransformer("all-MiniLM-L6-v2")
-    ref_embeddings = model.encode(ref_sentences)
-
-    import time
-    t0 = time.perf_counter()
-    article_embeddings = model.encode(articles)
-    # (n_articles, dim) @ (dim, n_refs) -> (n_articles, n_refs); cosine sim with normalized vecs
-    ref_norm = ref_embeddings / np.linalg.norm(ref_embeddings, axis=1, keepdims=True)
-    art_norm = article_embeddings / np.linalg.norm(article_embeddings, axis=1, keepdims=True)
-    sims = np.dot(art_norm, ref_norm.T)  # (n_articles, n_refs)
-    max_sims = np.max(sims, axis=1)
-    predictions = (max_sims > threshold).tolist()
-    elapsed = time.perf_counter() - t0
+    predictions, _, elapsed = classify_with_scores(articles, ref_file, threshold, bundle)
     return predictions, elapsed
 
 
+def load_scorer(
+    ref_file: str = "eco_ref_sentences.txt",
+    threshold: float | None = None,
+    bundle: str | None = None,
+) -> tuple[object, np.ndarray, float]:
+    """
+    Returns (model, normalized_ref_embeddings, threshold).
+    With bundle, ref_file is ignored and threshold defaults to the bundle's
+    (tuned for max similarity; bundles with another scorer fail to load).
+    """
+    if bundle:
+        from bundle_model import load_embedding_bundle
+
+        model, ref_embeddings, meta = load_embedding_bundle(bundle)
+        if threshold is None:
+            threshold = meta["threshold"]
+    else:
+        from sentence_transformers import SentenceTransformer
+
+        ref_sentences = _load_ref_sentences(ref_file)
+        model = SentenceTransformer("all-MiniLM-L6-v2")
+        ref_embeddings = _normalize(model.encode(ref_sentences))
+    if threshold is None:
+        threshold = DEFAULT_THRESHOLD
+    return model, ref_embeddings, threshold
+
+
 def classify_with_scores(
     articles: list[str],
     ref_file: str = "eco_ref_sentences.txt",
-    threshold: float = 0.40,
+    threshold: float | None = None,
+    bundle: str | None = None,
 ) -> tuple[list[bool], list[float], float]:
     """
     Returns (predictions, max_scores, elapsed_seconds).
     Useful for benchmark to show score in misclassified lines.
+    With bundle, ref_file is ignored and threshold defaults to the bundle's.
     """
-    ref_sentences = _load_ref_sentences(ref_file)
-    model = SentenceTransformer("all-MiniLM-L6-v2")
-    ref_embeddings = model.encode(ref_sentences)
+    model, ref_embeddings, threshold = load_scorer(ref_file, threshold, bundle)
 
     import time
     t0 = time.perf_counter()
-    article_embeddings = model.encode(articles)
-    ref_norm = ref_embeddings / np.linalg.norm(ref_embeddings, axis=1, keepdims=True)
-    art_norm = article_embeddings / np.linalg.norm(article_embeddings, axis=1, keepdims=True)
-    sims = np.dot(art_norm, ref_norm.T)
-    max_sims = np.max(sims, axis=1)
+    max_sims = max_similarities(model, ref_embeddings, articles, normalized=True)
     predictions = (max_sims > threshold).tolist()
     elapsed = time.perf_counter() - t0
     return predictions, max_sims.tolist(), elapsed
@@ -74,10 +256,16 @@ if __name__ == "__main__":
     import sys
     import yaml
 
+    import _shared  # noqa: F401  (puts ../googlenews-fetch-news/src on sys.path)
+    from import_profile import profile_imports_if_requested
+
+    profile_imports_if_requested()
+
     data_file = sys.argv[1] if len(sys.argv) > 1 else "sampledata.yaml"
+    bundle = sys.argv[2] if len(sys.argv) > 2 else None
     data = yaml.safe_load(Path(data_file).read_text(encoding="utf-8"))
     titles = [item["title"] for item in data]
 
-    preds, scores, elapsed = classify_with_scores(titles)
+    preds, scores, elapsed = classify_with_scores(titles, bundle=bundle)
     json.dump({"predictions": preds, "scores": scores, "elapsed": elapsed}, sys.stdout)
     sys.stdout.write("\n")
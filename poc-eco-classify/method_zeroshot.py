@@ -2,11 +2,12 @@
 Zero-shot classifier for economic news.
 Uses facebook/bart-large-mnli; classifies as economic if target category
 has the highest score among all candidates from labels.yaml.
+With a bundle (see bundle_model.py) the model, tokenizer and labels are
+loaded from a local directory with no hub access.
 """
 from pathlib import Path
 
 import yaml
-from transformers import pipeline
 
 
 def _load_labels(labels_file: str) -> tuple[str, list[str]]:
@@ -24,19 +25,29 @@ def _load_labels(labels_file: str) -> tuple[str, list[str]]:
 def classify(
     articles: list[str],
     labels_file: str = "labels.yaml",
+    bundle: str | None = None,
 ) -> tuple[list[bool], list[dict], float]:
     """
     Returns (predictions, details, elapsed_seconds).
     predictions[i] is True if article i is classified as economic (target wins).
     details[i] = {top_label: str, top_score: float, target_score: float}
     Only inference time is measured (model load excluded).
+    With bundle, labels come from the bundle and labels_file is ignored.
     """
-    target, label_list = _load_labels(labels_file)
-    pipe = pipeline(
-        "zero-shot-classification",
-        model="MoritzLaurer/DeBERTa-v3-base-mnli-fever-anli",
-        device=-1,
-    )
+    if bundle:
+        from bundle_model import load_zeroshot_bundle
+
+        pipe, meta = load_zeroshot_bundle(bundle)
+        target, label_list = meta["target"], meta["labels"]
+    else:
+        from transformers import pipeline
+
+        target, label_list = _load_labels(labels_file)
+        pipe = pipeline(
+            "zero-shot-classification",
+            model="MoritzLaurer/DeBERTa-v3-base-mnli-fever-anli",
+            device=-1,
+        )
 
     import time
     t0 = time.perf_counter()
@@ -68,10 +79,16 @@ if __name__ == "__main__":
     import json
     import sys
 
+    import _shared  # noqa: F401  (puts ../googlenews-fetch-news/src on sys.path)
+    from import_profile import profile_imports_if_requested
+
+    profile_imports_if_requested()
+
     data_file = sys.argv[1] if len(sys.argv) > 1 else "sampledata.yaml"
+    bundle = sys.argv[2] if len(sys.argv) > 2 else None
     data = yaml.safe_load(Path(data_file).read_text(encoding="utf-8"))
     titles = [item["title"] for item in data]
 
-    preds, details, elapsed = classify(titles)
+    preds, details, elapsed = classify(titles, bundle=bundle)
     json.dump({"predictions": preds, "details": details, "elapsed": elapsed}, sys.stdout)
     sys.stdout.write("\n")
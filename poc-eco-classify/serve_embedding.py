@@ -0,0 +1,280 @@
+"""
+Local classification service around the embedding classifier.
+
+Callers send one headline (or a few) per request; a single batcher thread
+collects queued requests into dynamic micro-batches and encodes them with
+one model call. A batch is flushed as soon as it holds --max-batch titles
+or the oldest queued request has waited --max-wait-ms, so a lone request
+pays at most max_wait extra latency and a burst gets batch-level throughput.
+
+Endpoints (JSON):
+    POST /classify  {"title": "..."}  or  {"titles": ["...", ...]}
+                    -> {"economic": bool, "score": float}  or  {"results": [...]}
+                    400 on a malformed body, 503 when scores are not ready
+                    within --timeout seconds (overloaded)
+    GET  /stats     requests, batches, mean batch size, queue depth,
+                    throughput and p50/p95/p99 latency (ms)
+    GET  /health
+
+Usage:
+    python serve_embedding.py --port 8765
+    python serve_embedding.py --unix /tmp/eco-classify.sock --bundle bundles/all-MiniLM-L6-v2
+    curl -s localhost:8765/classify -d '{"title": "Fed raises interest rates"}'
+    curl -s --unix-socket /tmp/eco-classify.sock http://x/stats
+"""
+import argparse
+import json
+import os
+import queue
+import socketserver
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+
+def percentile(values: list[float], q: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class MicroBatcher:
+    """
+    Queue single items and score them in batches on one worker thread.
+    score_fn takes a list of titles and returns one score per title.
+    """
+
+    def __init__(self, score_fn, max_batch: int = 64, max_wait_ms: float = 5.0, window: int = 10_000):
+        self.score_fn = score_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._batch_sizes: deque[int] = deque(maxlen=window)
+        self.requests = 0
+        self.batches = 0
+        self.errors = 0
+        self.started = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, title: str) -> Future:
+        """Future resolving to the title's score."""
+        future: Future = Future()
+        self._queue.put((title, future, time.perf_counter()))
+        return future
+
+    def score(self, titles: list[str], timeout: float | None = 30.0) -> list[float]:
+        """Scores in input order; raises TimeoutError if they are not all ready within timeout seconds."""
+        futures = [self.submit(t) for t in titles]
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            return [f.result(None if deadline is None else max(0.0, deadline - time.monotonic())) for f in futures]
+        except FutureTimeout:
+            for f in futures:
+                f.cancel()
+            raise TimeoutError(f"{len(titles)} titles not scored within {timeout:g}s") from None
+
+    def _collect(self) -> list[tuple]:
+        """Block for the first item, then take more until max_batch or its max_wait deadline."""
+        batch = [self._queue.get()]
+        deadline = batch[0][2] + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            # Requests that timed out and cancelled their futures are dropped; the rest can no longer be cancelled
+            batch = [item for item in self._collect() if item[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                scores = self.score_fn([title for title, _, _ in batch])
+            except Exception as e:
+                with self._lock:
+                    self.errors += len(batch)
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            done = time.perf_counter()
+            with self._lock:
+                self.requests += len(batch)
+                self.batches += 1
+                self._batch_sizes.append(len(batch))
+                self._latencies.extend(done - queued for _, _, queued in batch)
+            for (_, future, _), score in zip(batch, scores):
+                future.set_result(float(score))
+
+    def stats(self) -> dict:
+        with self._lock:
+            latencies = list(self._latencies)
+            sizes = list(self._batch_sizes)
+            requests, batches, errors = self.requests, self.batches, self.errors
+        uptime = time.monotonic() - self.started
+
+        def ms(q: float) -> float | None:
+            value = percentile(latencies, q)
+            return None if value is None else round(value * 1000, 2)
+
+        return {
+            "requests": requests,
+            "batches": batches,
+            "errors": errors,
+            "mean_batch_size": round(sum(sizes) / len(sizes), 2) if sizes else None,
+            "max_batch_size": max(sizes, default=None),
+            "queue_depth": self._queue.qsize(),
+            "uptime_s": round(uptime, 1),
+            "throughput_rps": round(requests / uptime, 2) if uptime > 0 else None,
+            "latency_ms": {"p50": ms(0.50), "p95": ms(0.95), "p99": ms(0.99)},
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1000,
+        }
+
+
+class ClassifyHandler(BaseHTTPRequestHandler):
+    batcher: MicroBatcher
+    threshold: float
+    timeout = 30.0
+    quiet = True
+
+    def _send(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _result(self, score: float) -> dict:
+        return {"economic": score > self.threshold, "score": round(score, 4)}
+
+    def do_GET(self) -> None:
+        if self.path == "/stats":
+            self._send(200, self.batcher.stats())
+        elif self.path == "/health":
+            self._send(200, {"ok": True})
+        else:
+            self._send(404, {"error": f"Unknown path: {self.path}"})
+
+    def do_POST(self) -> None:
+        if self.path != "/classify":
+            self._send(404, {"error": f"Unknown path: {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError as e:
+            self._send(400, {"error": f"Invalid JSON: {e}"})
+            return
+        if isinstance(body, dict) and isinstance(body.get("title"), str):
+            titles, single = [body["title"]], True
+        elif isinstance(body, dict) and isinstance(body.get("titles"), list) and all(isinstance(t, str) for t in body["titles"]):
+            titles, single = body["titles"], False
+        else:
+            self._send(400, {"error": 'Expected {"title": str} or {"titles": [str, ...]}'})
+            return
+        try:
+            scores = self.batcher.score(titles, self.timeout)
+        except TimeoutError as e:
+            self._send(503, {"error": f"Overloaded: {e}"})
+            return
+        except Exception as e:
+            self._send(500, {"error": f"Scoring failed: {type(e).__name__}: {e}"})
+            return
+        if single:
+            self._send(200, self._result(scores[0]))
+        else:
+            self._send(200, {"results": [self._result(s) for s in scores]})
+
+    def address_string(self) -> str:
+        # Unix-socket peers have no (host, port) address
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format: str, *args) -> None:
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+class ThreadingTCPHTTPServer(ThreadingHTTPServer):
+    # Default listen backlog (5) resets connections under bursts of single-title requests
+    request_queue_size = 256
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+    def server_bind(self) -> None:
+        socketserver.UnixStreamServer.server_bind(self)
+        self.server_name, self.server_port = "localhost", 0
+
+
+def make_server(batcher: MicroBatcher, threshold: float, host: str = "127.0.0.1", port: int = 8765,
+                unix: str | None = None, quiet: bool = True, timeout: float = 30.0):
+    handler = type("Handler", (ClassifyHandler,),
+                   {"batcher": batcher, "threshold": threshold, "quiet": quiet, "timeout": timeout})
+    if unix:
+        if os.path.exists(unix):
+            os.unlink(unix)
+        return ThreadingUnixHTTPServer(unix, handler)
+    return ThreadingTCPHTTPServer((host, port), handler)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve the embedding classifier with dynamic micro-batching.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", default=None, help="Listen on this Unix socket instead of TCP")
+    parser.add_argument("--bundle", default=None, help="Offline bundle dir (see bundle_model.py)")
+    parser.add_argument("--refs", default="eco_ref_sentences.txt")
+    parser.add_argument("--threshold", type=float, default=None)
+    parser.add_argument("--max-batch", type=int, default=64, help="Flush when this many titles are queued")
+    parser.add_argument("--max-wait-ms", type=float, default=5.0, help="Flush when the oldest title waited this long")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Seconds a request may wait for its scores (503 after)")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    from method_embedding import load_scorer, max_similarities
+
+    t0 = time.perf_counter()
+    model, ref_norm, threshold = load_scorer(args.refs, args.threshold, args.bundle)
+    model.encode(["warm-up"])
+    print(f"Model ready in {time.perf_counter() - t0:.1f}s (threshold {threshold:.2f})")
+
+    def score_fn(titles: list[str]) -> np.ndarray:
+        return max_similarities(model, ref_norm, titles, chunk_size=args.max_batch, normalized=True)
+
+    batcher = MicroBatcher(score_fn, args.max_batch, args.max_wait_ms)
+    server = make_server(batcher, threshold, args.host, args.port, args.unix, quiet=not args.verbose,
+                         timeout=args.timeout)
+    where = args.unix or f"http://{args.host}:{args.port}"
+    print(f"Listening on {where} (max batch {args.max_batch}, max wait {args.max_wait_ms:g} ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.unix and os.path.exists(args.unix):
+            os.unlink(args.unix)
+        print(json.dumps(batcher.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    import _shared  # noqa: F401  (puts ../googlenews-fetch-news/src on sys.path)
+    from import_profile import profile_imports_if_requested
+
+    profile_imports_if_requested()
+    main()